@@ -0,0 +1 @@
+"""Supporting modules for top10Scraper.py"""
@@ -0,0 +1,82 @@
+"""
+Insert throughput of the database sink against the SQLite stand-in
+
+Compares the batched multi-row upserts of DatabaseResultSink with the
+per-list pattern of the manual import page (delete the list's items, then
+insert them, one transaction per list), on synthetic results.
+
+    python -m scraper.benchmarks.db_sink
+    python -m scraper.benchmarks.db_sink --topics 20000 --batch-sizes 1,10,50,200
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from scraper.db_sink import DatabaseResultSink, SqliteBackend, item_id, list_id
+
+def synthetic_results(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "topic": f"synthetic topic {index:06d}",
+            "source_url": f"https://example.com/lists/{index}",
+            "items": [
+                {"rank": rank, "name": f"Item {rank} of topic {index}", "details": f"Measured value {rank * 3.5:.1f}"}
+                for rank in range(1, 11)
+            ],
+        }
+        for index in range(count)
+    ]
+
+def per_list_inserts(path: str, results: List[Dict[str, Any]]) -> float:
+    """The import page's pattern: one transaction and one row per statement for each list"""
+    backend = SqliteBackend(path)
+    started = time.perf_counter()
+    for result in results:
+        id_ = list_id(result["topic"], result["source_url"])
+        with backend.transaction() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO lists (id, title, source_url) VALUES (?, ?, ?)",
+                (id_, result["topic"], result["source_url"]),
+            )
+            cursor.execute("DELETE FROM list_items WHERE list_id = ?", (id_,))
+            for item in result["items"]:
+                cursor.execute(
+                    "INSERT INTO list_items (id, list_id, rank, name, details) VALUES (?, ?, ?, ?, ?)",
+                    (item_id(id_, item["rank"]), id_, item["rank"], item["name"], item["details"]),
+                )
+    elapsed = time.perf_counter() - started
+    backend.close()
+    return elapsed
+
+def batched_upserts(path: str, results: List[Dict[str, Any]], batch_size: int) -> float:
+    sink = DatabaseResultSink(SqliteBackend(path), batch_size)
+    started = time.perf_counter()
+    for result in results:
+        sink.write(result)
+    sink.close()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark database sink insert throughput")
+    parser.add_argument("--topics", type=int, default=5_000, help="Synthetic results to insert")
+    parser.add_argument("--batch-sizes", default="1,10,50,200", help="Comma-separated topics per transaction")
+    args = parser.parse_args()
+    
+    results = synthetic_results(args.topics)
+    with tempfile.TemporaryDirectory() as workdir:
+        elapsed = per_list_inserts(os.path.join(workdir, "per_list.sqlite"), results)
+        print(f"per-list inserts        : {args.topics / elapsed:>10.0f} lists/s  ({elapsed:.2f} s)")
+        for batch_size in (int(part) for part in args.batch_sizes.split(",") if part.strip()):
+            path = os.path.join(workdir, f"batched_{batch_size}.sqlite")
+            elapsed = batched_upserts(path, results, batch_size)
+            # A second pass over the same results exercises the update path
+            rerun = batched_upserts(path, results, batch_size)
+            print(
+                f"batched upserts ({batch_size:>4}) : {args.topics / elapsed:>10.0f} lists/s  ({elapsed:.2f} s), "
+                f"re-run {args.topics / rerun:.0f} lists/s"
+            )
+
+if __name__ == "__main__":
+    main()
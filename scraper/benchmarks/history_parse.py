@@ -0,0 +1,106 @@
+"""
+Compare the old repr+regex history scan with the structured history parser
+
+    python -m scraper.benchmarks.history_parse
+    python -m scraper.benchmarks.history_parse --steps 60 --screenshot-kb 800
+    python -m scraper.benchmarks.history_parse --history-file saved_history.json
+"""
+import argparse
+import json
+import random
+import re
+import string
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Callable, Dict
+
+from scraper.history_parser import extract_list_items
+
+TOPIC = "smallest birds in the united states"
+
+def _noise(size_kb: int, rng: random.Random) -> str:
+    alphabet = string.ascii_letters + string.digits + "+/"
+    return "".join(rng.choices(alphabet, k=size_kb * 1024))
+
+def build_synthetic_history(steps: int, screenshot_kb: int, dom_kb: int, seed: int = 0) -> SimpleNamespace:
+    """
+    Build an object shaped like an AgentHistoryList with large screenshots and DOM dumps
+    
+    The ranked list only appears in the extracted content of the last step.
+    """
+    rng = random.Random(seed)
+    history = []
+    for step in range(steps):
+        results = [SimpleNamespace(
+            is_done=False,
+            extracted_content=f"Clicked element {step}",
+            error=None,
+            include_in_memory=True,
+        )]
+        if step == steps - 1:
+            birds = [{"rank": rank, "name": f"Bird {rank}", "length": f"{2 + rank / 10:.1f} inches"} for rank in range(1, 11)]
+            results.append(SimpleNamespace(
+                is_done=True,
+                extracted_content="📄 Extracted from page\n: ```json\n" + json.dumps({"smallest_birds": birds}) + "\n```",
+                error=None,
+                include_in_memory=True,
+            ))
+        history.append(SimpleNamespace(
+            model_output=SimpleNamespace(current_state={"memory": "x" * 200}, action=[{"click_element": {"index": step}}]),
+            result=results,
+            state=SimpleNamespace(
+                url=f"https://example.com/{step}",
+                title="Example",
+                screenshot=_noise(screenshot_kb, rng),
+                dom=_noise(dom_kb, rng),
+            ),
+        ))
+    return SimpleNamespace(history=history)
+
+def legacy_scan(history: Any) -> Any:
+    """The pre-parser approach: stringify the whole history and regex it"""
+    text = str(history.__dict__) if not isinstance(history, dict) else str(history)
+    match = re.search(r'```json\s*(.*?)\s*```', text, re.DOTALL)
+    return match.group(1) if match else None
+
+def structured_scan(history: Any) -> Any:
+    return extract_list_items(history, TOPIC)
+
+def measure(fn: Callable[[Any], Any], history: Any, repeat: int) -> Dict[str, float]:
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        started = time.perf_counter()
+        fn(history)
+        timings.append(time.perf_counter() - started)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    timings.sort()
+    return {"median_ms": timings[len(timings) // 2] * 1000, "peak_mb": peak / (1024 * 1024)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark agent history parsing")
+    parser.add_argument("--history-file", help="Saved AgentHistoryList JSON to benchmark instead of a synthetic one")
+    parser.add_argument("--steps", type=int, default=30, help="Steps in the synthetic history")
+    parser.add_argument("--screenshot-kb", type=int, default=400, help="Screenshot size per step, in KB")
+    parser.add_argument("--dom-kb", type=int, default=200, help="DOM dump size per step, in KB")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per approach")
+    args = parser.parse_args()
+    
+    if args.history_file:
+        with open(args.history_file, "r", encoding="utf-8") as f:
+            history = json.load(f)
+        label = args.history_file
+    else:
+        history = build_synthetic_history(args.steps, args.screenshot_kb, args.dom_kb)
+        label = f"synthetic ({args.steps} steps, {args.screenshot_kb}KB screenshots, {args.dom_kb}KB DOM)"
+    
+    print(f"History: {label}")
+    for name, fn in (("legacy repr+regex", legacy_scan), ("structured parser", structured_scan)):
+        result = measure(fn, history, args.repeat)
+        print(f"{name:>20}: {result['median_ms']:9.2f} ms median, {result['peak_mb']:8.2f} MB peak")
+
+if __name__ == "__main__":
+    main()
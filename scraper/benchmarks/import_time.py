@@ -0,0 +1,105 @@
+"""
+Cold-start benchmark for the top10Scraper.py command line
+
+Runs CLI invocations that should never touch browser_use, LangChain or
+pydantic (--help, a dry run, and a topic answered from the result cache)
+in fresh interpreters, reports their wall time, and uses
+`python -X importtime` to name any heavy package that was imported anyway.
+Exits with status 1 when a command is over budget or imports a heavy package,
+so it can guard startup time in CI.
+
+    python -m scraper.benchmarks.import_time
+    python -m scraper.benchmarks.import_time --budget 0.3 --repeat 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from scraper.metrics import percentile
+from scraper.result_cache import TopicResultCache
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "top10Scraper.py")
+
+# Top-level packages that must stay out of the cold start
+HEAVY_PACKAGES = ("browser_use", "langchain", "langchain_core", "langchain_google_genai", "pydantic", "playwright", "google")
+
+def heavy_imports(importtime_output: str) -> List[str]:
+    """
+    Args:
+        importtime_output: stderr of a `python -X importtime` run
+    
+    Returns:
+        Heavy top-level packages that were imported, sorted
+    """
+    found = set()
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or line.count("|") < 2:
+            continue
+        module = line.rsplit("|", 1)[1].strip()
+        package = module.split(".")[0]
+        if package in HEAVY_PACKAGES:
+            found.add(package)
+    return sorted(found)
+
+def measure(command: List[str], repeat: int) -> Dict[str, Any]:
+    """Time a CLI command in fresh interpreters and check what it imported"""
+    env = dict(os.environ, ANONYMIZED_TELEMETRY="false")
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, SCRIPT, *command], env=env, capture_output=True, check=True)
+        durations.append(time.perf_counter() - started)
+    
+    traced = subprocess.run([sys.executable, "-X", "importtime", SCRIPT, *command], env=env, capture_output=True, text=True, check=True)
+    return {
+        "command": " ".join(command),
+        "p50_seconds": round(percentile(durations, 0.5), 4),
+        "max_seconds": round(max(durations), 4),
+        "heavy_imports": heavy_imports(traced.stderr),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the top10Scraper.py command line")
+    parser.add_argument("--budget", type=float, default=0.5, help="Maximum median wall time per command, in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per command")
+    parser.add_argument("--output", help="Write the measurements as JSON to this file")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        topics_file = os.path.join(workdir, "topics.json")
+        with open(topics_file, "w", encoding="utf-8") as f:
+            json.dump([f"benchmark topic {index}" for index in range(100)], f)
+        cache_db = os.path.join(workdir, "cache.sqlite")
+        cache = TopicResultCache(cache_db)
+        cache.put({"topic": "benchmark topic 1", "source_url": "https://example.com/list", "items": [{"rank": 1, "name": "Item", "details": None}]})
+        cache.close()
+        
+        commands = [
+            ["--help"],
+            ["--topics-file", topics_file, "--dry-run", "--no-cache"],
+            ["--topic", "benchmark topic 1", "--cache-db", cache_db, "--output", os.path.join(workdir, "cached.json")],
+        ]
+        results = [measure(command, args.repeat) for command in commands]
+    
+    failed = False
+    print(f"{'command':<50}{'p50 s':>10}{'max s':>10}  heavy imports")
+    for result in results:
+        over_budget = result["p50_seconds"] > args.budget
+        failed = failed or over_budget or bool(result["heavy_imports"])
+        command = result["command"] if len(result["command"]) <= 48 else result["command"][:45] + "..."
+        flag = "  OVER BUDGET" if over_budget else ""
+        print(f"{command:<50}{result['p50_seconds']:>10.3f}{result['max_seconds']:>10.3f}  {', '.join(result['heavy_imports']) or '-'}{flag}")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"budget_seconds": args.budget, "results": results}, f, indent=2)
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
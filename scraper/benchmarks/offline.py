@@ -0,0 +1,427 @@
+"""
+Offline throughput benchmark for batch_scrape_topics
+
+Swaps the Gemini model for a scripted fake LLM with configurable latency,
+replaces browser agents with scripted agents that call it, and serves the
+source pages from a local HTTP server. No API key, browser, browser_use
+install or internet connection is needed. A run where any topic fails is
+reported as failed, without a throughput figure, and exits non-zero.
+
+    python -m scraper.benchmarks.offline
+    python -m scraper.benchmarks.offline --sizes 10,100 --concurrency 1,8,32 --llm-latency 0.05
+    python -m scraper.benchmarks.offline --mode text --agent-fraction 0.5
+    python -m scraper.benchmarks.offline --incomplete-fraction 0.5
+    python -m scraper.benchmarks.offline --fixtures-dir saved_pages/ --output bench.json
+    python -m scraper.benchmarks.offline --sizes 100 --concurrency 16 --profile profiles/
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from scraper.metrics import percentile
+
+TOPIC_IN_TASK = re.compile(r'about "([^"]+)"')
+URL_IN_TASK = re.compile(r"Visit (\S+)")
+
+# Ranks a scripted scrape agent leaves out of an incomplete list
+INCOMPLETE_RANKS = (4, 7)
+
+def topic_slug(topic: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")
+
+def synthetic_items(topic: str) -> List[Dict[str, Any]]:
+    return [
+        {"rank": rank, "name": f"{topic.title()} Item {rank}", "details": f"Measured value {rank * 3.5:.1f}"}
+        for rank in range(1, 11)
+    ]
+
+def render_page(topic: str, fast_path: bool) -> bytes:
+    """Render a source page the HTML extractor can (or deliberately can't) read"""
+    items = synthetic_items(topic)
+    if fast_path:
+        body = "<ol>" + "".join(f"<li><strong>{i['name']}</strong> - {i['details']}</li>" for i in items) + "</ol>"
+    else:
+        # Unnumbered cards: the extractor is not confident and the scrape agent runs
+        body = "".join(f"<div class='card'><span>{i['name']}</span><p>{i['details']}</p></div>" for i in items)
+    filler = "<p>" + "Lorem ipsum dolor sit amet. " * 200 + "</p>"
+    html = f"<html><head><title>Top 10 {topic}</title><script>var a=1;</script></head><body><nav><ul><li><a href='/'>Home</a></li></ul></nav><article><h1>Top 10 {topic}</h1>{filler}{body}{filler}</article></body></html>"
+    return html.encode("utf-8")
+
+class FixtureServer:
+    """Serves pre-rendered pages from memory on a local port"""
+    
+    def __init__(self, pages: Dict[str, bytes]):
+        self.pages = pages
+        pages_ref = pages
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = pages_ref.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+class FakeLLM:
+    """Stand-in for ChatGoogleGenerativeAI that waits a configurable time and echoes a scripted reply"""
+    
+    def __init__(self, latency: float, jitter: float, rate_limiter=None, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limiter = rate_limiter
+        self._rng = random.Random(seed)
+    
+    async def ainvoke(self, prompt: Any, reply: Optional[str] = None, **kwargs) -> SimpleNamespace:
+        import top10Scraper
+        
+        if self.rate_limiter is not None:
+            await self.rate_limiter.aacquire()
+        await asyncio.sleep(max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+        
+        text = str(prompt)
+        if reply is None:
+            # Text-only URL extraction: hand back the first URL in the prompt
+            match = re.search(r"https?://\S+", text)
+            reply = match.group(0) if match else ""
+        input_tokens, output_tokens = len(text) // 4, len(reply) // 4
+        top10Scraper.metrics.record_llm_call(input_tokens, output_tokens)
+        return SimpleNamespace(
+            content=reply,
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens},
+        )
+    
+    def with_structured_output(self, schema: Any) -> "FakeStructuredLLM":
+        return FakeStructuredLLM(self, schema)
+
+class FakeStructuredLLM:
+    """Text-mode extraction: answers with the synthetic list for the topic in the prompt"""
+    
+    def __init__(self, llm: FakeLLM, schema: Any):
+        self.llm = llm
+        self.schema = schema
+    
+    async def ainvoke(self, prompt: Any, **kwargs) -> Any:
+        topic_match = TOPIC_IN_TASK.search(str(prompt))
+        reply = json.dumps({"items": synthetic_items(topic_match.group(1) if topic_match else "")})
+        response = await self.llm.ainvoke(prompt, reply=reply)
+        return self.schema.model_validate_json(response.content)
+
+class FakeHistory:
+    """The parts of AgentHistoryList the scraper reads"""
+    
+    def __init__(self, steps: List[SimpleNamespace], final: Optional[str]):
+        self.history = steps
+        self._final = final
+    
+    def final_result(self) -> Optional[str]:
+        return self._final
+    
+    def has_errors(self) -> bool:
+        return False
+    
+    def errors(self) -> List[Optional[str]]:
+        return [None for _ in self.history]
+
+class ScriptedAgent:
+    """Replaces a browser_use Agent with a fixed number of fake LLM steps"""
+    
+    def __init__(self, harness: "OfflineHarness", task: str, llm: FakeLLM, **kwargs):
+        self.harness = harness
+        self.task = task
+        self.llm = llm
+    
+    async def run(self, max_steps: int = 100) -> FakeHistory:
+        topic_match = TOPIC_IN_TASK.search(self.task)
+        topic = topic_match.group(1) if topic_match else ""
+        
+        if "Search for a credible source" in self.task:
+            steps = self.harness.search_steps
+            final = f"The best source is {self.harness.url_for(topic)} - a well-researched list."
+        elif self.task.lstrip().startswith("Visit"):
+            steps = self.harness.scrape_steps
+            url_match = URL_IN_TASK.search(self.task)
+            items = synthetic_items(topic)
+            # Full scrapes of incomplete topics skip some ranks; follow-ups for missing ranks don't
+            if topic in self.harness.incomplete and "find ranks" not in self.task:
+                items = [item for item in items if item["rank"] not in INCOMPLETE_RANKS]
+            final = json.dumps({"items": items, "source_url": url_match.group(1) if url_match else None})
+        else:
+            steps = self.harness.search_steps
+            final = "https://docs.google.com/document/d/offline-benchmark"
+        
+        history = []
+        for step in range(min(steps, max_steps)):
+            reply = await self.llm.ainvoke(self.task, reply=f"step {step}")
+            history.append(SimpleNamespace(result=[SimpleNamespace(extracted_content=reply.content, error=None)]))
+        return FakeHistory(history, final)
+
+class FakeBrowser:
+    async def new_context(self):
+        return SimpleNamespace(close=_noop)
+    
+    async def close(self):
+        pass
+
+async def _noop():
+    pass
+
+class OfflineHarness:
+    """Patches top10Scraper to run against fakes and a local fixture server"""
+    
+    def __init__(
+        self,
+        topics: List[str],
+        llm_latency: float,
+        llm_jitter: float,
+        search_steps: int,
+        scrape_steps: int,
+        agent_fraction: float,
+        fixtures_dir: Optional[str] = None,
+        incomplete_fraction: float = 0.0,
+        domain_concurrency: int = 0,
+        domain_interval: float = 0.0,
+    ):
+        self.topics = topics
+        self.llm_latency = llm_latency
+        self.llm_jitter = llm_jitter
+        self.search_steps = search_steps
+        self.scrape_steps = scrape_steps
+        self.domain_concurrency = domain_concurrency
+        self.domain_interval = domain_interval
+        
+        recorded = []
+        if fixtures_dir:
+            recorded = sorted(
+                os.path.join(fixtures_dir, name) for name in os.listdir(fixtures_dir) if name.endswith((".html", ".htm"))
+            )
+        
+        pages: Dict[str, bytes] = {}
+        rng = random.Random(42)
+        for index, topic in enumerate(topics):
+            path = f"/lists/{topic_slug(topic)}.html"
+            if recorded:
+                with open(recorded[index % len(recorded)], "rb") as f:
+                    pages[path] = f.read()
+            else:
+                pages[path] = render_page(topic, fast_path=rng.random() >= agent_fraction)
+        self.server = FixtureServer(pages)
+        self.incomplete = {topic for topic in topics if rng.random() < incomplete_fraction}
+    
+    def url_for(self, topic: str) -> str:
+        return f"{self.server.base_url}/lists/{topic_slug(topic)}.html"
+    
+    def install(self):
+        import top10Scraper
+        from scraper.browser_pool import BrowserPool
+        from scraper.fetch_scheduler import FetchScheduler
+        
+        self.server.start()
+        # Every fixture is on one local host; only throttle it when asked to
+        top10Scraper.fetch_scheduler = FetchScheduler(self.domain_concurrency or None, self.domain_interval)
+        top10Scraper.build_llm = lambda rate_limiter=None: FakeLLM(self.llm_latency, self.llm_jitter, rate_limiter)
+        top10Scraper.create_agent = lambda **kwargs: ScriptedAgent(self, **kwargs)
+        # Scripted agents ignore their controller, so browser_use needn't be installed
+        top10Scraper.create_controller = lambda **kwargs: SimpleNamespace(**kwargs)
+        top10Scraper.get_scrape_controller.cache_clear()
+        
+        async def create_fake_browser(pool):
+            return FakeBrowser()
+        
+        BrowserPool._create_browser = create_fake_browser
+    
+    def uninstall(self):
+        import top10Scraper
+        
+        self.server.stop()
+        top10Scraper.get_scrape_controller.cache_clear()
+
+async def run_single(size: int, concurrency: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one batch in this process and return its measurements"""
+    import top10Scraper
+    
+    topics = [f"synthetic topic {index:05d}" for index in range(size)]
+    harness = OfflineHarness(
+        topics,
+        llm_latency=args.llm_latency,
+        llm_jitter=args.llm_jitter,
+        search_steps=args.search_steps,
+        scrape_steps=args.scrape_steps,
+        agent_fraction=args.agent_fraction,
+        fixtures_dir=args.fixtures_dir,
+        incomplete_fraction=args.incomplete_fraction,
+        domain_concurrency=args.domain_concurrency,
+        domain_interval=args.domain_interval,
+    )
+    harness.install()
+    if args.profile:
+        from scraper.profiling import TopicProfiler
+        
+        # One topic in the middle of the batch, profiled while the others run
+        top10Scraper.profiler = TopicProfiler(args.profile, [topics[len(topics) // 2]])
+        top10Scraper.profiler.install()
+    try:
+        with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w") as devnull:
+            with redirect_stdout(devnull):
+                started = time.perf_counter()
+                results = await top10Scraper.batch_scrape_topics(
+                    topics=topics,
+                    output_file=os.path.join(workdir, "results.json"),
+                    concurrency=concurrency,
+                    llm_rpm=args.llm_rpm,
+                    mode=args.mode,
+                )
+                elapsed = time.perf_counter() - started
+    finally:
+        harness.uninstall()
+    
+    stages: Dict[str, List[float]] = {}
+    for record in top10Scraper.metrics.records:
+        stages.setdefault(record.stage, []).append(record.wall_seconds)
+    stage_latency = {
+        stage: {"p50_ms": round(percentile(values, 0.5) * 1000, 2), "p95_ms": round(percentile(values, 0.95) * 1000, 2)}
+        for stage, values in stages.items()
+    }
+    
+    failures = top10Scraper.metrics.failures()
+    return {
+        "topics": size,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        # Throughput of a batch that lost topics would be meaningless
+        "topics_per_sec": round(size / elapsed, 2) if elapsed and len(results) == size else None,
+        "succeeded": len(results),
+        "failed": size - len(results),
+        "failures": [f"{record.topic}: {record.stage} {record.error}" for record in failures[:5]],
+        # ru_maxrss is reported in KB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "llm_calls": sum(r.llm_calls for r in top10Scraper.metrics.records if r.stage == "topic"),
+        "fast_path": top10Scraper.fast_path_stats.stats(),
+        "fetch_scheduler": top10Scraper.fetch_scheduler.stats(),
+        "complete_lists": sum(1 for result in results if not result.get("validation", {}).get("missing_ranks")),
+        "stages": stage_latency,
+    }
+
+def _parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark for batch_scrape_topics")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated topic counts")
+    parser.add_argument("--concurrency", default="4,16", help="Comma-separated concurrency settings")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="Fake LLM latency per call, in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.005, help="Uniform +/- jitter on the fake latency")
+    parser.add_argument("--llm-rpm", type=float, default=1_000_000, help="Rate limit passed to the batch")
+    parser.add_argument("--search-steps", type=int, default=4, help="LLM calls per scripted search agent")
+    parser.add_argument("--scrape-steps", type=int, default=6, help="LLM calls per scripted scrape agent")
+    parser.add_argument("--agent-fraction", type=float, default=0.2, help="Share of synthetic pages the fast path can't read")
+    parser.add_argument("--incomplete-fraction", type=float, default=0.0, help="Share of scrape agent results that come back missing ranks")
+    parser.add_argument("--domain-concurrency", type=int, default=0, help="Per-domain request limit for the fixture host (0 for no limit)")
+    parser.add_argument("--domain-interval", type=float, default=0.0, help="Seconds between requests to the fixture host")
+    parser.add_argument("--mode", choices=("agent", "text"), default="agent", help="Scrape mode passed to the batch")
+    parser.add_argument("--fixtures-dir", help="Serve recorded HTML pages from this directory instead of synthetic ones")
+    parser.add_argument("--output", help="Write the measurements as JSON to this file")
+    parser.add_argument("--profile", metavar="DIR", help="Profile one topic of each run into DIR/<topic>/")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.single:
+        # Child process: exactly one size and concurrency, so peak RSS is per run
+        size, concurrency = _parse_ints(args.sizes)[0], _parse_ints(args.concurrency)[0]
+        run = asyncio.run(run_single(size, concurrency, args))
+        print(json.dumps(run))
+        sys.exit(1 if run["failed"] else 0)
+    
+    runs = []
+    failed_runs = 0
+    passthrough = [
+        "--llm-latency", str(args.llm_latency),
+        "--llm-jitter", str(args.llm_jitter),
+        "--llm-rpm", str(args.llm_rpm),
+        "--search-steps", str(args.search_steps),
+        "--scrape-steps", str(args.scrape_steps),
+        "--agent-fraction", str(args.agent_fraction),
+        "--incomplete-fraction", str(args.incomplete_fraction),
+        "--domain-concurrency", str(args.domain_concurrency),
+        "--domain-interval", str(args.domain_interval),
+        "--mode", args.mode,
+    ]
+    if args.fixtures_dir:
+        passthrough += ["--fixtures-dir", args.fixtures_dir]
+    if args.profile:
+        passthrough += ["--profile", args.profile]
+    for size in _parse_ints(args.sizes):
+        for concurrency in _parse_ints(args.concurrency):
+            command = [
+                sys.executable, "-m", "scraper.benchmarks.offline", *passthrough,
+                "--sizes", str(size), "--concurrency", str(concurrency), "--single",
+            ]
+            completed = subprocess.run(command, capture_output=True, text=True)
+            lines = completed.stdout.strip().splitlines()
+            if not lines:
+                failed_runs += 1
+                print(f"Run with {size} topics at concurrency {concurrency} failed:\n{completed.stderr}")
+                continue
+            run = json.loads(lines[-1])
+            runs.append(run)
+            if run["failed"]:
+                failed_runs += 1
+                print(
+                    f"{size:>6} topics  concurrency {concurrency:>3}: FAILED, {run['failed']} of {size} topics failed, "
+                    f"e.g. {'; '.join(run['failures'][:3])}"
+                )
+                continue
+            slowest = max(run["stages"].items(), key=lambda pair: pair[1]["p95_ms"] if pair[0] != "topic" else 0)
+            print(
+                f"{size:>6} topics  concurrency {concurrency:>3}: {run['topics_per_sec']:>8.2f} topics/s  "
+                f"{run['seconds']:>8.2f} s  peak RSS {run['peak_rss_mb']:>7.1f} MB  "
+                f"topic p95 {run['stages'].get('topic', {}).get('p95_ms', 0):>8.1f} ms  "
+                f"complete {run['complete_lists']}/{run['succeeded']}  "
+                f"slowest stage {slowest[0]} (p95 {slowest[1]['p95_ms']:.1f} ms)"
+            )
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(runs, f, indent=2)
+        print(f"Measurements written to {args.output}")
+    if failed_runs:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
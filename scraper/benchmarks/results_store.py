@@ -0,0 +1,99 @@
+"""
+Query latency and export throughput of the indexed results store
+
+Fills a store with synthetic lists, then times the queries the CLI offers
+(item search, lists by domain, stale lists, lookup by topic) and a
+streaming export to the legacy JSON, compared with loading and scanning
+that JSON the way consumers do today.
+
+    python -m scraper.benchmarks.results_store
+    python -m scraper.benchmarks.results_store --topics 100000 --queries 500
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from scraper.results_store import ResultsStore
+
+WORDS = (
+    "falcon river castle comet violin orchid glacier pyramid lantern harbor "
+    "meadow canyon tiger marble compass saffron beacon velvet thunder quartz"
+).split()
+
+DOMAINS = ["wikipedia.org", "britannica.com", "nationalgeographic.com", "example.com", "statista.com"]
+
+def synthetic_results(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "topic": f"synthetic topic {index:06d}",
+            "source_url": f"https://www.{DOMAINS[index % len(DOMAINS)]}/lists/{index}",
+            "items": [
+                {
+                    "rank": rank,
+                    "name": f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {index}-{rank}",
+                    "details": " ".join(rng.choice(WORDS) for _ in range(8)),
+                }
+                for rank in range(1, 11)
+            ],
+            "validation": {"score": 1.0, "issues": [], "repairs": [], "missing_ranks": []},
+        }
+        for index in range(count)
+    ]
+
+def time_queries(name: str, queries: int, run: Callable[[int], Any]):
+    timings = []
+    for index in range(queries):
+        started = time.perf_counter()
+        run(index)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{name:<22}: p50 {statistics.median(timings):7.2f} ms  p99 {p99:7.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark results store queries and export")
+    parser.add_argument("--topics", type=int, default=50_000, help="Synthetic lists to store")
+    parser.add_argument("--queries", type=int, default=200, help="Queries timed per kind")
+    args = parser.parse_args()
+    
+    results = synthetic_results(args.topics)
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as workdir:
+        store = ResultsStore(os.path.join(workdir, "store.sqlite"), batch_size=1_000)
+        started = time.perf_counter()
+        for result in results:
+            store.write(result)
+        store.flush()
+        elapsed = time.perf_counter() - started
+        print(f"load                  : {args.topics / elapsed:>8.0f} lists/s  ({elapsed:.2f} s)")
+        
+        time_queries("find item (2 words)", args.queries, lambda _: store.find_item(" ".join(rng.sample(WORDS, 2))))
+        time_queries("find item (exact)", args.queries, lambda i: store.find_item(f"{i % args.topics}-3"))
+        time_queries("lists by domain", args.queries, lambda i: store.lists_by_domain(DOMAINS[i % len(DOMAINS)]))
+        time_queries("stale lists", args.queries, lambda _: store.stale_lists(0))
+        time_queries("get topic", args.queries, lambda i: store.get(f"Synthetic Topic {i * 7 % args.topics:06d}"))
+        
+        export_path = os.path.join(workdir, "export.json")
+        started = time.perf_counter()
+        written = store.export_json(export_path)
+        elapsed = time.perf_counter() - started
+        print(f"streaming export      : {written / elapsed:>8.0f} lists/s  ({elapsed:.2f} s)")
+        store.close()
+        
+        # Today's consumers: load the whole array, then scan it
+        started = time.perf_counter()
+        with open(export_path, "r", encoding="utf-8") as f:
+            loaded = json.load(f)
+        needle = f"{args.topics // 2}-3"
+        matches = [result["topic"] for result in loaded for item in result["items"] if needle in item["name"]]
+        elapsed = time.perf_counter() - started
+        print(f"legacy load + scan    : {elapsed * 1000:8.1f} ms for one item search ({len(matches)} match)")
+
+if __name__ == "__main__":
+    main()
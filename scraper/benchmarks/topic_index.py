@@ -0,0 +1,62 @@
+"""
+Lookup latency of the near-duplicate topic index at scale
+
+Indexes synthetic topics built from a small vocabulary (so many share
+words, like real category backfills) and times lookups of paraphrases
+and unseen topics.
+
+    python -m scraper.benchmarks.topic_index
+    python -m scraper.benchmarks.topic_index --topics 100000 --lookups 5000
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from scraper.metrics import percentile
+from scraper.topic_index import TopicIndex
+
+ADJECTIVES = ["smallest", "largest", "fastest", "tallest", "oldest", "best", "worst", "most expensive", "cheapest", "hottest", "deadliest", "rarest"]
+PLACES = ["", "in the world", "in the united states", "in europe", "in africa", "in asia", "in canada", "in australia", "in japan", "in brazil"]
+
+def synthetic_topics(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    topics = []
+    for index in range(count):
+        noun = f"thing{index % (count // 20 or 1)}s"
+        topics.append(" ".join(part for part in (rng.choice(ADJECTIVES), noun, rng.choice(PLACES), str(1900 + index % 120)) if part))
+    return topics
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate topic lookups")
+    parser.add_argument("--topics", type=int, default=100_000, help="Topics in the index")
+    parser.add_argument("--lookups", type=int, default=2_000, help="Lookups to time")
+    parser.add_argument("--threshold", type=float, default=0.75, help="Similarity threshold")
+    args = parser.parse_args()
+    
+    topics = synthetic_topics(args.topics)
+    index = TopicIndex(args.threshold)
+    started = time.perf_counter()
+    index.add_many(topics)
+    build_seconds = time.perf_counter() - started
+    
+    rng = random.Random(1)
+    # Half paraphrases of indexed topics, half topics that were never seen
+    queries = [rng.choice(topics).replace("in the united states", "in the US").replace("largest", "biggest") for _ in range(args.lookups // 2)]
+    queries += [f"{rng.choice(ADJECTIVES)} unseen{n}s {rng.choice(PLACES)}" for n in range(args.lookups - len(queries))]
+    
+    durations = []
+    hits = 0
+    for query in queries:
+        started = time.perf_counter()
+        hits += index.lookup(query) is not None
+        durations.append(time.perf_counter() - started)
+    
+    print(f"Indexed {len(index)} topics in {build_seconds:.2f} s")
+    print(
+        f"{len(queries)} lookups: p50 {percentile(durations, 0.5) * 1e6:.0f} us, p99 {percentile(durations, 0.99) * 1e6:.0f} us, "
+        f"max {max(durations) * 1e6:.0f} us, {hits} matches"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+# Chrome executable used when scraping with the local browser
+LOCAL_CHROME_PATH = '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'  # macOS path
+
+def make_browser_config(use_local_browser: bool = False):
+    """
+    Build the BrowserConfig used for pooled browsers
+    
+    Args:
+        use_local_browser: Whether to connect to the local Chrome installation
+    
+    Returns:
+        A browser_use BrowserConfig
+    """
+    from browser_use import BrowserConfig
+    
+    if use_local_browser:
+        return BrowserConfig(
+            headless=False,  # Set to True to run without UI
+            disable_security=True,
+            # Specify the path to your Chrome executable if connecting to your real browser
+            chrome_instance_path=LOCAL_CHROME_PATH,
+        )
+    return BrowserConfig()
+
+class BrowserLease:
+    """A browser and context handed out by the pool for the duration of one topic"""
+    
+    def __init__(self, browser, context):
+        self.browser = browser
+        self.context = context
+
+class _PoolSlot:
+    """One warm browser in the pool plus its current context"""
+    
+    def __init__(self, index: int):
+        self.index = index
+        self.browser = None
+        self.context = None
+        self.uses = 0
+        self.launched = False
+
+class BrowserPool:
+    """
+    Keeps a fixed number of warm browsers and leases their contexts to agents
+    
+    Each slot owns one Browser that is launched on first use and kept open
+    until close(). A slot's context is reused across leases and recycled after
+    `max_uses` leases. When a lease exits with an exception the slot's browser
+    is closed as well, since it may have crashed, and the next lease
+    relaunches it.
+    """
+    
+    def __init__(self, size: int = 1, max_uses: int = 20, use_local_browser: bool = False):
+        """
+        Args:
+            size: Number of browsers kept warm
+            max_uses: Number of leases after which a context is recycled
+            use_local_browser: Whether pooled browsers use the local Chrome installation
+        """
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.use_local_browser = use_local_browser
+        self._idle: "asyncio.Queue[_PoolSlot]" = asyncio.Queue()
+        self._slots = [_PoolSlot(index) for index in range(self.size)]
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+        self._closed = False
+        
+        # Counters exposed through stats()
+        self.leases = 0
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.crashes = 0
+        self.relaunched = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+    
+    async def _create_browser(self):
+        from browser_use import Browser
+        return Browser(config=make_browser_config(self.use_local_browser))
+    
+    async def _close_context(self, slot: _PoolSlot):
+        context, slot.context, slot.uses = slot.context, None, 0
+        if context is not None:
+            try:
+                await context.close()
+            except Exception as e:
+                print(f"Error closing browser context: {str(e)}")
+    
+    async def _close_browser(self, slot: _PoolSlot):
+        await self._close_context(slot)
+        browser, slot.browser = slot.browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"Error closing browser: {str(e)}")
+    
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Lease a warm browser context, waiting for a free slot if needed
+        
+        Yields:
+            A BrowserLease with the browser and its context
+        """
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+        
+        started = time.perf_counter()
+        slot = await self._idle.get()
+        waited = time.perf_counter() - started
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.leases += 1
+        
+        try:
+            if slot.browser is None:
+                if slot.launched:
+                    self.relaunched += 1
+                slot.browser = await self._create_browser()
+                slot.launched = True
+            if slot.context is None:
+                self.misses += 1
+                slot.context = await slot.browser.new_context()
+            else:
+                self.hits += 1
+            slot.uses += 1
+        except BaseException:
+            # A browser that cannot open a context is relaunched next time
+            await self._close_browser(slot)
+            self._idle.put_nowait(slot)
+            raise
+        
+        try:
+            yield BrowserLease(slot.browser, slot.context)
+        except BaseException:
+            # Never hand a context, or a browser, that saw a crash to the next topic
+            self.crashes += 1
+            self.recycled += 1
+            await self._close_browser(slot)
+            raise
+        else:
+            if slot.uses >= self.max_uses:
+                self.recycled += 1
+                await self._close_context(slot)
+        finally:
+            self._idle.put_nowait(slot)
+    
+    async def close(self):
+        """Close every context and browser owned by the pool"""
+        self._closed = True
+        for slot in self._slots:
+            await self._close_browser(slot)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Lease, hit/miss, recycle, relaunch and wait-time counters for the pool
+        """
+        return {
+            "size": self.size,
+            "leases": self.leases,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recycled": self.recycled,
+            "crashes": self.crashes,
+            "relaunched": self.relaunched,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "wait_seconds_max": round(self.wait_seconds_max, 3),
+        }
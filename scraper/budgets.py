@@ -0,0 +1,213 @@
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Wall-clock limit for everything one topic does, in seconds
+DEFAULT_TOPIC_DEADLINE = 600.0
+
+# How often a running stage is checked against its token ceiling, in seconds
+TOKEN_CHECK_INTERVAL = 0.25
+
+class StageBudget:
+    """Limits for one stage of a topic; None means unlimited"""
+    
+    def __init__(self, max_steps: Optional[int] = None, deadline_seconds: Optional[float] = None, max_tokens: Optional[int] = None):
+        self.max_steps = max_steps
+        self.deadline_seconds = deadline_seconds
+        self.max_tokens = max_tokens
+    
+    def __repr__(self) -> str:
+        return f"StageBudget(max_steps={self.max_steps}, deadline_seconds={self.deadline_seconds}, max_tokens={self.max_tokens})"
+    
+    def describe(self) -> str:
+        parts = []
+        if self.max_steps is not None:
+            parts.append(f"{self.max_steps} steps")
+        if self.deadline_seconds is not None:
+            parts.append(f"{self.deadline_seconds:g}s")
+        if self.max_tokens is not None:
+            parts.append(f"{self.max_tokens} tokens")
+        return ", ".join(parts) or "unlimited"
+
+# Budgets for the agent and LLM stages, generous enough for well-behaved sites
+DEFAULT_STAGE_BUDGETS = {
+    "search": StageBudget(max_steps=25, deadline_seconds=180, max_tokens=250_000),
+    "url_extraction": StageBudget(deadline_seconds=30, max_tokens=20_000),
+    "text_extract": StageBudget(deadline_seconds=60, max_tokens=50_000),
+    "scrape": StageBudget(max_steps=30, deadline_seconds=240, max_tokens=300_000),
+    "rescrape": StageBudget(max_steps=12, deadline_seconds=120, max_tokens=100_000),
+    "gdoc": StageBudget(max_steps=40, deadline_seconds=300, max_tokens=300_000),
+}
+
+class BudgetExceeded(Exception):
+    """A stage or topic ran past its budget and was cancelled"""
+    
+    def __init__(self, stage: str, reason: str, elapsed: float, steps: int = 0, tokens: int = 0):
+        """
+        Args:
+            stage: Stage that was running
+            reason: "steps", "deadline", "tokens" or "topic_deadline"
+            elapsed: Seconds the stage ran
+            steps: Agent steps taken, when known
+            tokens: LLM tokens used by the stage
+        """
+        super().__init__(f"{stage} budget exceeded: {reason} after {elapsed:.1f}s ({steps} steps, {tokens} tokens)")
+        self.stage = stage
+        self.reason = reason
+        self.elapsed = elapsed
+        self.steps = steps
+        self.tokens = tokens
+        # Short code recorded by MetricsRecorder on the failed stage
+        self.error_code = f"budget_{reason}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "reason": self.reason,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "steps": self.steps,
+            "tokens": self.tokens,
+        }
+
+class ScrapeBudgets:
+    """Per-stage budgets plus a deadline covering every stage of a topic"""
+    
+    def __init__(self, stages: Optional[Dict[str, StageBudget]] = None, topic_deadline_seconds: Optional[float] = DEFAULT_TOPIC_DEADLINE):
+        """
+        Args:
+            stages: Budget per stage name; stages not listed are unlimited
+            topic_deadline_seconds: Wall-clock limit for a whole topic (None disables)
+        """
+        self.stages = dict(DEFAULT_STAGE_BUDGETS if stages is None else stages)
+        self.topic_deadline_seconds = topic_deadline_seconds
+    
+    def for_stage(self, stage: str) -> StageBudget:
+        return self.stages.get(stage) or StageBudget()
+    
+    def topic_deadline(self) -> Optional[float]:
+        """
+        Returns:
+            The time.monotonic() value a topic starting now must finish by
+        """
+        if self.topic_deadline_seconds is None:
+            return None
+        return time.monotonic() + self.topic_deadline_seconds
+    
+    def describe(self) -> str:
+        stages = "; ".join(f"{stage} {budget.describe()}" for stage, budget in self.stages.items())
+        deadline = "none" if self.topic_deadline_seconds is None else f"{self.topic_deadline_seconds:g}s"
+        return f"topic deadline {deadline}; {stages}"
+
+def _parse_number(value: str) -> float:
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([kKmM]?)", value.strip())
+    if not match:
+        raise ValueError(f"Invalid number: {value!r}")
+    return float(match.group(1)) * {"": 1, "k": 1_000, "m": 1_000_000}[match.group(2).lower()]
+
+def parse_stage_budget(spec: str) -> Dict[str, StageBudget]:
+    """
+    Parse a --budget value such as "search=steps:20,deadline:120,tokens:150k"
+    
+    Limits not given keep their defaults, and "none" removes one
+    ("scrape=tokens:none").
+    
+    Returns:
+        A one-entry mapping from stage name to its budget
+    
+    Raises:
+        ValueError: If the spec is malformed or names an unknown stage
+    """
+    stage, separator, limits = spec.partition("=")
+    stage = stage.strip()
+    if not separator or not stage:
+        raise ValueError(f"Invalid budget {spec!r}, expected STAGE=steps:N,deadline:SECONDS,tokens:N")
+    # A misspelt stage would otherwise be ignored and leave the real one at its default
+    if stage not in DEFAULT_STAGE_BUDGETS:
+        raise ValueError(f"Unknown budget stage {stage!r} in {spec!r}, expected one of: {', '.join(DEFAULT_STAGE_BUDGETS)}")
+    
+    default = DEFAULT_STAGE_BUDGETS[stage]
+    values = {"steps": default.max_steps, "deadline": default.deadline_seconds, "tokens": default.max_tokens}
+    for limit in limits.split(","):
+        name, _, value = limit.partition(":")
+        name = name.strip()
+        if name not in values or not value.strip():
+            raise ValueError(f"Invalid budget limit {limit!r} in {spec!r}")
+        values[name] = None if value.strip() == "none" else _parse_number(value.rstrip("s"))
+    
+    return {stage: StageBudget(
+        max_steps=None if values["steps"] is None else int(values["steps"]),
+        deadline_seconds=values["deadline"],
+        max_tokens=None if values["tokens"] is None else int(values["tokens"]),
+    )}
+
+async def run_with_budget(
+    stage: str,
+    run: Callable[[Optional[int]], Awaitable[Any]],
+    budget: StageBudget,
+    record: Any = None,
+    deadline: Optional[float] = None,
+) -> Any:
+    """
+    Run a stage as a task and cancel it as soon as it breaks its budget
+    
+    Args:
+        stage: Stage name, used in the failure
+        run: Called with the step limit (or None) to start the stage
+        budget: Limits for this stage
+        record: The stage's metrics StageRecord, read for token usage
+        deadline: time.monotonic() value the topic must finish by
+    
+    Returns:
+        Whatever `run` returns
+    
+    Raises:
+        BudgetExceeded: The stage was cancelled, or an agent used every step without finishing
+    """
+    started = time.monotonic()
+    limit = None if budget.deadline_seconds is None else started + budget.deadline_seconds
+    topic_limited = deadline is not None and (limit is None or deadline < limit)
+    if topic_limited:
+        limit = deadline
+    
+    def tokens_used() -> int:
+        return (record.input_tokens + record.output_tokens) if record is not None else 0
+    
+    def exceeded(reason: str) -> BudgetExceeded:
+        return BudgetExceeded(stage, reason, time.monotonic() - started, getattr(record, "steps", 0), tokens_used())
+    
+    if limit is not None and limit <= started:
+        raise exceeded("topic_deadline")
+    
+    task = asyncio.ensure_future(run(budget.max_steps))
+    reason = None
+    try:
+        while reason is None:
+            wait = None if limit is None else max(0.0, limit - time.monotonic())
+            if budget.max_tokens is not None and record is not None:
+                wait = TOKEN_CHECK_INTERVAL if wait is None else min(wait, TOKEN_CHECK_INTERVAL)
+            done, _ = await asyncio.wait({task}, timeout=wait)
+            if done:
+                break
+            if limit is not None and time.monotonic() >= limit:
+                reason = "topic_deadline" if topic_limited else "deadline"
+            elif budget.max_tokens is not None and tokens_used() > budget.max_tokens:
+                reason = "tokens"
+    finally:
+        # Also runs when the caller itself is cancelled
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except BaseException:
+                pass
+    
+    if reason is not None:
+        raise exceeded(reason)
+    
+    result = task.result()
+    # An agent that used every step without finishing hit its step budget
+    history = getattr(result, "history", None)
+    if budget.max_steps is not None and history is not None and len(history) >= budget.max_steps and not result.final_result():
+        raise exceeded("steps")
+    return result
@@ -0,0 +1,349 @@
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from scraper.result_cache import normalize_topic
+from scraper.result_sink import ResultSink
+
+# Topics upserted per transaction
+DEFAULT_DB_BATCH_SIZE = 50
+
+# Namespace for the deterministic list and item ids
+LIST_ID_NAMESPACE = uuid.UUID("8f2d6c1e-3b7a-4e59-9c0d-5a1f7e2b9c44")
+
+# Mirrors the app's lists / list_items tables, for local testing
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lists (
+    id TEXT PRIMARY KEY,
+    category_id TEXT,
+    title TEXT NOT NULL,
+    description TEXT,
+    source_url TEXT,
+    reference_info TEXT,
+    year INTEGER,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_lists_title_source ON lists (title, source_url);
+CREATE TABLE IF NOT EXISTS list_items (
+    id TEXT PRIMARY KEY,
+    list_id TEXT NOT NULL REFERENCES lists (id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    details TEXT,
+    statistic TEXT,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_list_items_list_rank ON list_items (list_id, rank);
+"""
+
+LIST_COLUMNS = ("id", "category_id", "title", "source_url", "created_at", "updated_at")
+ITEM_COLUMNS = ("id", "list_id", "rank", "name", "details", "created_at", "updated_at")
+
+def _uuid5(namespace: bytes, name: str) -> str:
+    """uuid.uuid5() as a string, without building UUID objects (ids are computed for every item)"""
+    digest = bytearray(hashlib.sha1(namespace + name.encode("utf-8")).digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50
+    digest[8] = (digest[8] & 0x3F) | 0x80
+    value = digest.hex()
+    return f"{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}"
+
+def list_id(topic: str, source_url: Optional[str]) -> str:
+    """
+    Returns:
+        The id a topic's list gets for a given source, the same on every run
+    """
+    return _uuid5(LIST_ID_NAMESPACE.bytes, f"{normalize_topic(topic)}\n{source_url or ''}")
+
+def item_id(list_id: str, rank: int) -> str:
+    """
+    Returns:
+        The id of the item at a rank of a list, the same on every run
+    """
+    return _uuid5(bytes.fromhex(list_id.replace("-", "")), str(rank))
+
+class SqliteBackend:
+    """A SQLite database with the app's lists / list_items schema"""
+    
+    placeholder = "?"
+    
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SQLITE_SCHEMA)
+        # SQLite before 3.32 allows 999 bound parameters per statement
+        self.max_params = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+    
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """Yield a cursor inside one write transaction"""
+        cursor = self._conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+    
+    def close(self):
+        self._conn.close()
+
+class PostgresBackend:
+    """
+    A Postgres database (e.g. the app's Supabase project) reached through a
+    psycopg connection pool
+    
+    psycopg and psycopg_pool are only needed when this backend is used.
+    """
+    
+    placeholder = "%s"
+    max_params = 65535
+    
+    def __init__(self, dsn: str, pool_size: int = 2):
+        """
+        Args:
+            dsn: Postgres connection string
+            pool_size: Connections kept open in the pool
+        """
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError as e:
+            raise ImportError("The Postgres sink needs psycopg: pip install 'psycopg[binary]' psycopg_pool") from e
+        self._pool = ConnectionPool(dsn, min_size=1, max_size=max(1, pool_size), open=True)
+    
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """Yield a cursor inside one transaction on a pooled connection"""
+        with self._pool.connection() as conn:
+            with conn.transaction():
+                with conn.cursor() as cursor:
+                    yield cursor
+    
+    def close(self):
+        self._pool.close()
+
+def open_backend(url: str):
+    """
+    Args:
+        url: postgres:// or postgresql:// connection string, sqlite:///path,
+            or a plain path to a SQLite file
+    
+    Returns:
+        The matching database backend
+    """
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresBackend(url)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return SqliteBackend(url)
+
+class DatabaseResultSink(ResultSink):
+    """
+    Upserts results into the lists / list_items tables in batches
+    
+    Results are buffered and written `batch_size` topics at a time: one
+    transaction with a multi-row upsert for the lists, one for their items
+    and one delete for items a list no longer has. List ids are derived from
+    (topic, source_url), so writing the same result twice, or re-running a
+    batch, updates the rows instead of duplicating them. A list the app
+    already holds under another id, with the same title and source, is
+    updated in place.
+    
+    If a batch fails, its lists are retried one transaction each, and any
+    that still fail are logged and dropped, so one bad row never blocks the
+    rest of the run.
+    """
+    
+    def __init__(self, backend, batch_size: int = DEFAULT_DB_BATCH_SIZE, category_id: Optional[str] = None):
+        """
+        Args:
+            backend: SqliteBackend or PostgresBackend
+            batch_size: Topics buffered before a transaction is written
+            category_id: Optional category assigned to every list written
+        """
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.category_id = category_id
+        self.lists_written = 0
+        self.items_written = 0
+        self.transactions = 0
+        self.rejected = 0
+        self.write_seconds = 0.0
+        self._pending: Dict[str, Dict[str, Any]] = {}
+    
+    def write(self, result: Dict[str, Any]):
+        """
+        Buffer one result, writing the batch once it is full
+        
+        Args:
+            result: Result dictionary for a single topic
+        """
+        if not result.get("items"):
+            return
+        # A later result for the same list replaces the buffered one
+        self._pending[list_id(result["topic"], result.get("source_url"))] = result
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+    
+    def _existing_ids(self, cursor, results: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Returns:
+            The id of every list already stored under a result's title and
+            source, keyed by the result's derived id, where the two differ
+        """
+        wanted = {(result["topic"], result.get("source_url")): id_ for id_, result in results.items() if result.get("source_url")}
+        titles = sorted({title for title, _ in wanted})
+        placeholder = self.backend.placeholder
+        existing = {}
+        for start in range(0, len(titles), self.backend.max_params):
+            chunk = titles[start:start + self.backend.max_params]
+            cursor.execute(f"SELECT id, title, source_url FROM lists WHERE title IN ({', '.join([placeholder] * len(chunk))})", chunk)
+            for stored_id, title, source_url in cursor.fetchall():
+                id_ = wanted.get((title, source_url))
+                # psycopg returns uuid columns as UUID objects
+                if id_ is not None and str(stored_id) != id_:
+                    existing[id_] = str(stored_id)
+        return existing
+    
+    def _rows(self, results: Dict[str, Dict[str, Any]]) -> Tuple[List[Tuple], List[Tuple]]:
+        now = datetime.now(timezone.utc).isoformat()
+        list_rows, item_rows = [], []
+        for id_, result in results.items():
+            list_rows.append((id_, self.category_id, result["topic"], result.get("source_url"), now, now))
+            namespace = bytes.fromhex(id_.replace("-", ""))
+            ranks = set()
+            for item in result["items"]:
+                if item["rank"] in ranks:
+                    continue
+                ranks.add(item["rank"])
+                item_rows.append((_uuid5(namespace, str(item["rank"])), id_, item["rank"], item["name"], item.get("details"), now, now))
+        return list_rows, item_rows
+    
+    def _upsert(self, cursor, table: str, columns: Sequence[str], rows: List[Tuple], update: Sequence[str]):
+        """Upsert rows with as few multi-row INSERT statements as the parameter limit allows"""
+        row_sql = "(" + ", ".join([self.backend.placeholder] * len(columns)) + ")"
+        per_statement = max(1, self.backend.max_params // len(columns))
+        assignments = ", ".join(f"{column} = excluded.{column}" for column in update)
+        for start in range(0, len(rows), per_statement):
+            chunk = rows[start:start + per_statement]
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(chunk))} "
+                f"ON CONFLICT (id) DO UPDATE SET {assignments}",
+                [value for row in chunk for value in row],
+            )
+    
+    def flush(self):
+        """Write every buffered result in one transaction, isolating bad rows if it fails"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            self._write_batch(pending)
+        except Exception as e:
+            if len(pending) == 1:
+                self._reject(next(iter(pending.values())), e)
+                return
+            print(f"Writing {len(pending)} lists to the database failed ({str(e)}), retrying them one at a time")
+            for id_, result in pending.items():
+                try:
+                    self._write_batch({id_: result})
+                except Exception as e:
+                    self._reject(result, e)
+    
+    def _reject(self, result: Dict[str, Any], error: Exception):
+        self.rejected += 1
+        print(f"Dropped {result['topic']} ({result.get('source_url')}) from the database sink: {str(error)}")
+    
+    def _write_batch(self, results: Dict[str, Dict[str, Any]]):
+        """Upsert results, keyed by their derived list id, in one transaction"""
+        started = time.perf_counter()
+        placeholder = self.backend.placeholder
+        # Keep a category set in the admin page unless one was given
+        list_update = ("title", "source_url", "updated_at") + (("category_id",) if self.category_id else ())
+        with self.backend.transaction() as cursor:
+            existing = self._existing_ids(cursor, results)
+            if existing:
+                results = {existing.get(id_, id_): result for id_, result in results.items()}
+            list_rows, item_rows = self._rows(results)
+            self._upsert(cursor, "lists", LIST_COLUMNS, list_rows, list_update)
+            # Items at ranks a list no longer has, or stored by the app under
+            # other ids, go first so the upsert can't collide on (list_id, rank)
+            list_ids = [row[0] for row in list_rows]
+            item_ids = [row[0] for row in item_rows]
+            if len(list_ids) + len(item_ids) <= self.backend.max_params:
+                cursor.execute(
+                    f"DELETE FROM list_items WHERE list_id IN ({', '.join([placeholder] * len(list_ids))}) "
+                    f"AND id NOT IN ({', '.join([placeholder] * len(item_ids))})",
+                    list_ids + item_ids,
+                )
+            else:
+                for id_, result in results.items():
+                    ids = [item_id(id_, item["rank"]) for item in result["items"]]
+                    cursor.execute(
+                        f"DELETE FROM list_items WHERE list_id = {placeholder} AND id NOT IN ({', '.join([placeholder] * len(ids))})",
+                        [id_] + ids,
+                    )
+            self._upsert(cursor, "list_items", ITEM_COLUMNS, item_rows, ("rank", "name", "details", "updated_at"))
+        self.lists_written += len(list_rows)
+        self.items_written += len(item_rows)
+        self.transactions += 1
+        self.write_seconds += time.perf_counter() - started
+    
+    def close(self):
+        """Write what is buffered and close the database"""
+        try:
+            self.flush()
+        finally:
+            self.backend.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Lists and items written, lists dropped after a failed write,
+            transactions and total write time
+        """
+        return {
+            "lists": self.lists_written,
+            "items": self.items_written,
+            "rejected": self.rejected,
+            "transactions": self.transactions,
+            "write_seconds": round(self.write_seconds, 3),
+        }
+
+def open_db_sink(url: str, batch_size: int = DEFAULT_DB_BATCH_SIZE, category_id: Optional[str] = None) -> DatabaseResultSink:
+    """
+    Args:
+        url: Database to write to (see open_backend)
+        batch_size: Topics per transaction
+        category_id: Optional category assigned to every list written
+    
+    Returns:
+        A database sink
+    """
+    return DatabaseResultSink(open_backend(url), batch_size, category_id)
+
+if __name__ == "__main__":
+    # Usage: python -m scraper.db_sink results.json DATABASE_URL [batch_size]
+    with open(sys.argv[1], encoding="utf-8") as f:
+        results = json.load(f)
+    sink = open_db_sink(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_DB_BATCH_SIZE)
+    try:
+        for result in results:
+            sink.write(result)
+    finally:
+        sink.close()
+    print(f"Loaded {json.dumps(sink.stats())} into {sys.argv[2]}")
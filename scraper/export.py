@@ -0,0 +1,404 @@
+import asyncio
+import html
+import os
+import re
+import time
+import zipfile
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from xml.sax.saxutils import escape as xml_escape
+
+# Formats the exporter can write, and their file extensions
+EXPORT_FORMATS = {"markdown": ".md", "html": ".html", "docx": ".docx"}
+
+# File name (without extension) of the combined document
+DEFAULT_COMBINED_NAME = "top10_lists"
+
+# Results waiting to be rendered before submit() starts dropping them
+DEFAULT_MAX_PENDING = 10000
+
+def document_title(topic: str) -> str:
+    """The title used for a topic's document, e.g. "Top 10 Smallest Birds" """
+    return f"Top 10 {topic.title()}"
+
+def document_slug(topic: str) -> str:
+    """
+    Returns:
+        A file-system safe name for a topic's document
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")
+    return slug[:100] or "topic"
+
+class DocumentSlugs:
+    """
+    Hands out one slug per distinct topic
+    
+    Topics whose slugs collide ("Fastest Cars", "fastest cars!") get a
+    numeric suffix ("fastest-cars-2") instead of overwriting each other's
+    documents. Asking again for the same topic returns its first slug.
+    """
+    
+    def __init__(self):
+        self._by_topic: Dict[str, str] = {}
+        self._taken: Set[str] = set()
+    
+    def __call__(self, topic: str) -> str:
+        slug = self._by_topic.get(topic)
+        if slug is None:
+            base = slug = document_slug(topic)
+            suffix = 2
+            while slug in self._taken:
+                slug = f"{base}-{suffix}"
+                suffix += 1
+            self._by_topic[topic] = slug
+            self._taken.add(slug)
+        return slug
+
+def _items(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return sorted(result.get("items") or [], key=lambda item: item.get("rank") or 0)
+
+def render_markdown(results: List[Dict[str, Any]], title: Optional[str] = None) -> str:
+    """
+    Render results as Markdown
+    
+    A single result gets the same layout the Google Docs agent typed in.
+    With a title, each result becomes a section under it.
+    
+    Args:
+        results: Result dictionaries with 'topic', 'source_url' and 'items'
+        title: Optional heading for a combined document
+    
+    Returns:
+        The Markdown text
+    """
+    lines = []
+    level = "#"
+    if title:
+        lines += [f"# {title}", ""]
+        level = "##"
+    for result in results:
+        lines += [f"{level} {document_title(result['topic'])}", ""]
+        if result.get("source_url"):
+            lines += [f"Source: {result['source_url']}", ""]
+        for item in _items(result):
+            lines.append(f"{level}# {item.get('rank')}. {item.get('name')}")
+            if item.get("details"):
+                lines.append(item["details"])
+            lines.append("")
+    return "\n".join(lines)
+
+def render_html(results: List[Dict[str, Any]], title: Optional[str] = None) -> str:
+    """
+    Render results as a standalone HTML page
+    
+    Args:
+        results: Result dictionaries with 'topic', 'source_url' and 'items'
+        title: Optional page title for a combined document, which also gets
+            a table of contents
+    
+    Returns:
+        The HTML document
+    """
+    page_title = title or (document_title(results[0]["topic"]) if results else "Top 10")
+    slugs = DocumentSlugs()
+    anchors = [slugs(result["topic"]) for result in results]
+    body = []
+    if title:
+        body.append(f"<h1>{html.escape(title)}</h1>")
+        body.append("<ul>")
+        for result, anchor in zip(results, anchors):
+            body.append(f'<li><a href="#{anchor}">{html.escape(document_title(result["topic"]))}</a></li>')
+        body.append("</ul>")
+    heading = "h2" if title else "h1"
+    for result, anchor in zip(results, anchors):
+        body.append(f'<section id="{anchor}">')
+        body.append(f"<{heading}>{html.escape(document_title(result['topic']))}</{heading}>")
+        if result.get("source_url"):
+            url = html.escape(result["source_url"], quote=True)
+            body.append(f'<p>Source: <a href="{url}">{url}</a></p>')
+        body.append("<ol>")
+        for item in _items(result):
+            details = f"<p>{html.escape(item['details'])}</p>" if item.get("details") else ""
+            body.append(f'<li value="{int(item.get("rank") or 0)}"><strong>{html.escape(str(item.get("name")))}</strong>{details}</li>')
+        body.append("</ol>")
+        body.append("</section>")
+    return "\n".join([
+        "<!DOCTYPE html>",
+        '<html lang="en">',
+        "<head>",
+        '<meta charset="utf-8">',
+        f"<title>{html.escape(page_title)}</title>",
+        "<style>body{font-family:sans-serif;max-width:48em;margin:2em auto;line-height:1.5}li{margin-bottom:.75em}li p{margin:.25em 0 0}</style>",
+        "</head>",
+        "<body>",
+        *body,
+        "</body>",
+        "</html>",
+        "",
+    ])
+
+_DOCX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+</Types>"""
+
+_DOCX_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+_DOCX_DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+_DOCX_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:pPr><w:spacing w:after="120"/></w:pPr></w:style>
+<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/><w:pPr><w:outlineLvl w:val="0"/></w:pPr><w:rPr><w:b/><w:sz w:val="48"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/><w:pPr><w:spacing w:before="240"/><w:outlineLvl w:val="0"/></w:pPr><w:rPr><w:b/><w:sz w:val="36"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/><w:basedOn w:val="Normal"/><w:pPr><w:spacing w:before="200"/><w:outlineLvl w:val="1"/></w:pPr><w:rPr><w:b/><w:sz w:val="28"/></w:rPr></w:style>
+</w:styles>"""
+
+def _docx_paragraph(text: str, style: Optional[str] = None, page_break: bool = False) -> str:
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    page = '<w:r><w:br w:type="page"/></w:r>' if page_break else ""
+    # Control characters are not allowed in XML 1.0
+    text = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f]", "", text)
+    return f'<w:p>{properties}{page}<w:r><w:t xml:space="preserve">{xml_escape(text)}</w:t></w:r></w:p>'
+
+def render_docx(results: List[Dict[str, Any]], title: Optional[str] = None) -> bytes:
+    """
+    Render results as a Word document
+    
+    The package is assembled directly from WordprocessingML, so no
+    python-docx install is needed. Each result after the first starts on a
+    new page.
+    
+    Args:
+        results: Result dictionaries with 'topic', 'source_url' and 'items'
+        title: Optional title page heading for a combined document
+    
+    Returns:
+        The .docx file contents
+    """
+    paragraphs = []
+    if title:
+        paragraphs.append(_docx_paragraph(title, "Title"))
+    for index, result in enumerate(results):
+        paragraphs.append(_docx_paragraph(document_title(result["topic"]), "Heading1", page_break=index > 0 or bool(title)))
+        if result.get("source_url"):
+            paragraphs.append(_docx_paragraph(f"Source: {result['source_url']}"))
+        for item in _items(result):
+            paragraphs.append(_docx_paragraph(f"{item.get('rank')}. {item.get('name')}", "Heading2"))
+            if item.get("details"):
+                paragraphs.append(_docx_paragraph(item["details"]))
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        + "".join(paragraphs)
+        + "<w:sectPr/></w:body></w:document>"
+    )
+    
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        package.writestr("_rels/.rels", _DOCX_RELS)
+        package.writestr("word/_rels/document.xml.rels", _DOCX_DOCUMENT_RELS)
+        package.writestr("word/styles.xml", _DOCX_STYLES)
+        package.writestr("word/document.xml", document)
+    return buffer.getvalue()
+
+RENDERERS: Dict[str, Callable[[List[Dict[str, Any]], Optional[str]], Any]] = {
+    "markdown": render_markdown,
+    "html": render_html,
+    "docx": render_docx,
+}
+
+def write_document(path: str, results: List[Dict[str, Any]], export_format: str, title: Optional[str] = None) -> str:
+    """
+    Render results in one format and replace `path` atomically
+    
+    Returns:
+        The path written
+    """
+    content = RENDERERS[export_format](results, title)
+    data = content if isinstance(content, bytes) else content.encode("utf-8")
+    temp_file = f"{path}.tmp"
+    with open(temp_file, "wb") as f:
+        f.write(data)
+    os.replace(temp_file, path)
+    return path
+
+def export_results(
+    results: Iterable[Dict[str, Any]],
+    directory: str,
+    formats: Iterable[str] = ("markdown",),
+    per_topic: bool = True,
+    combined: bool = False,
+    combined_name: str = DEFAULT_COMBINED_NAME,
+) -> List[str]:
+    """
+    Render finished results to local documents in one pass
+    
+    Args:
+        results: Result dictionaries, e.g. loaded from the output JSON
+        directory: Directory the documents are written to
+        formats: Any of EXPORT_FORMATS
+        per_topic: Write one document per topic
+        combined: Also write one document holding every topic
+        combined_name: File name of the combined document, without extension
+    
+    Returns:
+        Paths of the documents written
+    """
+    results = [result for result in results if result.get("items")]
+    os.makedirs(directory, exist_ok=True)
+    slugs = DocumentSlugs()
+    paths = []
+    for export_format in formats:
+        extension = EXPORT_FORMATS[export_format]
+        if per_topic:
+            for result in results:
+                paths.append(write_document(os.path.join(directory, slugs(result["topic"]) + extension), [result], export_format))
+        if combined and results:
+            paths.append(write_document(os.path.join(directory, combined_name + extension), results, export_format, "Top 10 Lists"))
+    return paths
+
+class DocumentExporter:
+    """
+    Renders results to local documents on a background task
+    
+    submit() only enqueues the result, so scraping never waits on document
+    rendering. A single background task drains the queue and writes each
+    topic's documents on a worker thread. The combined document, if any, is
+    written once by close().
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        formats: Iterable[str] = ("markdown",),
+        per_topic: bool = True,
+        combined: bool = False,
+        combined_name: str = DEFAULT_COMBINED_NAME,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ):
+        """
+        Args:
+            directory: Directory the documents are written to
+            formats: Any of EXPORT_FORMATS
+            per_topic: Write one document per topic as results arrive
+            combined: Write one document with every topic when closed
+            combined_name: File name of the combined document, without extension
+            max_pending: Results allowed to wait for rendering; beyond that
+                submit() drops them rather than holding up the scrape
+        """
+        self.directory = directory
+        self.formats = list(formats)
+        unknown = [export_format for export_format in self.formats if export_format not in EXPORT_FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown export format(s): {', '.join(unknown)}")
+        self.per_topic = per_topic
+        self.combined = combined
+        self.combined_name = combined_name
+        self.max_pending = max_pending
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.render_seconds = 0.0
+        self._slugs = DocumentSlugs()
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the background task; must be called from a running event loop"""
+        if self._task is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = asyncio.create_task(self._run())
+    
+    def submit(self, result: Dict[str, Any]):
+        """
+        Queue a result for rendering without waiting
+        
+        Args:
+            result: Result dictionary for a single topic
+        """
+        if not result.get("items"):
+            return
+        self.start()
+        slug = self._slugs(result["topic"])
+        # Newest result per topic wins in the combined document
+        self._results[slug] = result
+        if not self.per_topic:
+            return
+        try:
+            self._queue.put_nowait((slug, result))
+        except asyncio.QueueFull:
+            self.dropped += 1
+    
+    def _write_topic(self, slug: str, result: Dict[str, Any]):
+        for export_format in self.formats:
+            path = os.path.join(self.directory, slug + EXPORT_FORMATS[export_format])
+            write_document(path, [result], export_format)
+    
+    async def _run(self):
+        while True:
+            queued = await self._queue.get()
+            try:
+                if queued is None:
+                    return
+                slug, result = queued
+                started = time.perf_counter()
+                try:
+                    await asyncio.to_thread(self._write_topic, slug, result)
+                    self.written += 1
+                except Exception as e:
+                    # A bad document must not take the exporter down
+                    self.failed += 1
+                    print(f"Error exporting {result.get('topic')}: {str(e)}")
+                self.render_seconds += time.perf_counter() - started
+            finally:
+                self._queue.task_done()
+    
+    async def close(self) -> List[str]:
+        """
+        Finish the queued documents and write the combined document
+        
+        Returns:
+            Paths of the combined documents written
+        """
+        paths = []
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+        if self.combined and self._results:
+            os.makedirs(self.directory, exist_ok=True)
+            paths = await asyncio.to_thread(
+                export_results,
+                list(self._results.values()),
+                self.directory,
+                self.formats,
+                per_topic=False,
+                combined=True,
+                combined_name=self.combined_name,
+            )
+        return paths
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Documents written, failed and dropped, and total render time
+        """
+        return {
+            "topics_written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "render_seconds": round(self.render_seconds, 3),
+        }
@@ -0,0 +1,35 @@
+import asyncio
+import urllib.request
+
+# Sent with every page fetch; some list sites reject the default urllib agent
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+DEFAULT_FETCH_TIMEOUT = 20.0
+
+def _fetch_page_sync(url: str, timeout: float) -> str:
+    request = urllib.request.Request(
+        url,
+        headers={
+            "User-Agent": DEFAULT_USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+        },
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        charset = response.headers.get_content_charset() or "utf-8"
+        return response.read().decode(charset, errors="replace")
+
+async def fetch_page(url: str, timeout: float = DEFAULT_FETCH_TIMEOUT) -> str:
+    """
+    Fetch a page's HTML without a browser
+    
+    Args:
+        url: Page to fetch
+        timeout: Socket timeout in seconds
+        
+    Returns:
+        The decoded HTML of the page
+    """
+    return await asyncio.to_thread(_fetch_page_sync, url, timeout)
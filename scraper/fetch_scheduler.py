@@ -0,0 +1,214 @@
+import asyncio
+import time
+import urllib.error
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from scraper.fetch import DEFAULT_FETCH_TIMEOUT, fetch_page
+
+# Requests (fetches or agent visits) allowed at once per domain
+DEFAULT_DOMAIN_CONCURRENCY = 2
+
+# Seconds between the starts of two requests to one domain
+DEFAULT_DOMAIN_INTERVAL = 1.0
+
+# Retries of a fetch answered with 429 or a 5xx
+DEFAULT_FETCH_RETRIES = 2
+
+# Longest a domain is backed off after repeated throttling, in seconds
+MAX_BACKOFF = 300.0
+
+# Status codes that mean "slow down" rather than "this page is broken"
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+def domain_of(url: str) -> str:
+    """
+    Returns:
+        The host a URL points at, without a leading "www."
+    """
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Args:
+        value: A Retry-After header, in seconds or as an HTTP date
+    
+    Returns:
+        Seconds to wait, or None if the header is missing or unreadable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class DomainState:
+    """Politeness bookkeeping for one domain"""
+    
+    def __init__(self, concurrency: Optional[int]):
+        self.semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+        # time.monotonic() before which no new request may start
+        self.next_start = 0.0
+        self.backoff = 0.0
+        self.throttled = 0
+
+class FetchScheduler:
+    """
+    Coordinates every request the scraper makes to a source domain
+    
+    Each domain gets a concurrency limit and a minimum interval between
+    request starts, shared by plain page fetches and browser agent visits.
+    A 429 or 5xx doubles the domain's backoff (or applies its Retry-After)
+    and the fetch is retried; successes halve the backoff again.
+    
+    Concurrent fetches of the same URL are collapsed into one request whose
+    HTML is handed to every caller.
+    """
+    
+    def __init__(
+        self,
+        domain_concurrency: Optional[int] = DEFAULT_DOMAIN_CONCURRENCY,
+        domain_interval: float = DEFAULT_DOMAIN_INTERVAL,
+        retries: int = DEFAULT_FETCH_RETRIES,
+        max_backoff: float = MAX_BACKOFF,
+    ):
+        """
+        Args:
+            domain_concurrency: Requests allowed at once per domain (None for no limit)
+            domain_interval: Minimum seconds between request starts per domain
+            retries: Retries of a throttled fetch before giving up
+            max_backoff: Cap on a domain's backoff, in seconds
+        """
+        self.domain_concurrency = domain_concurrency
+        self.domain_interval = domain_interval
+        self.retries = retries
+        self.max_backoff = max_backoff
+        self.fetches = 0
+        self.shared = 0
+        self.retried = 0
+        self.wait_seconds = 0.0
+        self._domains: Dict[str, DomainState] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+    
+    def _state(self, url: str) -> DomainState:
+        domain = domain_of(url)
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = DomainState(self.domain_concurrency)
+        return state
+    
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Hold one of the domain's request slots, starting no sooner than its spacing allows"""
+        state = self._state(url)
+        started = time.monotonic()
+        if state.semaphore is not None:
+            await state.semaphore.acquire()
+        try:
+            # Reserve a start time before sleeping so waiters queue up behind each other
+            start_at = max(time.monotonic(), state.next_start)
+            state.next_start = start_at + max(self.domain_interval, state.backoff)
+            delay = start_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.wait_seconds += time.monotonic() - started
+            yield state
+        finally:
+            if state.semaphore is not None:
+                state.semaphore.release()
+    
+    async def visit(self, url: str, run: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Call `run` (e.g. a browser agent working on `url`) and await it while holding a slot on the URL's domain
+        
+        Args:
+            url: Page the work is for
+            run: Zero-argument callable returning the awaitable, only called once the slot is held
+        
+        Returns:
+            Whatever `run`'s awaitable returns
+        """
+        async with self.slot(url):
+            return await run()
+    
+    def _throttled(self, state: DomainState, retry_after: Optional[float]):
+        state.throttled += 1
+        state.backoff = min(self.max_backoff, max(state.backoff * 2, self.domain_interval * 2, 1.0))
+        wait = state.backoff if retry_after is None else min(self.max_backoff, retry_after)
+        state.next_start = max(state.next_start, time.monotonic() + wait)
+    
+    async def _fetch(self, url: str, timeout: float) -> str:
+        for attempt in range(self.retries + 1):
+            async with self.slot(url) as state:
+                try:
+                    html = await fetch_page(url, timeout)
+                except urllib.error.HTTPError as e:
+                    if e.code not in THROTTLE_STATUSES:
+                        raise
+                    self._throttled(state, parse_retry_after(e.headers.get("Retry-After") if e.headers else None))
+                    if attempt == self.retries:
+                        raise
+                    self.retried += 1
+                    continue
+                state.backoff /= 2
+                return html
+    
+    async def fetch(self, url: str, timeout: float = DEFAULT_FETCH_TIMEOUT) -> str:
+        """
+        Fetch a page's HTML politely, sharing the request with concurrent callers for the same URL
+        
+        Args:
+            url: Page to fetch
+            timeout: Socket timeout in seconds
+        
+        Returns:
+            The decoded HTML of the page
+        
+        Raises:
+            urllib.error.HTTPError, urllib.error.URLError or OSError: The fetch failed
+        """
+        future = self._in_flight.get(url)
+        if future is not None:
+            self.shared += 1
+            # Shielded so a cancelled caller doesn't cancel the fetch for everyone else
+            return await asyncio.shield(future)
+        
+        self.fetches += 1
+        future = asyncio.ensure_future(self._fetch(url, timeout))
+        self._in_flight[url] = future
+        
+        def finished(done: asyncio.Future):
+            if self._in_flight.get(url) is done:
+                del self._in_flight[url]
+            # Mark the error as seen even if every caller was cancelled
+            if not done.cancelled():
+                done.exception()
+        
+        future.add_done_callback(finished)
+        return await asyncio.shield(future)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Fetches made and shared, retries, slot wait time, and the most throttled domains
+        """
+        throttled = sorted(
+            ((domain, state.throttled) for domain, state in self._domains.items() if state.throttled),
+            key=lambda pair: pair[1],
+            reverse=True,
+        )
+        return {
+            "fetches": self.fetches,
+            "shared": self.shared,
+            "retries": self.retried,
+            "domains": len(self._domains),
+            "wait_seconds": round(self.wait_seconds, 3),
+            "throttled": dict(throttled[:5]),
+        }
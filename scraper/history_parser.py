@@ -0,0 +1,188 @@
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+# Keys that usually hold the ranked list inside an extracted JSON object
+LIST_KEY_HINTS = ("top", "list", "items", "ranking", "results")
+
+# Keys that usually hold an item's name
+NAME_KEYS = ("name", "title", "item", "species", "label")
+
+# A "1. Name - details" line in free text
+NUMBERED_LINE = re.compile(r"^\s*(?:#|no\.?\s*)?(\d{1,2})[.)]\s+(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+
+FENCED_JSON = re.compile(r"```(?:json)?\s*\n?")
+
+def _get(obj: Any, name: str) -> Any:
+    """Read a field from either an agent history object or its saved JSON form"""
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+def iter_history_texts(history: Any) -> Iterator[str]:
+    """
+    Yield the text an agent extracted, step by step, without touching screenshots or DOM state
+    
+    Args:
+        history: An AgentHistoryList or the dict produced by saving one
+    
+    Yields:
+        Extracted-content strings in the order the agent produced them
+    """
+    for step in _get(history, "history") or []:
+        for action_result in _get(step, "result") or []:
+            content = _get(action_result, "extracted_content")
+            if isinstance(content, str) and content:
+                yield content
+
+def iter_json_values(text: str) -> Iterator[Any]:
+    """
+    Yield JSON objects and arrays embedded in a block of text
+    
+    The text is scanned for the next '{' or '[' and each candidate is decoded
+    in place, so fenced ```json blocks and bare JSON are both found.
+    
+    Args:
+        text: Text that may contain JSON
+    
+    Yields:
+        Decoded JSON values
+    """
+    decoder = json.JSONDecoder()
+    position = 0
+    length = len(text)
+    while position < length:
+        # Jump straight to the next thing that can start a value
+        next_object = text.find("{", position)
+        next_array = text.find("[", position)
+        starts = [index for index in (next_object, next_array) if index != -1]
+        if not starts:
+            return
+        start = min(starts)
+        try:
+            value, end = decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            position = start + 1
+            continue
+        if isinstance(value, (dict, list)) and value:
+            yield value
+        position = end
+
+def _candidate_lists(value: Any, topic_tokens: List[str]) -> Iterator[List[Any]]:
+    """Yield lists inside a JSON value that could be the ranked list, best guesses first"""
+    if isinstance(value, list):
+        yield value
+        return
+    if not isinstance(value, dict):
+        return
+    
+    def key_score(key: str) -> int:
+        key = key.lower()
+        score = sum(2 for token in topic_tokens if token in key)
+        score += sum(1 for hint in LIST_KEY_HINTS if hint in key)
+        return score
+    
+    list_keys = [key for key, item in value.items() if isinstance(item, list) and item]
+    for key in sorted(list_keys, key=key_score, reverse=True):
+        yield value[key]
+    for item in value.values():
+        if isinstance(item, dict):
+            yield from _candidate_lists(item, topic_tokens)
+
+def _normalize_item(item: Any, position: int) -> Optional[Dict[str, Any]]:
+    """Turn one JSON list entry into a {rank, name, details} dict"""
+    if isinstance(item, str):
+        return {"rank": position + 1, "name": item.strip(), "details": None} if item.strip() else None
+    if not isinstance(item, dict):
+        return None
+    
+    name_key = next((key for key in NAME_KEYS if isinstance(item.get(key), str) and item[key].strip()), None)
+    if name_key is None:
+        return None
+    
+    rank = item.get("rank", position + 1)
+    try:
+        rank = int(rank)
+    except (TypeError, ValueError):
+        rank = position + 1
+    
+    details = []
+    for key, value in item.items():
+        if key in ("rank", name_key) or value in (None, ""):
+            continue
+        if key == "details" and isinstance(value, str):
+            details.append(value)
+        else:
+            details.append(f"{key.replace('_', ' ').title()}: {value}")
+    
+    return {"rank": rank, "name": item[name_key].strip(), "details": ". ".join(details) if details else None}
+
+def _items_from_list(entries: List[Any]) -> List[Dict[str, Any]]:
+    items = []
+    for position, entry in enumerate(entries[:10]):  # Take only top 10
+        item = _normalize_item(entry, position)
+        if item is None:
+            return []
+        items.append(item)
+    return items
+
+def _items_from_numbered_lines(text: str) -> List[Dict[str, Any]]:
+    items = []
+    seen = set()
+    for match in NUMBERED_LINE.finditer(text):
+        rank = int(match.group(1))
+        if not 1 <= rank <= 10 or rank in seen:
+            continue
+        seen.add(rank)
+        parts = re.split(r"\s+[-–—]\s+|:\s+", match.group(2), maxsplit=1)
+        name = parts[0].strip(" *")
+        details = parts[1].strip() if len(parts) == 2 else None
+        items.append({"rank": rank, "name": name, "details": details or None})
+    return sorted(items, key=lambda item: item["rank"])
+
+def extract_items_from_text(text: str, topic: str, min_items: int = 1) -> List[Dict[str, Any]]:
+    """
+    Find a ranked list in one block of text, as JSON or numbered lines
+    
+    Args:
+        text: Text that may contain the list, e.g. an agent's final result
+        topic: Topic being scraped, used to pick the right key in JSON objects
+        min_items: Number of items a candidate needs to be accepted
+    
+    Returns:
+        Item dictionaries with rank, name and details, or an empty list
+    """
+    topic_tokens = [token for token in re.findall(r"[a-z]+", topic.lower()) if len(token) > 3]
+    
+    candidates = []
+    for value in iter_json_values(FENCED_JSON.sub("", text)):
+        for entries in _candidate_lists(value, topic_tokens):
+            candidates.append(_items_from_list(entries))
+    candidates.append(_items_from_numbered_lines(text))
+    
+    for items in candidates:
+        if len(items) >= min_items:
+            return items
+    return []
+
+def extract_list_items(history: Any, topic: str, min_items: int = 10) -> List[Dict[str, Any]]:
+    """
+    Find a ranked list the agent already extracted while it was searching
+    
+    Walks the extracted content of each step and stops at the first JSON
+    list (or block of numbered lines) with at least `min_items` usable items.
+    
+    Args:
+        history: An AgentHistoryList or the dict produced by saving one
+        topic: Topic being scraped, used to pick the right key in JSON objects
+        min_items: Number of items a block needs to be accepted
+    
+    Returns:
+        Item dictionaries with rank, name and details, or an empty list
+    """
+    for text in iter_history_texts(history):
+        items = extract_items_from_text(text, topic, min_items)
+        if items:
+            return items
+    
+    return []
@@ -0,0 +1,142 @@
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, Optional, Union
+
+# Elements that never have children
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+# Elements whose content is never page text
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe"}
+
+# Opening one of these implicitly closes an open element of the same kind
+SELF_CLOSING_SIBLINGS = {"li", "p", "tr", "td", "th", "dt", "dd", "option"}
+
+# Elements that start a new line when flattening text
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5",
+    "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "table", "td", "th", "tr", "ul", "br",
+}
+
+class Node:
+    """A parsed HTML element"""
+    
+    def __init__(self, tag: str, attrs: Optional[Dict[str, str]] = None, parent: Optional["Node"] = None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.parent = parent
+        self.children: List[Union["Node", str]] = []
+    
+    def iter(self, tag: Optional[str] = None) -> Iterator["Node"]:
+        """Yield this node and its descendant elements in document order"""
+        if tag is None or self.tag == tag:
+            yield self
+        for child in self.children:
+            if isinstance(child, Node):
+                yield from child.iter(tag)
+    
+    def element_children(self, tag: Optional[str] = None) -> List["Node"]:
+        """Direct child elements, optionally filtered by tag"""
+        return [c for c in self.children if isinstance(c, Node) and (tag is None or c.tag == tag)]
+    
+    def text(self) -> str:
+        """Text content with block elements separated by newlines"""
+        parts: List[str] = []
+        self._collect_text(parts)
+        lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+    
+    def inline_text(self) -> str:
+        """Text content collapsed onto a single line"""
+        return " ".join(self.text().split())
+    
+    def _collect_text(self, parts: List[str]):
+        block = self.tag in BLOCK_TAGS
+        if block:
+            parts.append("\n")
+        for child in self.children:
+            if isinstance(child, Node):
+                child._collect_text(parts)
+            else:
+                parts.append(child)
+        if block:
+            parts.append("\n")
+    
+    def get_class(self) -> str:
+        return f"{self.attrs.get('class', '')} {self.attrs.get('id', '')}".lower()
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("document")
+        self.current = self.root
+        self.skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if self.skip_depth:
+            if tag in SKIP_TAGS:
+                self.skip_depth += 1
+            return
+        if tag in SKIP_TAGS:
+            self.skip_depth = 1
+            return
+        
+        if tag in SELF_CLOSING_SIBLINGS:
+            self._close_open_sibling(tag)
+        
+        node = Node(tag, {k: v or "" for k, v in attrs}, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+    
+    def handle_startendtag(self, tag, attrs):
+        if self.skip_depth or tag in SKIP_TAGS:
+            return
+        self.current.children.append(Node(tag, {k: v or "" for k, v in attrs}, self.current))
+    
+    def handle_endtag(self, tag):
+        if self.skip_depth:
+            if tag in SKIP_TAGS:
+                self.skip_depth -= 1
+            return
+        
+        # Pop up to the matching open element; ignore stray end tags
+        node = self.current
+        while node is not None and node.tag != tag:
+            node = node.parent
+        if node is not None and node.parent is not None:
+            self.current = node.parent
+    
+    def handle_data(self, data):
+        if not self.skip_depth and data:
+            self.current.children.append(data)
+    
+    def _close_open_sibling(self, tag: str):
+        # e.g. "<li>one<li>two" closes the first <li>, but not across a nested list
+        boundary = {"li": {"ol", "ul"}, "tr": {"table"}, "td": {"tr"}, "th": {"tr"}}.get(tag, set())
+        node = self.current
+        while node is not None and node.tag != "document" and node.tag not in boundary:
+            if node.tag == tag:
+                self.current = node.parent
+                return
+            node = node.parent
+
+def parse_html(html: str) -> Node:
+    """
+    Parse HTML into a lightweight element tree
+    
+    Script, style and similar non-text elements are dropped while parsing.
+    
+    Args:
+        html: Raw HTML
+    
+    Returns:
+        The document root node
+    """
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
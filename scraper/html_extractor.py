@@ -0,0 +1,298 @@
+import os
+import re
+import sys
+import json
+from typing import Any, Dict, List, Optional
+
+from scraper.html_dom import Node, parse_html
+
+# Extractions at or above this confidence skip the scrape agent
+DEFAULT_MIN_CONFIDENCE = 0.8
+
+# Page regions that never hold the list we want
+BOILERPLATE_TAGS = {"nav", "header", "footer", "aside", "form"}
+BOILERPLATE_HINTS = ("nav", "menu", "footer", "sidebar", "breadcrumb", "related", "comment", "share", "social", "cookie")
+
+# "1. Name", "#1 Name", "No. 1: Name", "1) Name"
+NUMBERED_TEXT = re.compile(r"^\s*(?:#|no\.?\s*|number\s+)?(\d{1,3})\s*(?:[.):\-–—]\s*|\s+)(\S.*)$", re.IGNORECASE)
+
+# Separators between an item's name and the rest of its text
+NAME_SEPARATORS = re.compile(r"\s+[-–—:|]\s+|:\s+")
+
+# Relative trust in each kind of candidate list
+METHOD_WEIGHTS = {"heading": 1.0, "ordered_list": 1.0, "table": 0.95, "unordered_list": 0.8}
+
+MAX_NAME_LENGTH = 100
+MAX_DETAILS_LENGTH = 500
+
+class Extraction:
+    """Ranked items pulled out of a page, with a confidence in [0, 1]"""
+    
+    def __init__(self, items: List[Dict[str, Any]], confidence: float, method: str):
+        self.items = items
+        self.confidence = confidence
+        self.method = method
+    
+    def __repr__(self) -> str:
+        return f"Extraction(method={self.method!r}, confidence={self.confidence:.2f}, items={len(self.items)})"
+
+class FastPathStats:
+    """Counts how often the HTML fast path replaces the scrape agent"""
+    
+    def __init__(self):
+        self.attempts = 0
+        self.hits = 0
+        self.low_confidence = 0
+        self.fetch_errors = 0
+    
+    def hit_rate(self) -> float:
+        return self.hits / self.attempts if self.attempts else 0.0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "low_confidence": self.low_confidence,
+            "fetch_errors": self.fetch_errors,
+            "hit_rate": round(self.hit_rate(), 3),
+        }
+
+def _is_boilerplate(node: Node) -> bool:
+    while node is not None:
+        if node.tag in BOILERPLATE_TAGS:
+            return True
+        classes = node.get_class()
+        if classes.strip() and any(hint in classes for hint in BOILERPLATE_HINTS):
+            return True
+        node = node.parent
+    return False
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+def _split_name_details(node: Node, text: str):
+    """Split an item's text into a name and optional details"""
+    # A leading <strong>/<b>/<a> is usually the name
+    for child in node.children:
+        if isinstance(child, str):
+            if child.strip():
+                break
+            continue
+        if child.tag in ("strong", "b", "a", "h2", "h3", "h4", "em"):
+            name = child.inline_text().strip(" :-–—")
+            if name and text.startswith(child.inline_text()):
+                rest = text[len(child.inline_text()):].strip(" :-–—.")
+                return name, rest or None
+        break
+    
+    parts = NAME_SEPARATORS.split(text, maxsplit=1)
+    if len(parts) == 2 and len(parts[0]) <= MAX_NAME_LENGTH:
+        return parts[0].strip(), parts[1].strip() or None
+    
+    # Otherwise the first sentence is the name
+    sentence = re.split(r"(?<=[a-z0-9)])\.\s+", text, maxsplit=1)
+    if len(sentence) == 2 and len(sentence[0]) <= MAX_NAME_LENGTH:
+        return sentence[0].strip(), sentence[1].strip() or None
+    return text, None
+
+def _strip_number(text: str):
+    match = NUMBERED_TEXT.match(text)
+    if match:
+        return int(match.group(1)), match.group(2).strip()
+    return None, text
+
+def _list_candidates(root: Node) -> List[Extraction]:
+    candidates = []
+    for tag in ("ol", "ul"):
+        for list_node in root.iter(tag):
+            entries = list_node.element_children("li")
+            if len(entries) < 5 or _is_boilerplate(list_node):
+                continue
+            
+            start = int(list_node.attrs["start"]) if list_node.attrs.get("start", "").isdigit() else 1
+            items = []
+            for position, entry in enumerate(entries):
+                text = entry.inline_text()
+                if not text:
+                    continue
+                number, text = _strip_number(text)
+                rank = number if number is not None else start + position
+                name, details = _split_name_details(entry, text)
+                items.append({"rank": rank, "name": name, "details": details})
+            
+            # Lists made only of short links are usually navigation
+            link_only = all(
+                len(entry.element_children()) == 1 and entry.element_children()[0].tag == "a"
+                and len(entry.inline_text()) < 40
+                for entry in entries
+            )
+            method = "ordered_list" if tag == "ol" else "unordered_list"
+            candidates.append(_score(items, method, penalty=0.5 if link_only else 1.0))
+    return candidates
+
+def _heading_candidates(root: Node) -> List[Extraction]:
+    # Walk the document once, remembering text that follows each numbered heading
+    by_level: Dict[str, List[Dict[str, Any]]] = {}
+    current: Optional[Dict[str, Any]] = None
+    
+    def walk(node: Node):
+        nonlocal current
+        for child in node.children:
+            if not isinstance(child, Node):
+                continue
+            if child.tag in ("h2", "h3", "h4", "h5") and not _is_boilerplate(child):
+                number, text = _strip_number(child.inline_text())
+                if number is not None and text:
+                    name, details = _split_name_details(child, text)
+                    current = {"rank": number, "name": name, "details": [details] if details else []}
+                    by_level.setdefault(child.tag, []).append(current)
+                elif child.tag in ("h2", "h3"):
+                    current = None
+                continue
+            if child.tag in ("p", "ul", "dl", "blockquote") and current is not None:
+                text = child.inline_text()
+                if text and sum(len(part) for part in current["details"]) < MAX_DETAILS_LENGTH:
+                    current["details"].append(text)
+                continue
+            walk(child)
+    
+    walk(root)
+    
+    candidates = []
+    for entries in by_level.values():
+        if len(entries) < 5:
+            continue
+        items = [
+            {"rank": e["rank"], "name": e["name"], "details": " ".join(e["details"]) or None}
+            for e in entries
+        ]
+        candidates.append(_score(items, "heading"))
+    return candidates
+
+def _table_candidates(root: Node) -> List[Extraction]:
+    candidates = []
+    for table in root.iter("table"):
+        if _is_boilerplate(table):
+            continue
+        rows = [row for row in table.iter("tr") if row.element_children()]
+        if len(rows) < 5:
+            continue
+        
+        header: List[str] = []
+        if all(cell.tag == "th" for cell in rows[0].element_children()):
+            header = [cell.inline_text() for cell in rows[0].element_children()]
+            rows = rows[1:]
+        
+        items = []
+        for position, row in enumerate(rows):
+            cells = [cell.inline_text() for cell in row.element_children() if cell.tag in ("td", "th")]
+            if not cells:
+                continue
+            rank = position + 1
+            column_offset = 0
+            number, first = _strip_number(cells[0])
+            if cells[0].strip().rstrip(".").isdigit():
+                rank, column_offset = int(cells[0].strip().rstrip(".")), 1
+            elif number is not None:
+                rank, cells = number, [first] + cells[1:]
+            if len(cells) <= column_offset:
+                continue
+            
+            name = cells[column_offset]
+            details = []
+            for index, value in enumerate(cells[column_offset + 1:], start=column_offset + 1):
+                if not value:
+                    continue
+                label = header[index] if index < len(header) and header[index] else None
+                details.append(f"{label}: {value}" if label else value)
+            items.append({"rank": rank, "name": name, "details": ". ".join(details) or None})
+        candidates.append(_score(items, "table"))
+    return candidates
+
+def _score(items: List[Dict[str, Any]], method: str, penalty: float = 1.0) -> Extraction:
+    """Keep ranks 1-10 and score how much the result looks like a clean top 10"""
+    by_rank: Dict[int, Dict[str, Any]] = {}
+    for item in items:
+        if 1 <= item["rank"] <= 10 and item["rank"] not in by_rank and item["name"]:
+            by_rank[item["rank"]] = item
+    
+    top = [by_rank[rank] for rank in sorted(by_rank)]
+    for item in top:
+        item["name"] = _truncate(item["name"], MAX_NAME_LENGTH)
+        if item["details"]:
+            item["details"] = _truncate(item["details"], MAX_DETAILS_LENGTH)
+    
+    coverage = len(top) / 10
+    short_names = sum(1 for item in top if len(item["name"]) <= 80) / len(top) if top else 0.0
+    # A list that keeps going (or a countdown with gaps) is a weaker signal than exactly 10
+    duplicates = len(items) - len({item["rank"] for item in items})
+    consistency = 1.0 if duplicates == 0 else 0.7
+    
+    confidence = coverage * short_names * consistency * METHOD_WEIGHTS[method] * penalty
+    return Extraction(top, round(confidence, 3), method)
+
+def extract_ranked_items(html: str) -> Optional[Extraction]:
+    """
+    Extract a ranked list from a page using HTML heuristics only
+    
+    Looks at ordered/unordered lists, numbered headings ("1. Bee
+    Hummingbird") and tables, and returns the highest-confidence candidate.
+    
+    Args:
+        html: Raw page HTML
+    
+    Returns:
+        The best Extraction found, or None if the page has no list-like content
+    """
+    root = parse_html(html)
+    candidates = _heading_candidates(root) + _list_candidates(root) + _table_candidates(root)
+    candidates = [c for c in candidates if c.items]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: (c.confidence, len(c.items)))
+
+def main(argv: List[str]):
+    """
+    Run the extractor over saved HTML fixtures and report the results
+    
+    The pages in tests/fixtures/html come with their expected output.
+    """
+    if len(argv) != 1:
+        print("Usage: python -m scraper.html_extractor <fixtures-dir | page.html>")
+        return 2
+    
+    target = argv[0]
+    paths = [target]
+    if os.path.isdir(target):
+        paths = sorted(
+            os.path.join(target, name) for name in os.listdir(target) if name.endswith((".html", ".htm"))
+        )
+    
+    stats = FastPathStats()
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            extraction = extract_ranked_items(f.read())
+        stats.attempts += 1
+        confident = extraction is not None and extraction.confidence >= DEFAULT_MIN_CONFIDENCE
+        if confident:
+            stats.hits += 1
+        else:
+            stats.low_confidence += 1
+        
+        print(f"{os.path.basename(path)}: {extraction}")
+        
+        # An expected result next to the fixture (page.json) is checked by name
+        expected_path = os.path.splitext(path)[0] + ".json"
+        if extraction and os.path.exists(expected_path):
+            with open(expected_path, "r", encoding="utf-8") as f:
+                expected = json.load(f)
+            expected_items = expected.get("items", expected) if isinstance(expected, dict) else expected
+            expected_names = [item["name"] for item in expected_items]
+            got_names = [item["name"] for item in extraction.items]
+            print(f"  matches expected: {got_names == expected_names}")
+    
+    print(f"Fast path: {json.dumps(stats.stats())}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,57 @@
+import hashlib
+import re
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from scraper.sqlite_llm_cache import DiskLLMCache
+
+# Supported cache modes
+CACHE_MODES = ("off", "read-write", "read-only", "record")
+
+DEFAULT_LLM_CACHE_PATH = ".top10_llm_cache.sqlite"
+
+DEFAULT_LLM_CACHE_MAX_MB = 512
+
+# After an eviction pass the cache is trimmed to this share of its byte budget
+EVICTION_TARGET = 0.9
+
+def normalize_prompt(prompt: str) -> str:
+    """Drop trailing whitespace on each line so cosmetic prompt edits still hit"""
+    return re.sub(r"[ \t]+(?=\n|$)", "", prompt)
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    Args:
+        prompt: Serialized chat messages
+        llm_string: Serialized model name and call parameters
+    
+    Returns:
+        A stable hash of the model configuration and normalized messages
+    """
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+def model_name_from_llm_string(llm_string: str) -> str:
+    """Best-effort model name from LangChain's serialized call parameters"""
+    match = re.search(r"'model(?:_name)?':\s*'([^']+)'|\"model(?:_name)?\":\s*\"([^\"]+)\"", llm_string)
+    if match:
+        return match.group(1) or match.group(2)
+    return "unknown"
+
+def create_llm_cache(mode: str, path: str = DEFAULT_LLM_CACHE_PATH, max_mb: float = DEFAULT_LLM_CACHE_MAX_MB) -> Optional["DiskLLMCache"]:
+    """
+    Build the LLM cache for a CLI mode
+    
+    Returns:
+        A DiskLLMCache, or None when mode is "off"
+    """
+    if mode == "off":
+        return None
+    
+    # Imported here so the CLI only loads LangChain when the cache is used
+    from scraper.sqlite_llm_cache import DiskLLMCache
+    
+    return DiskLLMCache(path, mode=mode, max_bytes=int(max_mb * 1024 * 1024))
@@ -0,0 +1,268 @@
+import contextvars
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Topic and stage that LLM calls made in the current task belong to
+_current_topic: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_topic", default=None)
+_current_stage: contextvars.ContextVar[Optional["StageRecord"]] = contextvars.ContextVar("current_stage", default=None)
+
+# Stages in the order they run, used to order the summary
+STAGES = ("topic", "cache", "search", "url_extraction", "history_parse", "fetch", "fast_path", "text_extract", "scrape", "validate", "rescrape", "gdoc", "output_write")
+
+class StageRecord:
+    """Timing and LLM usage for one stage of one topic"""
+    
+    def __init__(self, topic: Optional[str], stage: str):
+        self.topic = topic
+        self.stage = stage
+        self.started_at = time.time()
+        self.wall_seconds = 0.0
+        self.steps = 0
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.retries = 0
+        self.ok = True
+        self.error: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "topic": self.topic,
+            "stage": self.stage,
+            "started_at": round(self.started_at, 3),
+            "wall_seconds": round(self.wall_seconds, 4),
+            "steps": self.steps,
+            "llm_calls": self.llm_calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "retries": self.retries,
+            "ok": self.ok,
+            "error": self.error,
+        }
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+class MetricsRecorder:
+    """
+    Records per-topic, per-stage wall time, agent steps, LLM calls and tokens
+    
+    Stages are opened with `stage()`; LLM usage is attributed to whichever
+    stage is open in the calling task, so concurrent topics don't mix.
+    Finished records are streamed to a JSONL file when one is configured.
+    """
+    
+    def __init__(self, jsonl_path: Optional[str] = None):
+        """
+        Args:
+            jsonl_path: Optional file that each finished stage record is appended to
+        """
+        self.records: List[StageRecord] = []
+        self.jsonl_path = None
+        self._jsonl_file = None
+        self._llm_callback = None
+        self.configure(jsonl_path)
+    
+    def configure(self, jsonl_path: Optional[str]):
+        """Start streaming records to a JSONL file"""
+        self.close()
+        self.jsonl_path = jsonl_path
+        if jsonl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+            self._jsonl_file = open(jsonl_path, "a", encoding="utf-8")
+    
+    @contextmanager
+    def topic(self, topic: str):
+        """Attribute every stage opened inside this block to a topic"""
+        token = _current_topic.set(topic)
+        try:
+            with self.stage("topic"):
+                yield
+        finally:
+            _current_topic.reset(token)
+    
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a stage of the current topic
+        
+        Yields:
+            The StageRecord being filled in
+        """
+        record = StageRecord(_current_topic.get(), name)
+        token = _current_stage.set(record)
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record.ok = False
+            # Exceptions can carry a short code, e.g. "budget_deadline"
+            record.error = getattr(e, "error_code", None) or type(e).__name__
+            raise
+        finally:
+            record.wall_seconds = time.perf_counter() - started
+            _current_stage.reset(token)
+            self._finish(record)
+    
+    def _finish(self, record: StageRecord):
+        self.records.append(record)
+        # LLM usage also counts toward the enclosing topic record
+        parent = _current_stage.get()
+        if parent is not None and parent is not record:
+            parent.steps += record.steps
+            parent.llm_calls += record.llm_calls
+            parent.input_tokens += record.input_tokens
+            parent.output_tokens += record.output_tokens
+            parent.retries += record.retries
+        if self._jsonl_file:
+            self._jsonl_file.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+            self._jsonl_file.flush()
+    
+    def current_stage(self) -> Optional[StageRecord]:
+        """The stage open in the calling task, if any"""
+        return _current_stage.get()
+    
+    def record_llm_call(self, input_tokens: int = 0, output_tokens: int = 0):
+        """Count one LLM call against the open stage"""
+        record = _current_stage.get()
+        if record is not None:
+            record.llm_calls += 1
+            record.input_tokens += input_tokens
+            record.output_tokens += output_tokens
+    
+    def record_retry(self):
+        """Count one failed LLM call or agent step against the open stage"""
+        record = _current_stage.get()
+        if record is not None:
+            record.retries += 1
+    
+    def record_agent_history(self, history: Any):
+        """Count the steps and failed steps of a finished agent run against the open stage"""
+        record = _current_stage.get()
+        if record is None or history is None:
+            return
+        steps = getattr(history, "history", None) or []
+        record.steps += len(steps)
+        for step in steps:
+            record.retries += sum(1 for result in getattr(step, "result", None) or [] if getattr(result, "error", None))
+    
+    def llm_callback(self):
+        """
+        Returns:
+            A LangChain callback handler that reports token usage to this recorder
+        """
+        if self._llm_callback is None:
+            from langchain_core.callbacks import BaseCallbackHandler
+            
+            recorder = self
+            
+            class MetricsCallbackHandler(BaseCallbackHandler):
+                # Run in the calling task so the open stage is visible
+                run_inline = True
+                
+                def on_llm_end(self, response, **kwargs):
+                    input_tokens = output_tokens = 0
+                    for generations in response.generations:
+                        for generation in generations:
+                            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                            input_tokens += usage.get("input_tokens", 0)
+                            output_tokens += usage.get("output_tokens", 0)
+                    recorder.record_llm_call(input_tokens, output_tokens)
+                
+                def on_llm_error(self, error, **kwargs):
+                    recorder.record_retry()
+            
+            self._llm_callback = MetricsCallbackHandler()
+        return self._llm_callback
+    
+    def failures(self) -> List[StageRecord]:
+        """
+        Returns:
+            The innermost failed stage of each failed topic, in the order they finished
+        """
+        failed = []
+        reported = set()
+        for record in self.records:
+            if not record.ok and record.topic not in reported:
+                failed.append(record)
+                reported.add(record.topic)
+        return failed
+    
+    def _by_stage(self) -> Dict[str, List[StageRecord]]:
+        grouped: Dict[str, List[StageRecord]] = {}
+        for record in self.records:
+            grouped.setdefault(record.stage, []).append(record)
+        order = {stage: index for index, stage in enumerate(STAGES)}
+        return dict(sorted(grouped.items(), key=lambda pair: order.get(pair[0], len(order))))
+    
+    def write_prometheus(self, path: str):
+        """
+        Write stage totals and latency quantiles in Prometheus textfile format
+        
+        Args:
+            path: Output .prom file; written atomically for the node exporter
+        """
+        lines = [
+            "# HELP top10_stage_seconds Wall time per scrape stage",
+            "# TYPE top10_stage_seconds summary",
+        ]
+        totals = []
+        for stage, records in self._by_stage().items():
+            durations = [record.wall_seconds for record in records]
+            for quantile in (0.5, 0.95):
+                lines.append(f'top10_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {percentile(durations, quantile):.6f}')
+            lines.append(f'top10_stage_seconds_sum{{stage="{stage}"}} {sum(durations):.6f}')
+            lines.append(f'top10_stage_seconds_count{{stage="{stage}"}} {len(durations)}')
+            totals.append((stage, records))
+        
+        for metric, field, help_text in (
+            ("top10_stage_agent_steps_total", "steps", "Agent steps per scrape stage"),
+            ("top10_stage_llm_calls_total", "llm_calls", "LLM calls per scrape stage"),
+            ("top10_stage_input_tokens_total", "input_tokens", "LLM input tokens per scrape stage"),
+            ("top10_stage_output_tokens_total", "output_tokens", "LLM output tokens per scrape stage"),
+            ("top10_stage_retries_total", "retries", "Failed LLM calls and agent steps per scrape stage"),
+            ("top10_stage_failures_total", "failures", "Stages that raised"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for stage, records in totals:
+                if field == "failures":
+                    value = sum(1 for record in records if not record.ok)
+                else:
+                    value = sum(getattr(record, field) for record in records)
+                lines.append(f'{metric}{{stage="{stage}"}} {value}')
+        
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, path)
+    
+    def summary(self) -> str:
+        """
+        Returns:
+            A table of p50/p95 wall time and LLM usage per stage
+        """
+        rows = [f"{'stage':<15}{'count':>7}{'p50 s':>10}{'p95 s':>10}{'steps':>8}{'llm':>7}{'tok in':>10}{'tok out':>10}"]
+        for stage, records in self._by_stage().items():
+            durations = [record.wall_seconds for record in records]
+            rows.append(
+                f"{stage:<15}{len(records):>7}{percentile(durations, 0.5):>10.2f}{percentile(durations, 0.95):>10.2f}"
+                f"{sum(r.steps for r in records):>8}{sum(r.llm_calls for r in records):>7}"
+                f"{sum(r.input_tokens for r in records):>10}{sum(r.output_tokens for r in records):>10}"
+            )
+        return "\n".join(rows)
+    
+    def close(self):
+        """Close the JSONL stream, if any"""
+        if self._jsonl_file:
+            self._jsonl_file.close()
+            self._jsonl_file = None
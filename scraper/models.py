@@ -0,0 +1,15 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+# Define the output format with Pydantic models
+class ListItem(BaseModel):
+    """Model for a single item in a top 10 list"""
+    rank: int
+    name: str
+    details: Optional[str] = None
+
+class TopTenList(BaseModel):
+    """Model for the complete list of items"""
+    items: List[ListItem]
+    source_url: Optional[str] = None
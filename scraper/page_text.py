@@ -0,0 +1,251 @@
+import re
+from typing import List, Optional
+
+from scraper.html_dom import Node, parse_html
+
+# Default token budget for the page text sent in text mode
+DEFAULT_TEXT_MAX_TOKENS = 4000
+
+# Rough characters per token for English page text
+CHARS_PER_TOKEN = 4
+
+# Elements that are chrome, never the main content
+NOISE_TAGS = {"nav", "header", "footer", "aside", "form", "button", "select", "dialog", "menu"}
+
+# class/id words that mark ads and page chrome
+NOISE_WORDS = {
+    "ad", "ads", "advert", "advertisement", "sponsor", "sponsored", "promo", "banner",
+    "cookie", "cookies", "consent", "newsletter", "subscribe", "signup", "share", "social",
+    "comment", "comments", "related", "recommended", "sidebar", "menu", "nav", "navbar",
+    "breadcrumb", "breadcrumbs", "popup", "modal", "footer", "masthead",
+}
+
+# Elements whose text is emitted as one block
+TEXT_BLOCK_TAGS = {"p", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "dt", "dd", "blockquote", "pre", "figcaption"}
+
+# Containers that can hold the main content
+CONTAINER_TAGS = {"div", "section", "article", "main", "td", "body"}
+
+# Link text and hrefs that mean the list continues on another page
+NEXT_PAGE_TEXT = re.compile(r"^(?:next(?:\s+page)?|load\s+more|show\s+more|more\s+results|page\s+2|2|[›»→]|next\s*[›»→])$", re.IGNORECASE)
+NEXT_PAGE_HREF = re.compile(r"(?:[?&](?:page|p|pg)=2\b|/page/2\b|/2/?$)", re.IGNORECASE)
+
+# Lines that look like part of a ranked list, capturing the rank
+RANKED_LINE = re.compile(r"^(?:#{1,6}\s+)?(?:#|no\.?\s*)?(\d{1,2})[.):]?\s+\S", re.IGNORECASE)
+
+class PageText:
+    """Main content of a page, pruned and split to a token budget"""
+    
+    def __init__(self, title: str, chunks: List[str], needs_interaction: bool):
+        self.title = title
+        self.chunks = chunks
+        self.needs_interaction = needs_interaction
+    
+    def best_chunk(self) -> Optional[str]:
+        """The chunk with the most ranked-looking lines, earliest first on ties"""
+        if not self.chunks:
+            return None
+        return max(self.chunks, key=lambda chunk: (sum(1 for line in chunk.splitlines() if RANKED_LINE.match(line)), -self.chunks.index(chunk)))
+    
+    def chunk_for_ranks(self, ranks: List[int], known_names: List[str]) -> Optional[str]:
+        """
+        The text most likely to hold the given ranks of a partly extracted list
+        
+        Prefers the chunk with the most lines numbered with one of `ranks`.
+        Failing that, returns the text after the last mention of an already
+        extracted item, up to one chunk's length, since a list cut short
+        usually continues there. Falls back to best_chunk().
+        
+        Args:
+            ranks: Ranks still missing
+            known_names: Names of the items already extracted
+        """
+        if not self.chunks:
+            return None
+        
+        wanted = {str(rank) for rank in ranks}
+        scores = [
+            sum(1 for line in chunk.splitlines() if (match := RANKED_LINE.match(line)) and match.group(1) in wanted)
+            for chunk in self.chunks
+        ]
+        if max(scores) > 0:
+            return self.chunks[scores.index(max(scores))]
+        
+        text = "\n".join(self.chunks)
+        names = [name for name in known_names if name and len(name.strip()) > 2]
+        if names:
+            pattern = re.compile("|".join(rf"\b{re.escape(name.strip())}\b" for name in names), re.IGNORECASE)
+            mentions = list(pattern.finditer(text))
+            if mentions:
+                # Start at the line after the last mention
+                line_end = text.find("\n", mentions[-1].end())
+                rest = text[line_end + 1:].strip() if line_end != -1 else ""
+                if rest:
+                    return rest[:max(len(chunk) for chunk in self.chunks)]
+        return self.best_chunk()
+    
+    def __repr__(self) -> str:
+        return f"PageText(title={self.title!r}, chunks={len(self.chunks)}, needs_interaction={self.needs_interaction})"
+
+def _is_noise(node: Node) -> bool:
+    if node.tag in NOISE_TAGS:
+        return True
+    if node.attrs.get("aria-hidden") == "true" or "hidden" in node.attrs or node.attrs.get("role") in ("navigation", "banner", "complementary"):
+        return True
+    words = set(re.split(r"[^a-z0-9]+", node.get_class()))
+    return bool(words & NOISE_WORDS)
+
+def _inside_noise(node: Node) -> bool:
+    while node is not None:
+        if _is_noise(node):
+            return True
+        node = node.parent
+    return False
+
+def _link_density(node: Node, text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_length = sum(len(link.inline_text()) for link in node.iter("a"))
+    return min(1.0, link_length / text_length)
+
+def find_main_content(root: Node) -> Node:
+    """
+    Pick the element holding the page's main content, readability-style
+    
+    Text blocks score their parent (and half that for the grandparent) by
+    length and comma count; containers full of links are penalized. A <main>
+    or <article> with real text wins outright.
+    
+    Args:
+        root: Parsed document
+    
+    Returns:
+        The best content element, or the document itself
+    """
+    landmarks = [node for tag in ("article", "main") for node in root.iter(tag) if not _is_noise(node)]
+    landmarks = [node for node in landmarks if len(node.inline_text()) >= 500]
+    if landmarks:
+        return max(landmarks, key=lambda node: len(node.inline_text()))
+    
+    scores = {}
+    for node in root.iter():
+        if node.tag not in TEXT_BLOCK_TAGS:
+            continue
+        text = node.inline_text()
+        if len(text) < 5 or _inside_noise(node):
+            continue
+        score = 1 + text.count(",") + min(len(text) / 100, 3)
+        parent = node.parent
+        for weight in (1.0, 0.5):
+            while parent is not None and parent.tag not in CONTAINER_TAGS:
+                parent = parent.parent
+            if parent is None:
+                break
+            scores[id(parent)] = (parent, scores.get(id(parent), (parent, 0.0))[1] + score * weight)
+            parent = parent.parent
+    
+    best, best_score = root, 0.0
+    for node, score in scores.values():
+        score *= 1 - _link_density(node, len(node.inline_text()))
+        if score > best_score:
+            best, best_score = node, score
+    return best
+
+def needs_interaction(root: Node) -> bool:
+    """
+    Returns:
+        True if the list looks paginated, so only a browser agent can read all of it
+    """
+    for node in root.iter():
+        if node.tag in ("a", "link") and "next" in node.attrs.get("rel", "").lower().split():
+            return True
+    for link in root.iter("a"):
+        text = link.inline_text()
+        if not text or not NEXT_PAGE_TEXT.match(text):
+            continue
+        # A bare "2" is only pagination when the link points at a second page
+        if text != "2" or NEXT_PAGE_HREF.search(link.attrs.get("href", "")):
+            return True
+    return False
+
+def _render(node: Node, blocks: List[str]):
+    """Flatten an element into text blocks, keeping headings and list numbering"""
+    if _is_noise(node):
+        return
+    if node.tag in ("ol", "ul"):
+        number = 1
+        for child in node.element_children():
+            if child.tag != "li" or _is_noise(child):
+                _render(child, blocks)
+                continue
+            text = child.inline_text()
+            if text:
+                blocks.append(f"{number}. {text}" if node.tag == "ol" else f"- {text}")
+                number += 1
+        return
+    if node.tag == "tr":
+        cells = [cell.inline_text() for cell in node.element_children() if cell.tag in ("td", "th")]
+        if any(cells):
+            blocks.append(" | ".join(cells))
+        return
+    if node.tag in TEXT_BLOCK_TAGS:
+        text = node.inline_text()
+        if text:
+            blocks.append(f"{'#' * int(node.tag[1])} {text}" if re.fullmatch(r"h[1-6]", node.tag) else text)
+        return
+    
+    inline: List[str] = []
+    for child in node.children:
+        if isinstance(child, str):
+            inline.append(child)
+            continue
+        if child.tag in ("a", "b", "strong", "em", "i", "span", "small", "sup", "sub", "code", "mark"):
+            inline.append(child.inline_text())
+            continue
+        if inline and " ".join("".join(inline).split()):
+            blocks.append(" ".join("".join(inline).split()))
+        inline = []
+        _render(child, blocks)
+    if inline and " ".join("".join(inline).split()):
+        blocks.append(" ".join("".join(inline).split()))
+
+def chunk_blocks(blocks: List[str], max_tokens: int) -> List[str]:
+    """
+    Pack text blocks into chunks of at most `max_tokens` (estimated)
+    
+    Blocks are never split unless a single block is over budget.
+    """
+    max_chars = max(1, max_tokens) * CHARS_PER_TOKEN
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for block in blocks:
+        pieces = [block[start:start + max_chars] for start in range(0, len(block), max_chars)]
+        for piece in pieces:
+            if current and size + len(piece) + 1 > max_chars:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def extract_page_text(html: str, max_tokens: int = DEFAULT_TEXT_MAX_TOKENS) -> PageText:
+    """
+    Prune a page to its main content and split it to a token budget
+    
+    Args:
+        html: Raw HTML of the source page
+        max_tokens: Estimated token budget per chunk
+    
+    Returns:
+        The page title, text chunks and whether the list needs a browser to page through
+    """
+    root = parse_html(html)
+    title_node = next(root.iter("title"), None)
+    title = title_node.inline_text() if title_node else ""
+    
+    blocks: List[str] = []
+    _render(find_main_content(root), blocks)
+    return PageText(title, chunk_blocks(blocks, max_tokens), needs_interaction(root))
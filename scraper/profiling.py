@@ -0,0 +1,337 @@
+import asyncio
+import collections.abc
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import time
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple
+
+from scraper.export import document_slug
+from scraper.result_cache import normalize_topic
+
+# Functions listed in each hotspot table of a topic's summary
+DEFAULT_PROFILE_TOP = 25
+
+# Deepest call stack written to the collapsed-stack file
+MAX_STACK_DEPTH = 80
+
+# Stacks carrying less time than this are left out of the collapsed-stack file, in microseconds
+MIN_STACK_MICROSECONDS = 1
+
+# C calls that resume a coroutine, which every profiled step starts inside
+RESUME_FUNCTIONS = {"<method 'send' of 'coroutine' objects>", "<method 'throw' of 'coroutine' objects>"}
+
+# Repository root, to tell our frames from the standard library's and dependencies'
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Profile session the current task belongs to
+_current_session: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar("current_profile", default=None)
+
+def frame_label(filename: str, lineno: int, function: str) -> str:
+    """
+    Returns:
+        A frame name for reports, e.g. "scrape_topic (top10Scraper.py:540)"
+    """
+    if filename == "~":
+        # cProfile's name for C functions, e.g. "<method 'sub' of 're.Pattern' objects>"
+        return function.replace(";", ",")
+    return f"{function} ({os.path.basename(filename)}:{lineno})".replace(";", ",")
+
+def _is_project_file(filename: str) -> bool:
+    return filename.startswith(PROJECT_ROOT) and "site-packages" not in filename
+
+def await_stack(coro: Any) -> Tuple[Tuple[str, ...], Optional[str]]:
+    """
+    Walk the chain of awaits a suspended coroutine is parked in
+    
+    Returns:
+        Frame labels from the outermost coroutine to the innermost, and the
+        label of the innermost frame in this repository (the await point
+        the wait is reported under)
+    """
+    frames: List[str] = []
+    own_frame = None
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            if isinstance(coro, asyncio.Task):
+                frames.append(f"[task {coro.get_name()}]")
+            break
+        label = frame_label(frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+        frames.append(label)
+        if _is_project_file(frame.f_code.co_filename):
+            own_frame = label
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return tuple(frames), own_frame
+
+def collapsed_stacks(stats: pstats.Stats) -> Dict[str, int]:
+    """
+    Turn cProfile's caller/callee graph into collapsed stacks for a flamegraph
+    
+    cProfile keeps totals per caller -> callee edge, not whole stacks, so a
+    function's time is split between the paths leading to it in proportion
+    to the time each caller spent in it. Recursive calls are folded into
+    the first occurrence of the function on the stack.
+    
+    Returns:
+        "outer;...;inner" stacks mapped to self time in microseconds
+    """
+    entries = stats.stats
+    callees: Dict[Any, List[Tuple[Any, float]]] = {}
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, edge_cumulative) in callers.items():
+            callees.setdefault(caller, []).append((function, edge_cumulative))
+    labels = {function: frame_label(*function) for function in entries}
+    folded: Dict[str, int] = {}
+    
+    def walk(function, share: float, stack: List[Any]):
+        _, _, self_time, cumulative, _ = entries[function]
+        stack.append(function)
+        scale = share / cumulative if cumulative else 0.0
+        key = ";".join(labels[frame] for frame in stack)
+        micros = self_time * scale * 1e6
+        if micros >= MIN_STACK_MICROSECONDS:
+            folded[key] = folded.get(key, 0) + round(micros)
+        if len(stack) < MAX_STACK_DEPTH:
+            for callee, edge_cumulative in callees.get(function, ()):
+                child_share = edge_cumulative * scale
+                if callee not in stack and child_share * 1e6 >= MIN_STACK_MICROSECONDS:
+                    walk(callee, child_share, stack)
+        stack.pop()
+    
+    for function, (_, _, _, cumulative, callers) in entries.items():
+        # The profiler's own enable/disable calls show up as roots too
+        if callers or function[0] == __file__:
+            continue
+        if function[0] == "~" and function[2] in RESUME_FUNCTIONS:
+            # Profiling starts as a step resumes a coroutine; start the stacks at the coroutine
+            for callee, edge_cumulative in callees.get(function, ()):
+                walk(callee, edge_cumulative, [])
+        else:
+            walk(function, cumulative, [])
+    return folded
+
+class ProfileSession:
+    """cProfile data and await timings for one topic"""
+    
+    def __init__(self, topic: str, directory: str):
+        self.topic = topic
+        self.directory = directory
+        self.profile = cProfile.Profile()
+        self.steps = 0
+        self.cpu_seconds = 0.0
+        self.wall_seconds = 0.0
+        # Await stack -> [suspensions, seconds, longest]
+        self.await_stacks: Dict[Tuple[str, ...], List[float]] = {}
+        self.await_points: Dict[str, List[float]] = {}
+        self._started = time.perf_counter()
+    
+    def resumed(self, coro: "ProfiledCoroutine"):
+        now = time.perf_counter()
+        if coro.suspended_at is not None:
+            waited = now - coro.suspended_at
+            for table, key in ((self.await_stacks, coro.await_stack), (self.await_points, coro.await_point)):
+                entry = table.setdefault(key, [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += waited
+                entry[2] = max(entry[2], waited)
+            coro.suspended_at = None
+        coro.resumed_at = now
+        self.profile.enable()
+    
+    def suspended(self, coro: "ProfiledCoroutine", finished: bool):
+        self.profile.disable()
+        now = time.perf_counter()
+        self.steps += 1
+        self.cpu_seconds += now - coro.resumed_at
+        if not finished:
+            coro.await_stack, own_frame = await_stack(coro.wrapped)
+            coro.await_point = own_frame or (coro.await_stack[-1] if coro.await_stack else "?")
+            coro.suspended_at = now
+    
+    def write(self, top: int = DEFAULT_PROFILE_TOP) -> str:
+        """
+        Write the profile, collapsed stacks and summary into the topic's directory
+        
+        Returns:
+            The directory written to
+        """
+        self.wall_seconds = time.perf_counter() - self._started
+        os.makedirs(self.directory, exist_ok=True)
+        self.profile.dump_stats(os.path.join(self.directory, "profile.pstats"))
+        stats = pstats.Stats(self.profile)
+        _write_folded(os.path.join(self.directory, "cpu.folded"), collapsed_stacks(stats).items())
+        _write_folded(
+            os.path.join(self.directory, "await.folded"),
+            ((";".join(stack), round(seconds * 1e6)) for stack, (_, seconds, _) in self.await_stacks.items()),
+        )
+        with open(os.path.join(self.directory, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write(self.summary(stats, top))
+        return self.directory
+    
+    def summary(self, stats: pstats.Stats, top: int = DEFAULT_PROFILE_TOP) -> str:
+        """Readable report: where the wall time went, the slowest await points and the CPU hotspots"""
+        awaited = sum(seconds for _, seconds, _ in self.await_points.values())
+        lines = [
+            f"Profile of: {self.topic}",
+            f"Wall time: {self.wall_seconds:.3f} s",
+            f"On CPU in this topic's tasks: {self.cpu_seconds:.3f} s over {self.steps} steps (cProfile overhead included)",
+            f"Suspended at await points: {awaited:.3f} s "
+            "(summed over the topic's tasks, so a task waiting on a child task counts alongside the child)",
+            "",
+            f"Await points by time suspended (top {top}):",
+            f"{'seconds':>10} {'count':>7} {'longest':>9}  await point",
+        ]
+        ranked = sorted(self.await_points.items(), key=lambda pair: pair[1][1], reverse=True)
+        for point, (count, seconds, longest) in ranked[:top]:
+            lines.append(f"{seconds:>10.3f} {count:>7} {longest:>9.3f}  {point}")
+        for sort_key, title in (("tottime", "CPU hotspots by own time"), ("cumulative", "CPU hotspots by cumulative time")):
+            stream = io.StringIO()
+            stats.stream = stream
+            stats.sort_stats(sort_key).print_stats(top)
+            lines += ["", f"{title} (top {top}):", stream.getvalue().split("\n\n", 1)[-1].rstrip()]
+        lines += [
+            "",
+            "Files:",
+            "  profile.pstats  cProfile data (python -m pstats, snakeviz)",
+            "  cpu.folded      collapsed CPU stacks in microseconds (flamegraph.pl cpu.folded > cpu.svg, or speedscope)",
+            "  await.folded    collapsed await stacks, microseconds suspended",
+        ]
+        return "\n".join(lines) + "\n"
+
+def _write_folded(path: str, stacks: Iterable[Tuple[str, int]]):
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, micros in sorted(stacks):
+            if micros > 0:
+                f.write(f"{stack} {micros}\n")
+
+class ProfiledCoroutine(collections.abc.Coroutine):
+    """
+    Coroutine wrapper that turns its session's profiler on for each step
+    
+    The event loop runs one task step at a time, so enabling cProfile only
+    while a wrapped coroutine is being driven keeps other topics running
+    concurrently out of the profile. The time between steps is the time the
+    coroutine spent suspended at an await.
+    """
+    
+    def __init__(self, coro: Awaitable[Any], session: ProfileSession):
+        self.wrapped = coro
+        self.session = session
+        self.resumed_at = 0.0
+        self.suspended_at: Optional[float] = None
+        self.await_stack: Tuple[str, ...] = ()
+        self.await_point = "?"
+        self.__qualname__ = getattr(coro, "__qualname__", type(coro).__name__)
+    
+    def _step(self, method, *args):
+        self.session.resumed(self)
+        finished = True
+        try:
+            result = method(*args)
+            finished = False
+            return result
+        finally:
+            self.session.suspended(self, finished)
+    
+    def send(self, value):
+        return self._step(self.wrapped.send, value)
+    
+    def throw(self, *args):
+        return self._step(self.wrapped.throw, *args)
+    
+    def close(self):
+        return self.wrapped.close()
+    
+    def __await__(self):
+        return self
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        return self.send(None)
+    
+    # Let asyncio's task reprs and debug tracebacks see the wrapped coroutine
+    @property
+    def cr_frame(self):
+        return getattr(self.wrapped, "cr_frame", None)
+    
+    @property
+    def cr_await(self):
+        return getattr(self.wrapped, "cr_await", None)
+    
+    @property
+    def cr_code(self):
+        return getattr(self.wrapped, "cr_code", None)
+    
+    @property
+    def cr_running(self):
+        return getattr(self.wrapped, "cr_running", False)
+
+class TopicProfiler:
+    """
+    Profiles selected topics of a run, each into its own directory
+    
+    A profiled topic runs with cProfile switched on only while one of its
+    own tasks is executing, including tasks it starts (browser agents, LLM
+    calls, budget watchdogs), and records how long those tasks sit at each
+    await. On-CPU time in our code, in browser_use and in langchain shows
+    up in the hotspots and cpu.folded; network, browser and model latency
+    show up as await time. Work handed to threads (page fetches, document
+    export) is not profiled and appears as await time at the hand-off.
+    """
+    
+    def __init__(self, directory: str, topics: Optional[Iterable[str]] = None, top: int = DEFAULT_PROFILE_TOP):
+        """
+        Args:
+            directory: Each profiled topic gets a subdirectory here
+            topics: Topics to profile (all topics when omitted)
+            top: Rows in each table of the summary
+        """
+        self.directory = directory
+        self.topics = {normalize_topic(topic) for topic in topics} if topics else None
+        self.top = top
+        self.written: List[str] = []
+    
+    def install(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Wrap tasks started from inside a profiled topic, so their steps are profiled too"""
+        loop = loop or asyncio.get_running_loop()
+        previous = loop.get_task_factory()
+        
+        def task_factory(loop, coro, **kwargs):
+            session = _current_session.get()
+            if session is not None and asyncio.iscoroutine(coro) and not isinstance(coro, ProfiledCoroutine):
+                coro = ProfiledCoroutine(coro, session)
+            if previous is not None:
+                return previous(loop, coro, **kwargs)
+            return asyncio.Task(coro, loop=loop, **kwargs)
+        
+        loop.set_task_factory(task_factory)
+    
+    def selects(self, topic: str) -> bool:
+        """True when `topic` should be profiled and no profile is running in this task yet"""
+        if _current_session.get() is not None:
+            return False
+        return self.topics is None or normalize_topic(topic) in self.topics
+    
+    async def run(self, topic: str, coro: Awaitable[Any]) -> Any:
+        """
+        Await `coro` under a new profile for `topic` and write the results
+        
+        Returns:
+            Whatever `coro` returns
+        """
+        session = ProfileSession(topic, os.path.join(self.directory, document_slug(topic)))
+        token = _current_session.set(session)
+        try:
+            return await ProfiledCoroutine(coro, session)
+        finally:
+            _current_session.reset(token)
+            try:
+                self.written.append(session.write(self.top))
+                print(f"Profile of {topic!r} written to {session.directory}")
+            except Exception as e:
+                print(f"Error writing profile of {topic!r}: {str(e)}")
@@ -0,0 +1,183 @@
+import json
+import re
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+# Default location of the on-disk topic cache
+DEFAULT_CACHE_PATH = ".top10_cache.sqlite"
+
+# Default freshness window for cached results, in hours
+DEFAULT_MAX_AGE_HOURS = 24 * 7
+
+# Default cap on the number of cached topics
+DEFAULT_MAX_ENTRIES = 10000
+
+def normalize_topic(topic: str) -> str:
+    """
+    Normalize a topic into a cache key
+    
+    Lowercases, drops punctuation and collapses whitespace so that
+    "Smallest Birds in the United States " and "smallest birds in the
+    united states" share an entry.
+    
+    Args:
+        topic: Topic as given by the user
+        
+    Returns:
+        The normalized topic
+    """
+    topic = re.sub(r"[^\w\s]", " ", topic.lower())
+    return " ".join(topic.split())
+
+class TopicResultCache:
+    """
+    SQLite-backed cache of scraped topic results
+    
+    Each row stores the full result dictionary (items plus source_url), the
+    time it was fetched and the time it was last served, keyed by the
+    normalized topic.
+    """
+    
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_age_hours: Optional[float] = DEFAULT_MAX_AGE_HOURS,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        Args:
+            path: Path to the SQLite database file
+            max_age_hours: Entries older than this are treated as stale (None disables)
+            max_entries: Maximum number of entries kept after evict() (None disables)
+        """
+        self.path = path
+        self.max_age_hours = max_age_hours
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS topic_results (
+                topic_key TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                source_url TEXT,
+                result_json TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_topic_results_fetched_at ON topic_results (fetched_at)"
+        )
+        self._conn.commit()
+    
+    def _is_fresh(self, fetched_at: float) -> bool:
+        if self.max_age_hours is None:
+            return True
+        return time.time() - fetched_at <= self.max_age_hours * 3600
+    
+    def get(self, topic: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a fresh cached result for a topic
+        
+        Args:
+            topic: Topic to look up
+            
+        Returns:
+            The cached result dictionary, or None if missing or stale
+        """
+        key = normalize_topic(topic)
+        row = self._conn.execute(
+            "SELECT result_json, fetched_at FROM topic_results WHERE topic_key = ?",
+            (key,),
+        ).fetchone()
+        
+        if row is None or not self._is_fresh(row[1]):
+            self.misses += 1
+            return None
+        
+        self._conn.execute(
+            "UPDATE topic_results SET accessed_at = ? WHERE topic_key = ?",
+            (time.time(), key),
+        )
+        self._conn.commit()
+        self.hits += 1
+        return json.loads(row[0])
+    
+    def put(self, result: Dict[str, Any]):
+        """
+        Store a scraped result, replacing any previous entry for its topic
+        
+        Args:
+            result: Result dictionary with at least 'topic', 'source_url' and 'items'
+        """
+        now = time.time()
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO topic_results
+                (topic_key, topic, source_url, result_json, fetched_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                normalize_topic(result["topic"]),
+                result["topic"],
+                result.get("source_url"),
+                json.dumps(result, ensure_ascii=False),
+                now,
+                now,
+            ),
+        )
+        self._conn.commit()
+    
+    def evict(self) -> int:
+        """
+        Drop stale entries, then the least recently used ones above max_entries
+        
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        if self.max_age_hours is not None:
+            cutoff = time.time() - self.max_age_hours * 3600
+            removed += self._conn.execute(
+                "DELETE FROM topic_results WHERE fetched_at < ?", (cutoff,)
+            ).rowcount
+        if self.max_entries is not None:
+            removed += self._conn.execute(
+                """
+                DELETE FROM topic_results WHERE topic_key IN (
+                    SELECT topic_key FROM topic_results
+                    ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            ).rowcount
+        self._conn.commit()
+        return removed
+    
+    def topics(self) -> List[str]:
+        """
+        Returns:
+            Every topic with a fresh cached result, as originally written
+        """
+        cutoff = time.time() - self.max_age_hours * 3600 if self.max_age_hours is not None else 0
+        rows = self._conn.execute("SELECT topic FROM topic_results WHERE fetched_at >= ?", (cutoff,)).fetchall()
+        return [row[0] for row in rows]
+    
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM topic_results").fetchone()[0]
+    
+    def close(self):
+        """Close the underlying database connection"""
+        self._conn.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Hit/miss counters and the number of cached entries
+        """
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,234 @@
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from scraper.result_cache import normalize_topic
+
+# Records written between fsyncs of the sink
+DEFAULT_FSYNC_EVERY = 10
+
+# Longest time a written record may wait for an fsync, in seconds
+DEFAULT_FSYNC_INTERVAL = 5.0
+
+def default_sink_path(output_file: str) -> str:
+    """
+    Returns:
+        The JSONL sink path that goes with a results JSON file
+    """
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.jsonl"
+
+class ResultSink:
+    """
+    Destination for finished topic results
+    
+    Subclasses buffer or write each result in write(), make buffered
+    results durable in flush(), and release their resources in close().
+    """
+    
+    def write(self, result: Dict[str, Any]):
+        raise NotImplementedError
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.flush()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class MultiSink(ResultSink):
+    """
+    Fans each result out to several sinks
+    
+    A sink that fails is reported and skipped rather than raising: the
+    JSONL sink or work queue already holds the result, so a database that
+    is briefly unreachable must not stop the scrape or the other sinks.
+    """
+    
+    def __init__(self, sinks: List[ResultSink]):
+        self.sinks = list(sinks)
+    
+    def _each(self, action: str, call: Callable[[ResultSink], Any]):
+        for sink in self.sinks:
+            try:
+                call(sink)
+            except Exception as e:
+                print(f"Error {action} {type(sink).__name__}: {str(e)}")
+    
+    def write(self, result: Dict[str, Any]):
+        self._each(f"writing {result.get('topic')} to", lambda sink: sink.write(result))
+    
+    def flush(self):
+        self._each("flushing", lambda sink: sink.flush())
+    
+    def close(self):
+        # Close every sink even if one fails
+        self._each("closing", lambda sink: sink.close())
+    
+    def stats(self) -> Dict[str, Any]:
+        return {type(sink).__name__: sink.stats() for sink in self.sinks}
+
+class JsonlResultSink(ResultSink):
+    """
+    Append-only JSON Lines file of topic results
+    
+    Each result is written as one line as soon as it is ready, so a batch
+    costs O(n) writes and an interrupted run loses at most the records that
+    were not yet fsynced. A torn final line is ignored when reading back.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        resume: bool = False,
+        fsync_every: int = DEFAULT_FSYNC_EVERY,
+        fsync_interval: float = DEFAULT_FSYNC_INTERVAL,
+    ):
+        """
+        Args:
+            path: Path to the JSONL file
+            resume: Keep existing records instead of starting a new file
+            fsync_every: Number of records written between fsyncs
+            fsync_interval: Maximum seconds between fsyncs while writing
+        """
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.written = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        
+        if resume:
+            _truncate_torn_tail(path)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+    
+    def write(self, result: Dict[str, Any]):
+        """
+        Append one result record
+        
+        Args:
+            result: Result dictionary for a single topic
+        """
+        self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.written += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+    
+    def sync(self):
+        """Force written records to disk"""
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def flush(self):
+        self.sync()
+    
+    def close(self):
+        """Sync and close the sink"""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "written": self.written}
+
+def _truncate_torn_tail(path: str):
+    """Drop a partial last line left behind by a crash mid-write"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Walk back to the last complete line
+        position = size - 1
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+def read_results(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the records of a JSONL sink, skipping unreadable lines
+    
+    Args:
+        path: Path to the JSONL file
+    
+    Yields:
+        Result dictionaries in the order they were written
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Torn write from an interrupted run
+                continue
+
+def completed_topics(path: str) -> Set[str]:
+    """
+    Args:
+        path: Path to the JSONL file
+    
+    Returns:
+        Normalized topics that already have a result in the sink
+    """
+    return {normalize_topic(result["topic"]) for result in read_results(path) if result.get("topic")}
+
+def compact(sink_path: str, output_file: str, topic_order: Optional[List[str]] = None) -> int:
+    """
+    Write the sink out as the array-of-objects JSON used by the import page
+    
+    The newest record for each topic wins. Topics in `topic_order` come
+    first in that order, followed by any others in the order they were
+    written. The output file is replaced atomically.
+    
+    Args:
+        sink_path: Path to the JSONL sink
+        output_file: Path to the JSON array to write
+        topic_order: Optional preferred order of topics
+    
+    Returns:
+        Number of results written
+    """
+    latest: Dict[str, Dict[str, Any]] = {}
+    for result in read_results(sink_path):
+        key = normalize_topic(result.get("topic", ""))
+        latest.pop(key, None)
+        latest[key] = result
+    
+    ordered: List[Dict[str, Any]] = []
+    for topic in topic_order or []:
+        result = latest.pop(normalize_topic(topic), None)
+        if result is not None:
+            ordered.append(result)
+    ordered.extend(latest.values())
+    
+    temp_file = f"{output_file}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(ordered, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, output_file)
+    return len(ordered)
@@ -0,0 +1,453 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from scraper.fetch_scheduler import domain_of
+from scraper.result_cache import normalize_topic
+from scraper.result_sink import ResultSink
+
+# Default location of the results store
+DEFAULT_STORE_PATH = "top10_results.sqlite"
+
+# Results buffered before they are committed
+DEFAULT_STORE_BATCH_SIZE = 100
+
+# Lists read per query while streaming the store out
+EXPORT_CHUNK = 500
+
+# Result keys with their own columns; anything else is kept as metadata
+CORE_KEYS = ("topic", "source_url", "items")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS topics (
+    id INTEGER PRIMARY KEY,
+    topic_key TEXT NOT NULL UNIQUE,
+    topic TEXT NOT NULL,
+    source_url TEXT,
+    domain TEXT,
+    fetched_at REAL NOT NULL,
+    item_count INTEGER NOT NULL,
+    score REAL,
+    metadata_json TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_topics_domain ON topics (domain, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_topics_fetched_at ON topics (fetched_at);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    topic_id INTEGER NOT NULL REFERENCES topics (id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    details TEXT,
+    UNIQUE (topic_id, rank)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    name, details, content='items', content_rowid='id', tokenize='porter unicode61'
+);
+"""
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query matching items that contain every word
+    
+    Each word is quoted, so punctuation and FTS operators in the text are
+    taken literally.
+    """
+    words = [word.replace('"', '""') for word in text.split()]
+    return " ".join(f'"{word}"' for word in words)
+
+class ResultsStore(ResultSink):
+    """
+    SQLite store of scraped lists with full-text search over their items
+    
+    Each topic is one row keyed by its normalized topic, holding the source
+    URL and its domain, when it was scraped, the item count, the validation
+    score and any other result fields as metadata. Items live in their own
+    table with an FTS5 index on name and details. Finding lists that
+    contain an item, lists from a domain or stale lists are index lookups,
+    so they stay in milliseconds as the store grows.
+    
+    Also usable as a result sink: writes are buffered and committed
+    `batch_size` results per transaction. Queries commit pending writes first.
+    A result that can't be stored is logged and dropped without holding up
+    the rest of its batch.
+    """
+    
+    def __init__(self, path: str = DEFAULT_STORE_PATH, batch_size: int = DEFAULT_STORE_BATCH_SIZE):
+        """
+        Args:
+            path: Path to the SQLite database file
+            batch_size: Results buffered before a commit
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.written = 0
+        self.rejected = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+    
+    def write(self, result: Dict[str, Any]):
+        """
+        Buffer a result, replacing any stored list for its topic on commit
+        
+        Args:
+            result: Result dictionary with at least 'topic' and 'items'
+        """
+        if not result.get("items"):
+            return
+        self._pending.append(result)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """
+        Commit every buffered result in one transaction
+        
+        If a result fails, the batch is retried with each result under its
+        own savepoint, so only the bad ones are rolled back, logged and
+        dropped. If the transaction itself fails the batch is dropped too,
+        rather than retried on every later flush.
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        rejected = self.rejected
+        try:
+            try:
+                stored = self._commit(pending, isolate=False)
+            except Exception:
+                stored = self._commit(pending, isolate=True)
+        except Exception as e:
+            self.rejected = rejected + len(pending)
+            print(f"Dropped {len(pending)} results from {self.path}: {str(e)}")
+            raise
+        self.written += stored
+    
+    def _commit(self, results: List[Dict[str, Any]], isolate: bool) -> int:
+        """
+        Args:
+            results: Results to store in one transaction
+            isolate: Put each result under a savepoint and drop the ones
+                that fail, instead of rolling back the whole transaction
+        
+        Returns:
+            Number of results stored
+        """
+        now = time.time()
+        stored = 0
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for result in results:
+                if not isolate:
+                    self._put(result, now)
+                    stored += 1
+                    continue
+                self._conn.execute("SAVEPOINT result")
+                try:
+                    self._put(result, now)
+                    stored += 1
+                except Exception as e:
+                    self._conn.execute("ROLLBACK TO result")
+                    self._reject(result, e)
+                self._conn.execute("RELEASE result")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return stored
+    
+    def _reject(self, result: Dict[str, Any], error: Exception):
+        self.rejected += 1
+        print(f"Dropped {result.get('topic')} ({result.get('source_url')}) from {self.path}: {str(error)}")
+    
+    def _put(self, result: Dict[str, Any], fetched_at: float):
+        key = normalize_topic(result["topic"])
+        source_url = result.get("source_url")
+        metadata = {name: value for name, value in result.items() if name not in CORE_KEYS}
+        score = (metadata.get("validation") or {}).get("score")
+        self._conn.execute(
+            """
+            INSERT INTO topics (topic_key, topic, source_url, domain, fetched_at, item_count, score, metadata_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (topic_key) DO UPDATE SET
+                topic = excluded.topic, source_url = excluded.source_url, domain = excluded.domain,
+                fetched_at = excluded.fetched_at, item_count = excluded.item_count, score = excluded.score,
+                metadata_json = excluded.metadata_json
+            """,
+            (
+                key,
+                result["topic"],
+                source_url,
+                domain_of(source_url) if source_url else None,
+                fetched_at,
+                len(result["items"]),
+                score,
+                json.dumps(metadata, ensure_ascii=False) if metadata else None,
+            ),
+        )
+        topic_id = self._conn.execute("SELECT id FROM topics WHERE topic_key = ?", (key,)).fetchone()[0]
+        # The FTS index is kept in step here rather than by triggers, which are several times slower
+        self._conn.execute(
+            "INSERT INTO items_fts (items_fts, rowid, name, details) "
+            "SELECT 'delete', id, name, details FROM items WHERE topic_id = ?",
+            (topic_id,),
+        )
+        self._conn.execute("DELETE FROM items WHERE topic_id = ?", (topic_id,))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO items (topic_id, rank, name, details) VALUES (?, ?, ?, ?)",
+            [(topic_id, item["rank"], item["name"], item.get("details")) for item in result["items"]],
+        )
+        self._conn.execute(
+            "INSERT INTO items_fts (rowid, name, details) SELECT id, name, details FROM items WHERE topic_id = ?",
+            (topic_id,),
+        )
+    
+    def _results(self, rows: List[tuple]) -> List[Dict[str, Any]]:
+        """Rebuild result dictionaries, in the legacy key order, from topic rows (id, topic, source_url, metadata_json)"""
+        if not rows:
+            return []
+        items: Dict[int, List[Dict[str, Any]]] = {row[0]: [] for row in rows}
+        placeholders = ", ".join("?" * len(items))
+        for topic_id, rank, name, details in self._conn.execute(
+            f"SELECT topic_id, rank, name, details FROM items WHERE topic_id IN ({placeholders}) ORDER BY topic_id, rank",
+            list(items),
+        ):
+            items[topic_id].append({"rank": rank, "name": name, "details": details})
+        return [
+            {"topic": topic, "source_url": source_url, "items": items[topic_id], **json.loads(metadata_json or "{}")}
+            for topic_id, topic, source_url, metadata_json in rows
+        ]
+    
+    def get(self, topic: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            The stored result for a topic, or None
+        """
+        self.flush()
+        rows = self._conn.execute(
+            "SELECT id, topic, source_url, metadata_json FROM topics WHERE topic_key = ?", (normalize_topic(topic),)
+        ).fetchall()
+        results = self._results(rows)
+        return results[0] if results else None
+    
+    def find_item(self, text: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Find lists with an item whose name or details contain every word of `text`
+        
+        Matches are taken newest first straight off the index, so a common
+        word costs no more than a rare one (ranking every match by relevance
+        grows with the number of matches).
+        
+        Args:
+            text: Words to look for, e.g. "bee hummingbird"
+            limit: Maximum number of matches
+        
+        Returns:
+            Matching items with their topic and source, most recently stored first
+        """
+        self.flush()
+        query = fts_query(text)
+        if not query:
+            return []
+        rows = self._conn.execute(
+            """
+            SELECT topics.topic, topics.source_url, items.rank, items.name, items.details
+            FROM (SELECT rowid FROM items_fts WHERE items_fts MATCH ? ORDER BY rowid DESC LIMIT ?) AS matches
+            JOIN items ON items.id = matches.rowid
+            JOIN topics ON topics.id = items.topic_id
+            ORDER BY items.id DESC
+            """,
+            (query, limit),
+        ).fetchall()
+        return [
+            {"topic": topic, "source_url": source_url, "rank": rank, "name": name, "details": details}
+            for topic, source_url, rank, name, details in rows
+        ]
+    
+    def _summaries(self, where: str, params: tuple, order: str, limit: int) -> List[Dict[str, Any]]:
+        self.flush()
+        rows = self._conn.execute(
+            f"SELECT topic, source_url, fetched_at, item_count, score FROM topics WHERE {where} ORDER BY {order} LIMIT ?",
+            params + (limit,),
+        ).fetchall()
+        return [
+            {"topic": topic, "source_url": source_url, "fetched_at": fetched_at, "item_count": item_count, "score": score}
+            for topic, source_url, fetched_at, item_count, score in rows
+        ]
+    
+    def lists_by_domain(self, domain: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Args:
+            domain: Source domain, e.g. "wikipedia.org" (a leading www. is ignored)
+            limit: Maximum number of lists
+        
+        Returns:
+            Summaries of the lists scraped from that domain, newest first
+        """
+        return self._summaries("domain = ?", (domain_of(f"http://{domain}"),), "fetched_at DESC", limit)
+    
+    def stale_lists(self, max_age_hours: float, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Args:
+            max_age_hours: Lists scraped longer ago than this are stale
+            limit: Maximum number of lists
+        
+        Returns:
+            Summaries of stale lists, oldest first
+        """
+        return self._summaries("fetched_at < ?", (time.time() - max_age_hours * 3600,), "fetched_at", limit)
+    
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        """Stream every stored result in the order its topic was first stored"""
+        self.flush()
+        last_id = 0
+        while True:
+            rows = self._conn.execute(
+                "SELECT id, topic, source_url, metadata_json FROM topics WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, EXPORT_CHUNK),
+            ).fetchall()
+            if not rows:
+                return
+            yield from self._results(rows)
+            last_id = rows[-1][0]
+    
+    def export_json(self, output_file: str) -> int:
+        """
+        Write the store out as the legacy array-of-objects JSON, one result at a time
+        
+        The output matches json.dump(results, indent=2) and replaces the file
+        atomically. Memory use does not grow with the size of the store.
+        
+        Returns:
+            Number of results written
+        """
+        written = 0
+        temp_file = f"{output_file}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write("[")
+            for result in self.iter_results():
+                f.write(",\n  " if written else "\n  ")
+                f.write(json.dumps(result, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+                written += 1
+            f.write("\n]" if written else "]")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, output_file)
+        return written
+    
+    def import_json(self, path: str) -> int:
+        """
+        Load a legacy results JSON file (or a JSONL sink) into the store
+        
+        Returns:
+            Number of results stored
+        """
+        from scraper.result_sink import read_results
+        
+        if path.endswith(".jsonl"):
+            results = read_results(path)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                results = json.load(f)
+        count = 0
+        for result in results:
+            self.write(result)
+            count += 1
+        self.flush()
+        return count
+    
+    def __len__(self) -> int:
+        self.flush()
+        return self._conn.execute("SELECT COUNT(*) FROM topics").fetchone()[0]
+    
+    def close(self):
+        """Commit pending writes and close the database"""
+        try:
+            self.flush()
+        finally:
+            self._conn.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Lists and items stored, and results written and dropped by this
+            process
+        """
+        self.flush()
+        lists, items = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(item_count), 0) FROM topics").fetchone()
+        return {"lists": lists, "items": items, "written": self.written, "rejected": self.rejected}
+
+def _print_rows(rows: List[Dict[str, Any]], as_json: bool):
+    if not rows and not as_json:
+        print("No matching lists")
+    for row in rows:
+        if as_json:
+            print(json.dumps(row, ensure_ascii=False))
+        elif "rank" in row:
+            print(f"{row['topic']}  #{row['rank']} {row['name']}  ({row['source_url']})")
+        else:
+            fetched = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["fetched_at"]))
+            score = "" if row["score"] is None else f", score {row['score']:g}"
+            print(f"{row['topic']}  [{fetched}, {row['item_count']} items{score}]  ({row['source_url']})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and maintain the top 10 results store")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Path to the results store")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per line")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    find = commands.add_parser("find", help="Lists with an item matching every word")
+    find.add_argument("text", nargs="+")
+    find.add_argument("--limit", type=int, default=20)
+    
+    domain = commands.add_parser("domain", help="Lists scraped from a domain")
+    domain.add_argument("domain")
+    domain.add_argument("--limit", type=int, default=100)
+    
+    stale = commands.add_parser("stale", help="Lists scraped longer ago than --max-age")
+    stale.add_argument("--max-age", type=float, default=24 * 7, help="Hours")
+    stale.add_argument("--limit", type=int, default=100)
+    
+    get = commands.add_parser("get", help="The stored result for a topic")
+    get.add_argument("topic")
+    
+    export = commands.add_parser("export", help="Stream the store out as the legacy results JSON")
+    export.add_argument("output")
+    
+    load = commands.add_parser("import", help="Load a results JSON file or JSONL sink into the store")
+    load.add_argument("paths", nargs="+")
+    
+    commands.add_parser("stats", help="Number of lists and items stored")
+    args = parser.parse_args()
+    
+    store = ResultsStore(args.store)
+    try:
+        started = time.perf_counter()
+        if args.command == "find":
+            _print_rows(store.find_item(" ".join(args.text), args.limit), args.json)
+        elif args.command == "domain":
+            _print_rows(store.lists_by_domain(args.domain, args.limit), args.json)
+        elif args.command == "stale":
+            _print_rows(store.stale_lists(args.max_age, args.limit), args.json)
+        elif args.command == "get":
+            result = store.get(args.topic)
+            print(json.dumps(result, indent=2, ensure_ascii=False) if result else f"No stored result for {args.topic!r}")
+        elif args.command == "export":
+            print(f"Exported {store.export_json(args.output)} results to {args.output}")
+        elif args.command == "import":
+            for path in args.paths:
+                print(f"Imported {store.import_json(path)} results from {path}")
+        else:
+            print(json.dumps(store.stats()))
+        if not args.json:
+            print(f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
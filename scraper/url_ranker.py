@@ -0,0 +1,162 @@
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+# Sources that tend to publish well-researched ranked lists
+REPUTABLE_DOMAINS = {
+    "wikipedia.org": 3.0,
+    "britannica.com": 3.0,
+    "nationalgeographic.com": 3.0,
+    "smithsonianmag.com": 2.5,
+    "audubon.org": 2.5,
+    "allaboutbirds.org": 2.5,
+    "worldatlas.com": 2.0,
+    "a-z-animals.com": 2.0,
+    "statista.com": 2.0,
+    "guinnessworldrecords.com": 2.0,
+    "imdb.com": 2.0,
+    "rottentomatoes.com": 2.0,
+    "espn.com": 2.0,
+    "forbes.com": 1.5,
+    "livescience.com": 1.5,
+    "treehugger.com": 1.0,
+    "ranker.com": 1.0,
+}
+
+# Top-level domains run by institutions
+REPUTABLE_SUFFIXES = {".gov": 2.5, ".edu": 2.0, ".int": 2.0}
+
+# Search engines, social media and other pages that are never the list itself
+BLOCKED_DOMAINS = {
+    "google.com", "bing.com", "duckduckgo.com", "yahoo.com", "facebook.com",
+    "instagram.com", "twitter.com", "x.com", "tiktok.com", "pinterest.com",
+    "youtube.com", "linkedin.com", "accounts.google.com",
+}
+
+# Path fragments that suggest a ranked list
+LIST_PATH_HINTS = ("top-10", "top10", "top_10", "top-ten", "best", "largest", "smallest", "fastest", "ranking", "list")
+
+MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\((https?://[^\s)]+)\)")
+FULL_URL = re.compile(r"https?://[^\s\"'<>)\]]+")
+BARE_DOMAIN = re.compile(r"(?<![\w@/.-])((?:[a-z0-9-]+\.)+(?:com|org|net|edu|gov|int|co|io|info|us|uk)(?:/[^\s\"'<>)\]]*)?)", re.IGNORECASE)
+
+TRAILING_PUNCTUATION = '.,;:"\')]}>*'
+
+def _clean(url: str) -> str:
+    return url.rstrip(TRAILING_PUNCTUATION)
+
+def _canonical(url: str) -> str:
+    """Key used to dedupe the same page written in different ways"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return urlunsplit(("https", host, parts.path.rstrip("/"), parts.query, ""))
+
+def _registered_domain(host: str) -> str:
+    host = host.lower().split(":")[0]
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+def extract_candidate_urls(text: str) -> List[Tuple[str, str]]:
+    """
+    Pull every URL out of free text, in order of appearance
+    
+    Finds markdown links, full http(s) URLs and bare domains such as
+    "a-z-animals.com/blog/...". Duplicates are dropped.
+    
+    Args:
+        text: Text returned by the search agent
+    
+    Returns:
+        (url, anchor text) pairs; anchor text is empty when there is none
+    """
+    found: List[Tuple[int, str, str]] = []
+    covered: List[Tuple[int, int]] = []
+    
+    for match in MARKDOWN_LINK.finditer(text):
+        found.append((match.start(), _clean(match.group(2)), match.group(1)))
+        covered.append(match.span())
+    for match in FULL_URL.finditer(text):
+        if not any(start <= match.start() < end for start, end in covered):
+            found.append((match.start(), _clean(match.group(0)), ""))
+            covered.append(match.span())
+    for match in BARE_DOMAIN.finditer(text):
+        if not any(start <= match.start() < end for start, end in covered):
+            found.append((match.start(), "https://" + _clean(match.group(1)), ""))
+    
+    seen = set()
+    candidates = []
+    for _, url, anchor in sorted(found):
+        key = _canonical(url)
+        if key not in seen:
+            seen.add(key)
+            candidates.append((url, anchor))
+    return candidates
+
+def score_url(url: str, topic: str, anchor: str = "", position: int = 0) -> float:
+    """
+    Score how likely a URL is to be a good top 10 source for a topic
+    
+    Args:
+        url: Candidate URL
+        topic: Topic being scraped
+        anchor: Link text the URL appeared with, if any
+        position: Order of appearance in the text (earlier is slightly better)
+    
+    Returns:
+        A score, or -1 for candidates that must never be used
+    """
+    parts = urlsplit(url)
+    domain = _registered_domain(parts.netloc)
+    if not domain or "." not in domain:
+        return -1.0
+    if any(domain == blocked or domain.endswith("." + blocked) for blocked in BLOCKED_DOMAINS):
+        return -1.0
+    
+    score = 0.0
+    for reputable, weight in REPUTABLE_DOMAINS.items():
+        if domain == reputable or domain.endswith("." + reputable):
+            score += weight
+            break
+    else:
+        score += next((weight for suffix, weight in REPUTABLE_SUFFIXES.items() if domain.endswith(suffix)), 0.0)
+    
+    path = parts.path.lower()
+    text = f"{path} {anchor.lower()}"
+    score += sum(0.5 for hint in LIST_PATH_HINTS if hint in text)
+    topic_tokens = {token for token in re.findall(r"[a-z0-9]+", topic.lower()) if len(token) > 2}
+    score += sum(1.0 for token in topic_tokens if token in text)
+    
+    # A bare homepage is rarely the list itself
+    if path in ("", "/"):
+        score -= 1.0
+    
+    return max(0.0, score - 0.1 * position)
+
+def rank_urls(text: str, topic: str) -> List[Tuple[str, float]]:
+    """
+    Rank every candidate URL in a block of text for a topic
+    
+    Args:
+        text: Text returned by the search agent
+        topic: Topic being scraped
+    
+    Returns:
+        (url, score) pairs, best first, excluding rejected candidates
+    """
+    scored = []
+    for position, (url, anchor) in enumerate(extract_candidate_urls(text)):
+        score = score_url(url, topic, anchor, position)
+        if score >= 0:
+            scored.append((url, score))
+    return sorted(scored, key=lambda pair: pair[1], reverse=True)
+
+def best_url(text: str, topic: str) -> Optional[str]:
+    """
+    Returns:
+        The highest-ranked URL in the text, or None if there is no usable candidate
+    """
+    ranked = rank_urls(text, topic)
+    return ranked[0][0] if ranked else None
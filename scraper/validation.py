@@ -0,0 +1,173 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Number of ranks a complete list has
+TARGET_RANKS = 10
+
+def _name_key(name: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", name.lower()).split())
+
+def _as_rank(value: Any) -> Optional[int]:
+    try:
+        return int(str(value).strip().lstrip("#").rstrip("."))
+    except (TypeError, ValueError):
+        return None
+
+class ListValidation:
+    """Quality of one extracted list, and what was done to fix it"""
+    
+    def __init__(self, target: int = TARGET_RANKS):
+        self.target = target
+        self.issues: List[str] = []
+        self.repairs: List[str] = []
+        self.missing_ranks: List[int] = []
+        self.item_count = 0
+    
+    @property
+    def ok(self) -> bool:
+        """True when every rank from 1 to the target has a named item"""
+        return not self.missing_ranks and self.item_count == self.target
+    
+    @property
+    def score(self) -> float:
+        """
+        Share of ranks filled, minus 0.05 for each problem found before
+        repair; 1.0 is a clean, complete list
+        """
+        filled = (self.target - len(self.missing_ranks)) / self.target if self.target else 0.0
+        return round(max(0.0, filled - 0.05 * len(self.issues)), 3)
+    
+    def record_fill(self, filled_ranks: List[int], item_count: int):
+        """Note ranks that a follow-up extraction filled in"""
+        if filled_ranks:
+            self.missing_ranks = [rank for rank in self.missing_ranks if rank not in filled_ranks]
+            self.repairs.append(f"re-extracted ranks {', '.join(str(rank) for rank in filled_ranks)} from the source")
+        self.item_count = item_count
+    
+    def __repr__(self) -> str:
+        return f"ListValidation(score={self.score}, missing_ranks={self.missing_ranks}, issues={self.issues}, repairs={self.repairs})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "score": self.score,
+            "issues": self.issues,
+            "repairs": self.repairs,
+            "missing_ranks": self.missing_ranks,
+        }
+
+def repair_items(items: List[Dict[str, Any]], target: int = TARGET_RANKS) -> Tuple[List[Dict[str, Any]], ListValidation]:
+    """
+    Check an extracted list and fix what can be fixed without the page
+    
+    Items with empty names and repeats of an earlier name are dropped.
+    Unparseable or repeated ranks, or 0-based ranks, renumber the list in
+    the order given. Anything past the target rank is trimmed. Gaps are left
+    in place: rank 4 missing from 1-10 usually means the extraction skipped
+    an item, and renumbering would shift every later rank. Those ranks are
+    reported in `missing_ranks` for a follow-up extraction.
+    
+    Args:
+        items: Item dictionaries with rank, name and details
+        target: Number of ranks a complete list has
+    
+    Returns:
+        The repaired items sorted by rank, and the validation report
+    """
+    validation = ListValidation(target)
+    
+    cleaned = []
+    # Position of each item in the list as given, for renumbering
+    order: Dict[int, int] = {}
+    empty = 0
+    for position, item in enumerate(items):
+        name = str(item.get("name") or "").strip()
+        if not name:
+            empty += 1
+            continue
+        details = item.get("details")
+        details = str(details).strip() or None if details is not None else None
+        cleaned.append({"rank": _as_rank(item.get("rank")), "name": name, "details": details})
+        order[id(cleaned[-1])] = position
+    if empty:
+        validation.issues.append(f"empty_name:{empty}")
+        validation.repairs.append(f"dropped {empty} unnamed items")
+    
+    # Keep the best-ranked copy of a repeated item
+    cleaned.sort(key=lambda item: (item["rank"] is None, item["rank"] or 0))
+    unique: List[Dict[str, Any]] = []
+    seen: Dict[str, Dict[str, Any]] = {}
+    for item in cleaned:
+        key = _name_key(item["name"])
+        if key in seen:
+            if not seen[key]["details"] and item["details"]:
+                seen[key]["details"] = item["details"]
+            continue
+        seen[key] = item
+        unique.append(item)
+    if len(unique) < len(cleaned):
+        validation.issues.append(f"duplicate_name:{len(cleaned) - len(unique)}")
+        validation.repairs.append(f"dropped {len(cleaned) - len(unique)} repeated items")
+    
+    ranks = [item["rank"] for item in unique]
+    known = [rank for rank in ranks if rank is not None]
+    if None in ranks or any(rank < 0 for rank in known) or len(set(known)) < len(known):
+        if None in ranks or any(rank < 0 for rank in known):
+            validation.issues.append("invalid_rank")
+        if len(set(known)) < len(known):
+            validation.issues.append(f"duplicate_rank:{len(known) - len(set(known))}")
+        # Keep the given order; unranked items go where they appeared
+        unique.sort(key=lambda item: order[id(item)])
+        for rank, item in enumerate(unique, start=1):
+            item["rank"] = rank
+        validation.repairs.append("renumbered ranks in list order")
+    elif known and min(known) == 0:
+        validation.issues.append("zero_based_rank")
+        for item in unique:
+            item["rank"] += 1
+        validation.repairs.append("shifted 0-based ranks to start at 1")
+    
+    unique.sort(key=lambda item: item["rank"])
+    kept = [item for item in unique if item["rank"] <= target]
+    if len(kept) < len(unique):
+        validation.issues.append(f"too_many:{len(unique)}")
+        validation.repairs.append(f"trimmed to rank {target}")
+    
+    present = {item["rank"] for item in kept}
+    validation.missing_ranks = [rank for rank in range(1, target + 1) if rank not in present]
+    validation.item_count = len(kept)
+    return kept, validation
+
+def fill_missing_ranks(
+    items: List[Dict[str, Any]],
+    extra: List[Dict[str, Any]],
+    missing_ranks: List[int],
+) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """
+    Slot items from a follow-up extraction into the ranks still missing
+    
+    Only items at one of the missing ranks and not already in the list are
+    taken; everything else the follow-up returned is ignored.
+    
+    Args:
+        items: The repaired list
+        extra: Items returned by the follow-up extraction
+        missing_ranks: Ranks the follow-up was asked for
+    
+    Returns:
+        The merged items sorted by rank, and the ranks that were filled
+    """
+    wanted = set(missing_ranks)
+    names = {_name_key(item["name"]) for item in items}
+    merged = list(items)
+    filled = []
+    for item in extra:
+        rank = _as_rank(item.get("rank"))
+        name = str(item.get("name") or "").strip()
+        if rank not in wanted or not name or _name_key(name) in names:
+            continue
+        merged.append({"rank": rank, "name": name, "details": item.get("details")})
+        names.add(_name_key(name))
+        wanted.discard(rank)
+        filled.append(rank)
+    merged.sort(key=lambda item: item["rank"])
+    return merged, sorted(filled)
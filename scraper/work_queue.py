@@ -0,0 +1,300 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from scraper.result_cache import normalize_topic
+
+# Default location of the shared work queue
+DEFAULT_QUEUE_PATH = ".top10_queue.sqlite"
+
+# Seconds a claimed topic stays leased without a heartbeat
+DEFAULT_LEASE_SECONDS = 300
+
+# Attempts before a topic is marked failed instead of requeued
+DEFAULT_MAX_ATTEMPTS = 3
+
+def default_worker_id() -> str:
+    """A worker id that is unique across hosts and processes"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class WorkQueue:
+    """
+    SQLite-backed queue of topics shared by any number of worker processes
+    
+    Workers claim a topic by taking a time-limited lease on its row, extend
+    the lease with heartbeats while they scrape, and write the result back
+    into the same row. Leases that run out (a crashed or stuck worker) are
+    handed to the next worker that asks for work.
+    
+    Topic states are pending, leased, done and failed. Every state change is
+    a short IMMEDIATE transaction, so processes on one host, or on several
+    hosts sharing a filesystem with working locks, never claim the same row.
+    
+    Methods may be called from any thread (e.g. through asyncio.to_thread,
+    so a busy lock never blocks the event loop); calls are serialized.
+    """
+    
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH, timeout: float = 30.0):
+        """
+        Args:
+            path: Path to the SQLite database file
+            timeout: Seconds to wait for another process's write lock
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        # One transaction at a time on the shared connection
+        self._lock = threading.RLock()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS queue_topics (
+                topic_key TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                result_json TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_queue_topics_claim ON queue_topics (status, position)"
+        )
+    
+    def _write(self, statements):
+        """Run (sql, params) pairs in one write transaction and return their row counts"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                counts = [self._conn.execute(sql, params).rowcount for sql, params in statements]
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return counts
+    
+    def enqueue(self, topics: Iterable[str]) -> int:
+        """
+        Add topics to the end of the queue, skipping any already in it
+        
+        Args:
+            topics: Topics to add
+        
+        Returns:
+            Number of topics added
+        """
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                position = self._conn.execute("SELECT COALESCE(MAX(position), -1) FROM queue_topics").fetchone()[0]
+                added = 0
+                for topic in topics:
+                    position += 1
+                    added += self._conn.execute(
+                        "INSERT OR IGNORE INTO queue_topics (topic_key, topic, position, updated_at) VALUES (?, ?, ?, ?)",
+                        (normalize_topic(topic), topic, position, now),
+                    ).rowcount
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return added
+    
+    def claim(
+        self,
+        worker_id: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> Optional[str]:
+        """
+        Lease the next pending topic, or one whose lease has run out
+        
+        Args:
+            worker_id: Id of the claiming worker
+            lease_seconds: How long the lease lasts without a heartbeat
+            max_attempts: Expired leases that already used this many
+                attempts are marked failed instead of handed out again
+        
+        Returns:
+            The claimed topic, or None if nothing is claimable right now
+        """
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # A topic that keeps killing its worker must not loop forever
+                self._conn.execute(
+                    """
+                    UPDATE queue_topics SET status = 'failed', error = 'lease expired', lease_owner = NULL, updated_at = ?
+                    WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+                    """,
+                    (now, now, max_attempts),
+                )
+                row = self._conn.execute(
+                    """
+                    SELECT topic_key, topic FROM queue_topics
+                    WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                    ORDER BY position
+                    LIMIT 1
+                    """,
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        """
+                        UPDATE queue_topics
+                        SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ?
+                        WHERE topic_key = ?
+                        """,
+                        (worker_id, now + lease_seconds, now, row[0]),
+                    )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return row[1] if row else None
+    
+    def heartbeat(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+        """
+        Extend every lease held by a worker
+        
+        Returns:
+            Number of leases extended
+        """
+        now = time.time()
+        return self._write([(
+            "UPDATE queue_topics SET lease_expires = ?, updated_at = ? WHERE status = 'leased' AND lease_owner = ?",
+            (now + lease_seconds, now, worker_id),
+        )])[0]
+    
+    def complete(self, topic: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Store a topic's result and mark it done
+        
+        A result is accepted even if the lease ran out, as long as no other
+        worker has finished the topic first.
+        
+        Returns:
+            True if the result was stored
+        """
+        return self._write([(
+            """
+            UPDATE queue_topics
+            SET status = 'done', result_json = ?, error = NULL, lease_owner = ?, lease_expires = NULL, updated_at = ?
+            WHERE topic_key = ? AND status != 'done'
+            """,
+            (json.dumps(result, ensure_ascii=False), worker_id, time.time(), normalize_topic(topic)),
+        )])[0] == 1
+    
+    def fail(self, topic: str, worker_id: str, error: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> bool:
+        """
+        Release a topic after a failed attempt
+        
+        Returns:
+            True if the topic was requeued, False if it is now marked failed
+        """
+        with self._lock:
+            key = normalize_topic(topic)
+            self._write([(
+                """
+                UPDATE queue_topics
+                SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE topic_key = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                (max_attempts, error, time.time(), key, worker_id),
+            )])
+            row = self._conn.execute("SELECT status FROM queue_topics WHERE topic_key = ?", (key,)).fetchone()
+            return row is not None and row[0] == "pending"
+    
+    def retry_failed(self) -> int:
+        """
+        Give failed topics a fresh set of attempts
+        
+        Returns:
+            Number of topics requeued
+        """
+        return self._write([(
+            "UPDATE queue_topics SET status = 'pending', attempts = 0, updated_at = ? WHERE status = 'failed'",
+            (time.time(),),
+        )])[0]
+    
+    def has_unfinished(self) -> bool:
+        """True while any topic is pending or leased"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM queue_topics WHERE status IN ('pending', 'leased') LIMIT 1"
+            ).fetchone()
+            return row is not None
+    
+    def results(self) -> Iterator[Dict[str, Any]]:
+        """Yield finished results in the order their topics were queued"""
+        cursor = self._conn.execute(
+            "SELECT result_json FROM queue_topics WHERE status = 'done' ORDER BY position"
+        )
+        for (result_json,) in cursor:
+            yield json.loads(result_json)
+    
+    def failures(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            Topic, attempts and last error of every failed topic
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT topic, attempts, error FROM queue_topics WHERE status = 'failed' ORDER BY position"
+            ).fetchall()
+            return [{"topic": topic, "attempts": attempts, "error": error} for topic, attempts, error in rows]
+    
+    def close(self):
+        """Close the underlying database connection"""
+        self._conn.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Number of topics in each state, and how many leases have run out
+        """
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM queue_topics GROUP BY status").fetchall())
+            expired = self._conn.execute(
+                "SELECT COUNT(*) FROM queue_topics WHERE status = 'leased' AND lease_expires < ?", (time.time(),)
+            ).fetchone()[0]
+            stats = {status: counts.get(status, 0) for status in ("pending", "leased", "done", "failed")}
+            stats["expired_leases"] = expired
+            return stats
+
+def merge(queue_path: str, output_file: str) -> int:
+    """
+    Write every finished result in a queue to one JSON array, in queue order
+    
+    The output file is replaced atomically.
+    
+    Args:
+        queue_path: Path to the work queue
+        output_file: Path to the JSON array to write
+    
+    Returns:
+        Number of results written
+    """
+    queue = WorkQueue(queue_path)
+    try:
+        results = list(queue.results())
+    finally:
+        queue.close()
+    
+    temp_file = f"{output_file}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, output_file)
+    return len(results)
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from scraper.browser_pool import BrowserPool
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+    
+    async def close(self):
+        self.closed = True
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+    
+    async def new_context(self):
+        return FakeContext()
+    
+    async def close(self):
+        self.closed = True
+
+class FakePool(BrowserPool):
+    async def _create_browser(self):
+        return FakeBrowser()
+
+def test_a_failed_lease_relaunches_the_slots_browser():
+    async def run():
+        pool = FakePool(size=1)
+        with pytest.raises(ConnectionError):
+            async with pool.lease() as lease:
+                crashed = lease.browser
+                raise ConnectionError("Target page, context or browser has been closed")
+        async with pool.lease() as lease:
+            relaunched = lease.browser
+        await pool.close()
+        return pool, crashed, relaunched
+    
+    pool, crashed, relaunched = asyncio.run(run())
+    
+    assert crashed.closed and relaunched is not crashed and relaunched.closed
+    assert pool.stats()["crashes"] == 1 and pool.stats()["relaunched"] == 1
+
+def test_a_clean_lease_keeps_the_browser_and_context_warm():
+    async def run():
+        pool = FakePool(size=1)
+        async with pool.lease() as first:
+            pass
+        async with pool.lease() as second:
+            pass
+        await pool.close()
+        return pool, first, second
+    
+    pool, first, second = asyncio.run(run())
+    
+    assert (second.browser, second.context) == (first.browser, first.context)
+    assert pool.stats()["hits"] == 1 and pool.stats()["relaunched"] == 0
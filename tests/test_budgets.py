@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from scraper.budgets import BudgetExceeded, StageBudget, parse_stage_budget, run_with_budget
+
+def test_parse_stage_budget_reads_every_limit():
+    budget = parse_stage_budget("search=steps:20,deadline:120s,tokens:150k")["search"]
+    
+    assert (budget.max_steps, budget.deadline_seconds, budget.max_tokens) == (20, 120.0, 150_000)
+
+def test_limits_not_given_keep_their_defaults():
+    budget = parse_stage_budget("scrape=tokens:2m")["scrape"]
+    
+    assert (budget.max_steps, budget.deadline_seconds, budget.max_tokens) == (30, 240, 2_000_000)
+
+def test_none_removes_a_limit():
+    assert parse_stage_budget("scrape=tokens:none")["scrape"].max_tokens is None
+
+def test_unknown_stages_are_rejected():
+    with pytest.raises(ValueError, match="search, url_extraction, text_extract, scrape, rescrape, gdoc"):
+        parse_stage_budget("serach=steps:5")
+
+@pytest.mark.parametrize("spec", ["search", "=steps:1", "search=steps", "search=foo:1", "search=steps:abc"])
+def test_malformed_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_stage_budget(spec)
+
+def test_run_with_budget_cancels_a_stage_past_its_deadline():
+    cancelled = []
+    
+    async def stage(_):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+    
+    with pytest.raises(BudgetExceeded) as raised:
+        asyncio.run(run_with_budget("search", stage, StageBudget(deadline_seconds=0.05)))
+    
+    assert cancelled == [True]
+    assert raised.value.error_code == "budget_deadline"
+    assert raised.value.to_dict()["stage"] == "search"
@@ -0,0 +1,59 @@
+import sqlite3
+
+from scraper.db_sink import DatabaseResultSink, SqliteBackend, list_id
+
+# A list the app created itself, with a random id
+APP_LIST = "0b7e4a52-93c1-4f0e-8d6a-2f5c9e1d7a30"
+
+def result(topic, ranks=range(1, 11), source_url="https://example.com/list"):
+    return {"topic": topic, "source_url": source_url, "items": [{"rank": rank, "name": f"{topic} {rank}", "details": None} for rank in ranks]}
+
+def rows(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+def test_rewrites_update_rows_and_drop_stale_ranks(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    sink = DatabaseResultSink(SqliteBackend(path), batch_size=10)
+    sink.write(result("fastest cars"))
+    sink.write(result("tallest trees"))
+    sink.flush()
+    sink.write(result("fastest cars", ranks=range(1, 6)))
+    sink.close()
+    
+    assert rows(path, "SELECT COUNT(*) FROM lists") == [(2,)]
+    assert rows(path, "SELECT COUNT(*) FROM list_items") == [(15,)]
+
+def test_a_list_stored_under_another_id_is_updated_in_place(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    backend = SqliteBackend(path)
+    with backend.transaction() as cursor:
+        cursor.execute(f"INSERT INTO lists (id, title, source_url) VALUES ('{APP_LIST}', 'fastest cars', 'https://example.com/list')")
+        cursor.execute(f"INSERT INTO list_items (id, list_id, rank, name) VALUES ('app-item', '{APP_LIST}', 1, 'Old name')")
+    sink = DatabaseResultSink(backend)
+    sink.write(result("fastest cars"))
+    sink.close()
+    
+    assert rows(path, "SELECT id FROM lists") == [(APP_LIST,)]
+    assert rows(path, "SELECT name FROM list_items WHERE rank = 1") == [("fastest cars 1",)]
+    assert rows(path, f"SELECT COUNT(*) FROM list_items WHERE list_id = '{APP_LIST}'") == [(10,)]
+    assert sink.stats()["rejected"] == 0
+
+def test_a_failed_batch_keeps_good_rows_and_drops_bad_ones(tmp_path, capsys):
+    path = str(tmp_path / "db.sqlite")
+    sink = DatabaseResultSink(SqliteBackend(path), batch_size=10)
+    bad = result("broken list")
+    bad["items"][0]["name"] = None
+    sink.write(result("fastest cars"))
+    sink.write(bad)
+    sink.flush()
+    sink.write(result("tallest trees"))
+    sink.close()
+    
+    assert sorted(rows(path, "SELECT title FROM lists")) == [("fastest cars",), ("tallest trees",)]
+    assert sink.stats()["rejected"] == 1
+    assert "Dropped broken list" in capsys.readouterr().out
+    assert list_id("broken list", "https://example.com/list") not in {id_ for id_, in rows(path, "SELECT id FROM lists")}
@@ -0,0 +1,42 @@
+import asyncio
+import os
+
+from scraper.export import DocumentExporter, DocumentSlugs, export_results, render_html
+
+def result(topic, name="Bugatti Chiron"):
+    return {"topic": topic, "source_url": "https://example.com/cars", "items": [{"rank": 1, "name": name, "details": None}]}
+
+def test_colliding_topics_get_numbered_slugs():
+    slugs = DocumentSlugs()
+    
+    assert [slugs("Fastest Cars"), slugs("fastest cars!"), slugs("Fastest Cars"), slugs("fastest  cars")] == [
+        "fastest-cars", "fastest-cars-2", "fastest-cars", "fastest-cars-3"
+    ]
+
+def test_export_results_writes_a_file_per_colliding_topic(tmp_path):
+    paths = export_results([result("Fastest Cars"), result("fastest cars!")], str(tmp_path))
+    
+    assert sorted(os.path.basename(path) for path in paths) == ["fastest-cars-2.md", "fastest-cars.md"]
+
+def test_combined_html_anchors_are_unique():
+    page = render_html([result("Fastest Cars"), result("fastest cars!")], "Top 10 Lists")
+    
+    assert page.count('id="fastest-cars"') == 1 and page.count('id="fastest-cars-2"') == 1
+    assert 'href="#fastest-cars-2"' in page
+
+def test_exporter_keeps_colliding_topics_and_replaces_resubmitted_ones(tmp_path):
+    async def run():
+        exporter = DocumentExporter(str(tmp_path), combined=True)
+        exporter.submit(result("Fastest Cars", "Old"))
+        exporter.submit(result("fastest cars!"))
+        exporter.submit(result("Fastest Cars", "New"))
+        await exporter.close()
+        return exporter
+    
+    exporter = asyncio.run(run())
+    
+    assert sorted(os.listdir(tmp_path)) == ["fastest-cars-2.md", "fastest-cars.md", "top10_lists.md"]
+    assert "New" in (tmp_path / "fastest-cars.md").read_text()
+    combined = (tmp_path / "top10_lists.md").read_text()
+    assert "Old" not in combined and combined.count("Bugatti Chiron") == 1
+    assert exporter.stats()["topics_written"] == 3
@@ -0,0 +1,24 @@
+import asyncio
+
+from scraper.fetch_scheduler import FetchScheduler
+
+def test_visit_only_starts_the_work_once_the_slot_is_held():
+    started = []
+    
+    async def work(name):
+        started.append(name)
+        await asyncio.sleep(0)
+        return name
+    
+    async def run():
+        scheduler = FetchScheduler(domain_concurrency=1, domain_interval=0)
+        first = asyncio.ensure_future(scheduler.visit("https://example.com/a", lambda: work("first")))
+        waiting = asyncio.ensure_future(scheduler.visit("https://www.example.com/b", lambda: work("cancelled")))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        return await first, await asyncio.gather(waiting, return_exceptions=True)
+    
+    result, (cancelled,) = asyncio.run(run())
+    
+    assert result == "first" and isinstance(cancelled, asyncio.CancelledError)
+    assert started == ["first"]
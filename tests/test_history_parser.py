@@ -0,0 +1,49 @@
+import json
+
+from scraper.history_parser import extract_items_from_text, extract_list_items, iter_history_texts, iter_json_values
+
+def _history(*texts):
+    return {"history": [{"result": [{"extracted_content": text}]} for text in texts]}
+
+def _birds(count=10):
+    return [{"rank": rank, "name": f"Bird {rank}", "length": f"{rank} in"} for rank in range(1, count + 1)]
+
+def test_iter_json_values_finds_fenced_and_bare_json():
+    text = 'Found it:\n```json\n{"a": [1, 2]}\n```\nand also [3, 4] but not {broken'
+    
+    assert list(iter_json_values(text)) == [{"a": [1, 2]}, [3, 4]]
+
+def test_iter_history_texts_skips_empty_results():
+    history = {"history": [{"result": [{"extracted_content": None}, {"extracted_content": "one"}]}, {"result": None}]}
+    
+    assert list(iter_history_texts(history)) == ["one"]
+
+def test_json_list_under_topic_key_is_preferred():
+    text = json.dumps({"related_links": ["a", "b", "c"], "smallest_birds": _birds()})
+    
+    items = extract_items_from_text(text, "smallest birds")
+    
+    assert [item["name"] for item in items] == [f"Bird {rank}" for rank in range(1, 11)]
+    assert items[0]["details"] == "Length: 1 in"
+
+def test_fenced_json_in_agent_output():
+    text = "Here is the list:\n```json\n" + json.dumps(_birds()) + "\n```"
+    
+    assert len(extract_items_from_text(text, "birds")) == 10
+
+def test_numbered_lines_fallback():
+    text = "\n".join(f"{rank}. Bird {rank} - about {rank} inches" for rank in range(10, 0, -1))
+    
+    items = extract_items_from_text(text, "birds")
+    
+    assert [item["rank"] for item in items] == list(range(1, 11))
+    assert items[0] == {"rank": 1, "name": "Bird 1", "details": "about 1 inches"}
+
+def test_only_the_top_ten_are_taken():
+    assert len(extract_items_from_text(json.dumps(_birds(15)), "birds")) == 10
+
+def test_extract_list_items_needs_min_items():
+    history = _history(json.dumps(_birds(3)), "nothing here", json.dumps({"list": _birds()}))
+    
+    assert len(extract_list_items(history, "birds")) == 10
+    assert extract_list_items(_history(json.dumps(_birds(3))), "birds") == []
@@ -0,0 +1,40 @@
+import json
+import os
+
+import pytest
+
+from scraper.html_extractor import DEFAULT_MIN_CONFIDENCE, extract_ranked_items
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+FIXTURES = sorted(name[:-len(".html")] for name in os.listdir(FIXTURES_DIR) if name.endswith(".html"))
+
+def _read(name: str, extension: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name + extension), "r", encoding="utf-8") as f:
+        return f.read()
+
+@pytest.mark.parametrize("name", FIXTURES)
+def test_fixture_matches_expected(name):
+    expected = json.loads(_read(name, ".json"))
+    extraction = extract_ranked_items(_read(name, ".html"))
+    
+    assert extraction is not None
+    assert extraction.method == expected["method"]
+    assert extraction.items == expected["items"]
+    assert extraction.confidence >= DEFAULT_MIN_CONFIDENCE
+
+def test_navigation_lists_are_not_confident():
+    links = "".join(f'<li><a href="/page/{index}">Page {index}</a></li>' for index in range(1, 11))
+    extraction = extract_ranked_items(f"<html><body><ul>{links}</ul></body></html>")
+    
+    assert extraction is None or extraction.confidence < DEFAULT_MIN_CONFIDENCE
+
+def test_short_lists_are_ignored():
+    items = "".join(f"<li>Item {index}</li>" for index in range(1, 4))
+    
+    assert extract_ranked_items(f"<html><body><ol>{items}</ol></body></html>") is None
+
+def test_countdown_is_returned_in_rank_order():
+    extraction = extract_ranked_items(_read("heading_countdown", ".html"))
+    
+    assert [item["rank"] for item in extraction.items] == list(range(1, 11))
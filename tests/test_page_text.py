@@ -0,0 +1,13 @@
+from scraper.page_text import PageText
+
+def test_rescrape_text_holds_the_missing_ranks():
+    page = PageText("Fastest cars", ["1. Chiron\n2. Jesko\n3. Tuatara", "Intro to the rest", "4. Venom F5\n5. Agera RS"], False)
+    
+    assert page.best_chunk().startswith("1. Chiron")
+    assert page.chunk_for_ranks([4, 5], ["Chiron", "Jesko", "Tuatara"]) == "4. Venom F5\n5. Agera RS"
+
+def test_unnumbered_lists_continue_after_the_last_extracted_item():
+    page = PageText("Fastest cars", ["Intro\nChiron\nJesko\nTuatara", "Venom F5\nAgera RS"], False)
+    
+    assert page.chunk_for_ranks([4, 5], ["Chiron", "jesko", "Tuatara"]) == "Venom F5\nAgera RS"
+    assert page.chunk_for_ranks([4, 5], ["Unknown car"]) == page.best_chunk()
@@ -0,0 +1,22 @@
+from scraper.result_sink import JsonlResultSink, MultiSink, ResultSink, read_results
+
+class FailingSink(ResultSink):
+    def write(self, result):
+        raise ConnectionError("database unreachable")
+    
+    def close(self):
+        raise ConnectionError("database unreachable")
+
+def result(topic):
+    return {"topic": topic, "items": [{"rank": 1, "name": "Item", "details": None}]}
+
+def test_multi_sink_reports_a_failing_sink_and_keeps_the_others(tmp_path, capsys):
+    path = str(tmp_path / "results.jsonl")
+    sinks = MultiSink([FailingSink(), JsonlResultSink(path)])
+    sinks.write(result("fastest cars"))
+    sinks.close()
+    
+    assert [record["topic"] for record in read_results(path)] == ["fastest cars"]
+    output = capsys.readouterr().out
+    assert "Error writing fastest cars to FailingSink: database unreachable" in output
+    assert "Error closing FailingSink" in output
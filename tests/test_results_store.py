@@ -0,0 +1,34 @@
+from scraper.results_store import ResultsStore
+
+def result(topic, name="Bee hummingbird", source_url="https://example.com/birds"):
+    return {"topic": topic, "source_url": source_url, "items": [{"rank": 1, "name": name, "details": "Cuba"}]}
+
+def test_rewriting_a_topic_replaces_its_items_in_the_index(tmp_path):
+    store = ResultsStore(str(tmp_path / "store.sqlite"))
+    store.write(result("Smallest birds"))
+    store.write(result("smallest birds!", name="Weebill"))
+    
+    assert store.get("smallest birds")["items"][0]["name"] == "Weebill"
+    assert store.find_item("hummingbird") == []
+    assert [row["topic"] for row in store.find_item("weebill")] == ["smallest birds!"]
+    store.close()
+
+def test_a_bad_result_is_dropped_without_losing_the_batch(tmp_path, capsys):
+    store = ResultsStore(str(tmp_path / "store.sqlite"), batch_size=10)
+    store.write(result("Smallest birds"))
+    store.flush()
+    store.write(result("Smallest birds", name=None))
+    store.write(result("Fastest birds", name="Peregrine falcon"))
+    store.flush()
+    
+    # The failed rewrite left the stored list, and its index entries, as they were
+    assert store.get("smallest birds")["items"][0]["name"] == "Bee hummingbird"
+    assert [row["topic"] for row in store.find_item("hummingbird")] == ["Smallest birds"]
+    assert store.get("fastest birds") is not None
+    assert store.stats() == {"lists": 2, "items": 2, "written": 2, "rejected": 1}
+    assert "Dropped Smallest birds" in capsys.readouterr().out
+    
+    # Nothing is left buffered to fail again
+    store.write(result("Tallest birds", name="Ostrich"))
+    assert store.stats()["lists"] == 3
+    store.close()
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from scraper.topic_index import TopicIndex, cluster_topics, jaccard, topic_tokens, unique_topics
+
+def test_paraphrases_share_tokens():
+    assert topic_tokens("Smallest birds in the United States") == {"small", "bird", "us"}
+    assert topic_tokens("tiniest american birds") == topic_tokens("smallest US birds")
+    assert topic_tokens("Top 10 largest lakes of all time") == topic_tokens("biggest lake")
+
+def test_lookup_finds_paraphrases_only():
+    index = TopicIndex()
+    index.add_many(["smallest birds in north america", "fastest cars"])
+    
+    assert index.lookup("Quickest cars!") == ("fastest cars", 1.0)
+    assert index.lookup("tiniest birds of north america") == ("smallest birds in north america", 1.0)
+    assert index.lookup("smallest birds in america") is None
+    assert index.lookup("fastest boats") is None
+    assert index.lookup("the top 10") is None
+
+@pytest.mark.parametrize("topic, other", [
+    ("least dangerous animals in australia", "most dangerous animals in australia"),
+    ("smallest birds in south america", "smallest birds in the united states"),
+    ("largest capital cities in europe", "largest cities in europe"),
+    ("fastest electric cars in europe", "fastest cars in europe"),
+    ("top universities", "universities"),
+])
+def test_different_lists_are_not_merged(topic, other):
+    index = TopicIndex()
+    index.add(other)
+    
+    assert index.lookup(topic) is None
+    assert len(cluster_topics([other, topic])) == 2
+
+def test_topics_without_content_words_are_not_indexed():
+    index = TopicIndex()
+    index.add("the top ten of all time")
+    index.add_many(["fastest cars", "Fastest Cars!"])
+    
+    assert len(index) == 1
+
+def test_lookup_agrees_with_a_linear_scan():
+    rng = random.Random(3)
+    words = "red blue green river lake bird car tree city song".split()
+    topics = [" ".join(rng.sample(words, rng.randint(2, 5))) for _ in range(300)]
+    index = TopicIndex(0.6)
+    index.add_many(topics[:200])
+    
+    for query in topics[200:]:
+        tokens = topic_tokens(query)
+        # Only topics with as many content words can match
+        best = max([jaccard(tokens, topic_tokens(topic)) for topic in topics[:200] if len(topic_tokens(topic)) == len(tokens)] or [0.0])
+        match = index.lookup(query)
+        if best >= 0.6:
+            assert match is not None and match[1] == best
+        else:
+            assert match is None
+
+def test_unique_topics_keeps_the_first_spelling():
+    assert unique_topics(["fastest cars", "tallest trees", "Fastest  Cars!"]) == ["fastest cars", "tallest trees"]
+
+def test_cluster_topics_groups_paraphrases_under_the_first():
+    clusters = cluster_topics([
+        "smallest US birds",
+        "tallest buildings",
+        "tiniest american birds",
+        "largest lakes in Africa",
+        "biggest lakes of africa",
+    ])
+    
+    assert list(clusters) == ["smallest US birds", "tallest buildings", "largest lakes in Africa"]
+    assert clusters["smallest US birds"] == [("smallest US birds", 1.0), ("tiniest american birds", 1.0)]
+    assert [topic for topic, _ in clusters["largest lakes in Africa"]] == ["largest lakes in Africa", "biggest lakes of africa"]
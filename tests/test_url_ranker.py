@@ -0,0 +1,37 @@
+from scraper.url_ranker import best_url, extract_candidate_urls, rank_urls, score_url
+
+SEARCH_OUTPUT = """
+I searched for the smallest birds and found these:
+1. [Top 10 smallest birds](https://a-z-animals.com/blog/top-10-smallest-birds/).
+2. https://www.google.com/search?q=smallest+birds
+3. See also www.example.com/blog/post, and en.wikipedia.org/wiki/List_of_smallest_birds
+4. https://A-Z-Animals.com/blog/top-10-smallest-birds
+"""
+
+def test_extract_candidate_urls_finds_every_form_once():
+    urls = [url for url, _ in extract_candidate_urls(SEARCH_OUTPUT)]
+    
+    assert urls == [
+        "https://a-z-animals.com/blog/top-10-smallest-birds/",
+        "https://www.google.com/search?q=smallest+birds",
+        "https://www.example.com/blog/post",
+        "https://en.wikipedia.org/wiki/List_of_smallest_birds",
+    ]
+
+def test_markdown_anchor_text_is_kept():
+    assert extract_candidate_urls(SEARCH_OUTPUT)[0][1] == "Top 10 smallest birds"
+
+def test_search_engines_and_social_media_are_rejected():
+    assert score_url("https://www.google.com/search?q=birds", "birds") == -1.0
+    assert score_url("https://m.facebook.com/birds", "birds") == -1.0
+    assert all("google.com" not in url for url, _ in rank_urls(SEARCH_OUTPUT, "smallest birds"))
+
+def test_reputable_topical_pages_beat_unknown_ones():
+    topical = score_url("https://en.wikipedia.org/wiki/List_of_smallest_birds", "smallest birds")
+    
+    assert topical > score_url("https://www.example.com/blog/post", "smallest birds")
+    assert score_url("https://britannica.com/", "smallest birds") < score_url("https://britannica.com/list/smallest-birds", "smallest birds")
+
+def test_best_url():
+    assert best_url(SEARCH_OUTPUT, "smallest birds") == "https://en.wikipedia.org/wiki/List_of_smallest_birds"
+    assert best_url("no links here", "birds") is None
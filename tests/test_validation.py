@@ -0,0 +1,72 @@
+from scraper.validation import fill_missing_ranks, repair_items
+
+def items(*names, start=1):
+    return [{"rank": rank, "name": name, "details": None} for rank, name in enumerate(names, start=start)]
+
+def test_a_clean_list_is_left_alone():
+    clean = items(*"ABCDEFGHIJ")
+    
+    repaired, validation = repair_items(clean)
+    
+    assert repaired == clean
+    assert validation.ok and validation.score == 1.0
+    assert validation.to_dict() == {"score": 1.0, "issues": [], "repairs": [], "missing_ranks": []}
+
+def test_gaps_are_reported_not_renumbered():
+    repaired, validation = repair_items([item for item in items(*"ABCDEFGHIJ") if item["rank"] != 4])
+    
+    assert [item["rank"] for item in repaired] == [1, 2, 3, 5, 6, 7, 8, 9, 10]
+    assert validation.missing_ranks == [4]
+    assert not validation.ok and validation.score == 0.9
+
+def test_empty_and_repeated_names_are_dropped():
+    given = items("Hummingbird", "", "Kinglet", "hummingbird!")
+    given[3]["details"] = "Tiny"
+    
+    repaired, validation = repair_items(given, target=3)
+    
+    assert [(item["rank"], item["name"]) for item in repaired] == [(1, "Hummingbird"), (3, "Kinglet")]
+    assert repaired[0]["details"] == "Tiny"
+    assert validation.issues == ["empty_name:1", "duplicate_name:1"]
+    assert validation.missing_ranks == [2]
+
+def test_repeated_or_unparseable_ranks_renumber_in_list_order():
+    given = [
+        {"rank": "#1", "name": "A"},
+        {"rank": "first", "name": "B"},
+        {"rank": 1, "name": "C"},
+    ]
+    
+    repaired, validation = repair_items(given, target=3)
+    
+    assert [(item["rank"], item["name"]) for item in repaired] == [(1, "A"), (2, "B"), (3, "C")]
+    assert validation.issues == ["invalid_rank", "duplicate_rank:1"]
+    assert validation.repairs == ["renumbered ranks in list order"]
+
+def test_zero_based_ranks_are_shifted():
+    repaired, validation = repair_items(items(*"ABCDEFGHIJ", start=0))
+    
+    assert [item["rank"] for item in repaired] == list(range(1, 11))
+    assert validation.issues == ["zero_based_rank"] and not validation.missing_ranks
+
+def test_ranks_past_the_target_are_trimmed():
+    repaired, validation = repair_items(items(*"ABCDEFGHIJKL"))
+    
+    assert len(repaired) == 10 and repaired[-1]["name"] == "J"
+    assert validation.issues == ["too_many:12"]
+
+def test_fill_missing_ranks_takes_only_new_items_at_missing_ranks():
+    partial, validation = repair_items([item for item in items(*"ABCDEFGHIJ") if item["rank"] not in (4, 7)])
+    extra = [
+        {"rank": 4, "name": "D", "details": "found"},
+        {"rank": 7, "name": "a"},
+        {"rank": 9, "name": "Z"},
+    ]
+    
+    merged, filled = fill_missing_ranks(partial, extra, validation.missing_ranks)
+    validation.record_fill(filled, len(merged))
+    
+    assert filled == [4]
+    assert [item["name"] for item in merged] == list("ABCDEFHIJ")
+    assert validation.missing_ranks == [7]
+    assert validation.repairs == ["re-extracted ranks 4 from the source"]
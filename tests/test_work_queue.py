@@ -0,0 +1,77 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scraper.work_queue import WorkQueue, merge
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    yield queue
+    queue.close()
+
+def test_enqueue_skips_duplicates(queue):
+    assert queue.enqueue(["fastest birds", "tallest buildings"]) == 2
+    assert queue.enqueue(["Fastest Birds", "longest rivers"]) == 1
+    assert queue.stats()["pending"] == 3
+
+def test_claims_follow_queue_order_and_never_repeat(queue):
+    queue.enqueue(["a topic", "b topic"])
+    
+    assert queue.claim("w1") == "a topic"
+    assert queue.claim("w2") == "b topic"
+    assert queue.claim("w1") is None
+
+def test_concurrent_claims_from_threads_are_unique(queue):
+    topics = [f"topic {index}" for index in range(50)]
+    queue.enqueue(topics)
+    
+    def drain(worker):
+        claimed = []
+        while (topic := queue.claim(worker)) is not None:
+            claimed.append(topic)
+        return claimed
+    
+    with ThreadPoolExecutor(8) as pool:
+        claimed = [topic for batch in pool.map(drain, [f"w{index}" for index in range(8)]) for topic in batch]
+    
+    assert sorted(claimed) == sorted(topics)
+
+def test_expired_lease_is_handed_to_another_worker(queue):
+    queue.enqueue(["slow topic"])
+    assert queue.claim("w1", lease_seconds=-1) == "slow topic"
+    
+    assert queue.claim("w2") == "slow topic"
+    assert queue.stats()["leased"] == 1
+
+def test_heartbeat_keeps_the_lease(queue):
+    queue.enqueue(["slow topic"])
+    queue.claim("w1", lease_seconds=-1)
+    
+    assert queue.heartbeat("w1", lease_seconds=60) == 1
+    assert queue.claim("w2") is None
+
+def test_failures_are_retried_until_max_attempts(queue):
+    queue.enqueue(["flaky topic"])
+    
+    queue.claim("w1")
+    assert queue.fail("flaky topic", "w1", "boom", max_attempts=2) is True
+    queue.claim("w1")
+    assert queue.fail("flaky topic", "w1", "boom again", max_attempts=2) is False
+    assert queue.failures() == [{"topic": "flaky topic", "attempts": 2, "error": "boom again"}]
+    
+    assert queue.retry_failed() == 1
+    assert queue.claim("w1") == "flaky topic"
+
+def test_complete_stores_the_first_result_only(queue, tmp_path):
+    queue.enqueue(["b topic", "a topic"])
+    for topic in ("b topic", "a topic"):
+        queue.claim("w1")
+        assert queue.complete(topic, "w1", {"topic": topic, "items": []}) is True
+    assert queue.complete("a topic", "w2", {"topic": "a topic", "items": [1]}) is False
+    assert not queue.has_unfinished()
+    
+    output = tmp_path / "results.json"
+    assert merge(queue.path, str(output)) == 2
+    assert [result["topic"] for result in json.loads(output.read_text())] == ["b topic", "a topic"]
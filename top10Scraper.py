@@ -2,33 +2,254 @@ import asyncio
 import json
 import os
 import argparse
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
-from dotenv import load_dotenv
-# from langchain_anthropic import ChatAnthropic  # Commented out
-from browser_use import Agent, Controller
-from langchain_google_genai import ChatGoogleGenerativeAI
-from pydantic import SecretStr
-from browser_use import BrowserConfig, Browser
-
-load_dotenv()  # Load environment variables from .env file
-
-# Define the output format with Pydantic models
-class ListItem(BaseModel):
-    """Model for a single item in a top 10 list"""
-    rank: int
-    name: str
-    details: Optional[str] = None
-
-class TopTenList(BaseModel):
-    """Model for the complete list of items"""
-    items: List[ListItem]
-    source_url: Optional[str] = None 
-
-# Create a controller with our output model
-controller = Controller(output_model=TopTenList)
-
-async def create_google_doc_via_browser(browser, topic, items, source_url):
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterable, Iterable, List, Optional, Dict, Any, Union
+
+# browser_use, langchain and pydantic take seconds to import, so they are only
+# loaded once an agent or model is actually needed. Keep module-level imports
+# here limited to the standard library and the lightweight scraper modules.
+from scraper.browser_pool import BrowserLease, BrowserPool
+from scraper.budgets import (
+    DEFAULT_STAGE_BUDGETS,
+    DEFAULT_TOPIC_DEADLINE,
+    BudgetExceeded,
+    ScrapeBudgets,
+    parse_stage_budget,
+    run_with_budget,
+)
+from scraper.db_sink import DEFAULT_DB_BATCH_SIZE, open_db_sink
+from scraper.export import EXPORT_FORMATS, DocumentExporter, export_results
+from scraper.fetch_scheduler import (
+    DEFAULT_DOMAIN_CONCURRENCY,
+    DEFAULT_DOMAIN_INTERVAL,
+    DEFAULT_FETCH_RETRIES,
+    FetchScheduler,
+)
+from scraper.history_parser import extract_items_from_text, extract_list_items
+from scraper.html_extractor import DEFAULT_MIN_CONFIDENCE, FastPathStats, extract_ranked_items
+from scraper.llm_cache import (
+    CACHE_MODES,
+    DEFAULT_LLM_CACHE_MAX_MB,
+    DEFAULT_LLM_CACHE_PATH,
+    create_llm_cache,
+)
+from scraper.metrics import MetricsRecorder
+from scraper.page_text import DEFAULT_TEXT_MAX_TOKENS, extract_page_text
+from scraper.profiling import DEFAULT_PROFILE_TOP, TopicProfiler
+from scraper.result_cache import (
+    DEFAULT_CACHE_PATH,
+    DEFAULT_MAX_AGE_HOURS,
+    DEFAULT_MAX_ENTRIES,
+    TopicResultCache,
+    normalize_topic,
+)
+from scraper.result_sink import JsonlResultSink, MultiSink, ResultSink, compact, completed_topics, default_sink_path
+from scraper.results_store import DEFAULT_STORE_PATH, ResultsStore
+from scraper.topic_index import DEFAULT_DUPLICATE_THRESHOLD, TopicIndex, cluster_topics, print_cluster_report, unique_topics
+from scraper.url_ranker import best_url
+from scraper.validation import fill_missing_ranks, repair_items
+from scraper.work_queue import (
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_MAX_ATTEMPTS,
+    DEFAULT_QUEUE_PATH,
+    WorkQueue,
+    default_worker_id,
+    merge,
+)
+
+if TYPE_CHECKING:
+    from scraper.sqlite_llm_cache import DiskLLMCache
+
+def __getattr__(name: str):
+    """Keep `from top10Scraper import TopTenList` and friends working without eager imports"""
+    if name in ("ListItem", "TopTenList"):
+        from scraper import models
+        return getattr(models, name)
+    if name == "controller":
+        return get_scrape_controller()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@lru_cache(maxsize=None)
+def get_scrape_controller():
+    """
+    Returns:
+        The browser_use Controller whose output model is TopTenList
+    """
+    from scraper.models import TopTenList
+    
+    # Create a controller with our output model
+    return create_controller(output_model=TopTenList)
+
+@lru_cache(maxsize=None)
+def load_environment():
+    """Load environment variables from .env file, once per process"""
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+
+# Default LLM request budget per minute, shared by all topics in a run
+DEFAULT_LLM_RPM = 10
+
+# "agent" scrapes with a vision browser agent; "text" reads the fetched page
+# with one structured-output call and keeps the agent for paginated pages
+SCRAPE_MODES = ("agent", "text")
+
+# Extra seconds before the topic deadline backstop cancels a whole topic
+TOPIC_DEADLINE_GRACE = 1.0
+
+# How often the HTML fast path replaced the scrape agent in this process
+fast_path_stats = FastPathStats()
+
+# Per-topic, per-stage timing and LLM usage for this process
+metrics = MetricsRecorder()
+
+# Prompt/response cache shared by every LLM built in this process (set by main)
+llm_cache: Optional["DiskLLMCache"] = None
+
+# Per-domain politeness for page fetches and scrape agent visits (replaced by main)
+fetch_scheduler = FetchScheduler()
+
+# Writes cProfile and await timings for selected topics (set by main with --profile)
+profiler: Optional[TopicProfiler] = None
+
+def create_rate_limiter(requests_per_minute: float = DEFAULT_LLM_RPM):
+    """
+    Create a token-bucket rate limiter for LLM calls
+    
+    Args:
+        requests_per_minute: Sustained number of LLM requests allowed per minute
+    
+    Returns:
+        A rate limiter that can be shared by every LLM in a run
+    """
+    from langchain_core.rate_limiters import InMemoryRateLimiter
+    
+    return InMemoryRateLimiter(
+        requests_per_second=requests_per_minute / 60,
+        check_every_n_seconds=0.1,
+        max_bucket_size=1,
+    )
+
+class LazyRateLimiter:
+    """
+    A shared rate limiter that is only built, importing LangChain, when the
+    first LLM call needs it, so topics answered from the result cache never
+    pay for the import
+    """
+    
+    def __init__(self, requests_per_minute: float = DEFAULT_LLM_RPM):
+        self.requests_per_minute = requests_per_minute
+        self._limiter = None
+    
+    def get(self):
+        if self._limiter is None:
+            self._limiter = create_rate_limiter(self.requests_per_minute)
+        return self._limiter
+    
+    def acquire(self, blocking: bool = True) -> bool:
+        return self.get().acquire(blocking=blocking)
+    
+    async def aacquire(self, blocking: bool = True) -> bool:
+        return await self.get().aacquire(blocking=blocking)
+
+def build_llm(rate_limiter=None):
+    """
+    Build the Gemini model used by the agents
+    
+    Args:
+        rate_limiter: Optional rate limiter (or LazyRateLimiter) applied to
+            every call of the model
+    
+    Returns:
+        A configured ChatGoogleGenerativeAI instance
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from pydantic import SecretStr
+    
+    load_environment()
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable is not set")
+    
+    return ChatGoogleGenerativeAI(
+        model='gemini-2.0-flash-exp',
+        api_key=SecretStr(api_key),
+        rate_limiter=rate_limiter.get() if isinstance(rate_limiter, LazyRateLimiter) else rate_limiter,
+        callbacks=[metrics.llm_callback()],
+        cache=llm_cache,
+    )
+
+def create_controller(**kwargs):
+    """
+    Create a browser_use Controller
+    
+    Like create_agent, the single place benchmarks and tests substitute.
+    
+    Args:
+        **kwargs: Arguments passed straight to Controller
+    
+    Returns:
+        The new Controller
+    """
+    from browser_use import Controller
+    
+    return Controller(**kwargs)
+
+def create_agent(**kwargs):
+    """
+    Create a browser_use Agent
+    
+    Every agent in the scraper is built here, so benchmarks and tests can
+    substitute a scripted agent in one place.
+    
+    Args:
+        **kwargs: Arguments passed straight to Agent
+    
+    Returns:
+        The new Agent
+    """
+    from browser_use import Agent
+    
+    return Agent(**kwargs)
+
+async def run_stage(stage: str, run, budgets: Optional[ScrapeBudgets] = None, deadline: Optional[float] = None):
+    """
+    Run an agent or LLM stage under its budget
+    
+    Args:
+        stage: Name of the open metrics stage
+        run: Called with the stage's step limit (or None) to start the work
+        budgets: Budgets for this run; None runs the stage unbounded
+        deadline: time.monotonic() value the topic must finish by
+    
+    Returns:
+        Whatever `run` returns
+    
+    Raises:
+        BudgetExceeded: If the stage was cancelled for breaking its budget
+    """
+    if budgets is None:
+        return await run(None)
+    return await run_with_budget(stage, run, budgets.for_stage(stage), metrics.current_stage(), deadline)
+
+def run_agent(agent):
+    """
+    Returns:
+        A `run` callable for run_stage that passes the step limit to the agent
+    """
+    return lambda max_steps: agent.run() if max_steps is None else agent.run(max_steps=max_steps)
+
+async def create_google_doc_via_browser(
+    browser,
+    topic,
+    items,
+    source_url,
+    rate_limiter=None,
+    browser_context=None,
+    budgets: Optional[ScrapeBudgets] = None,
+    deadline: Optional[float] = None,
+):
     """
     Create a Google Doc using the browser
     
@@ -37,18 +258,16 @@ async def create_google_doc_via_browser(browser, topic, items, source_url):
         topic: Topic of the list
         items: List of items
         source_url: Source URL
+        rate_limiter: Optional rate limiter shared with the scrape agents
+        browser_context: Optional context to reuse, e.g. one leased from a BrowserPool
+        budgets: Optional budgets; the agent runs under the "gdoc" stage budget
+        deadline: time.monotonic() value the topic must finish by
     """
     # Create a new controller for this task
-    from browser_use import Controller
-    docs_controller = Controller()
+    docs_controller = create_controller()
     
     # Use the Gemini model for the Google Docs task
-    import os
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    from pydantic import SecretStr
-    
-    api_key = os.getenv("GEMINI_API_KEY")
-    llm = ChatGoogleGenerativeAI(model='gemini-2.0-flash-exp', api_key=SecretStr(api_key))
+    llm = build_llm(rate_limiter)
     
     # Format the content for the document
     content = f"# Top 10 {topic.title()}\n\n"
@@ -78,18 +297,19 @@ async def create_google_doc_via_browser(browser, topic, items, source_url):
     """
     
     # Create the agent for Google Docs task
-    from browser_use import Agent
-    docs_agent = Agent(
+    docs_agent = create_agent(
         task=docs_task,
         llm=llm,
         controller=docs_controller,
         use_vision=True,
-        browser=browser  # Use the existing browser
+        browser=browser,  # Use the existing browser
+        browser_context=browser_context
     )
     
     # Run the Google Docs agent
     print(f"Creating Google Doc for {topic}...")
-    docs_history = await docs_agent.run()
+    docs_history = await run_stage("gdoc", run_agent(docs_agent), budgets, deadline)
+    metrics.record_agent_history(docs_history)
     
     # Check for errors
     if docs_history.has_errors():
@@ -114,7 +334,19 @@ async def create_google_doc_via_browser(browser, topic, items, source_url):
     return doc_url
 
 # Modify the find_and_scrape_top_10_list function to use the browser to create a Google Doc
-async def find_and_scrape_top_10_list(topic: str, use_local_browser: bool = False, create_gdoc: bool = False):
+async def find_and_scrape_top_10_list(
+    topic: str,
+    use_local_browser: bool = False,
+    create_gdoc: bool = False,
+    rate_limiter=None,
+    browser_pool: Optional[BrowserPool] = None,
+    result_cache: Optional[TopicResultCache] = None,
+    refresh: bool = False,
+    fast_path_min_confidence: Optional[float] = DEFAULT_MIN_CONFIDENCE,
+    mode: str = "agent",
+    text_max_tokens: int = DEFAULT_TEXT_MAX_TOKENS,
+    budgets: Optional[ScrapeBudgets] = None,
+):
     """
     Find and scrape a top 10 list for a given topic
     
@@ -122,27 +354,112 @@ async def find_and_scrape_top_10_list(topic: str, use_local_browser: bool = Fals
         topic: The topic to find a top 10 list for (e.g., "fastest birds", "tallest buildings")
         use_local_browser: Whether to use a local browser instance
         create_gdoc: Whether to create a Google Doc with the results
-        
+        rate_limiter: Optional rate limiter shared across concurrent topics
+        browser_pool: Optional shared pool to lease the browser from; a
+            single-use pool is created and closed when omitted
+        result_cache: Optional cache of earlier results; a fresh entry is
+            returned without starting a browser
+        refresh: Ignore any cached entry and scrape the topic again
+        fast_path_min_confidence: Minimum confidence for the HTML extractor
+            to replace the scrape agent (None disables the fast path)
+        mode: "agent" or "text" (see SCRAPE_MODES)
+        text_max_tokens: Token budget for the page text sent in text mode
+        budgets: Optional step, deadline and token budgets; a stage that
+            breaks one is cancelled and BudgetExceeded is raised. The topic
+            deadline starts once a browser is leased.
+    
     Returns:
         A dictionary with topic information and list items
     """
-    # Initialize Gemini model
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY environment variable is not set")
+    if profiler is not None and profiler.selects(topic):
+        return await profiler.run(topic, find_and_scrape_top_10_list(
+            topic,
+            use_local_browser,
+            create_gdoc,
+            rate_limiter,
+            browser_pool,
+            result_cache,
+            refresh,
+            fast_path_min_confidence,
+            mode,
+            text_max_tokens,
+            budgets,
+        ))
+    
+    with metrics.topic(topic):
+        if result_cache is not None and not refresh:
+            with metrics.stage("cache"):
+                cached = result_cache.get(topic)
+            # A cached list without a doc can't satisfy a --create-gdoc run
+            if cached and (not create_gdoc or cached.get("google_doc_url")):
+                print(f"Using cached result for: {topic}")
+                return cached
         
-    llm = ChatGoogleGenerativeAI(model='gemini-2.0-flash-exp', api_key=SecretStr(api_key))
-    
-    # Set up browser if using local browser
-    browser = None
-    if use_local_browser or create_gdoc:
-        browser_config = BrowserConfig(
-            headless=False,  # Set to True to run without UI
-            disable_security=True,
-            # Specify the path to your Chrome executable if connecting to your real browser
-            chrome_instance_path='/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',  # macOS path
-        )
-        browser = Browser(config=browser_config)
+        owns_pool = browser_pool is None
+        if owns_pool:
+            browser_pool = BrowserPool(size=1, use_local_browser=use_local_browser)
+        
+        try:
+            async with browser_pool.lease() as lease:
+                deadline = budgets.topic_deadline() if budgets else None
+                scrape = _scrape_topic_with_lease(
+                    topic, lease, create_gdoc, rate_limiter, fast_path_min_confidence, mode, text_max_tokens,
+                    budgets, deadline
+                )
+                if deadline is None:
+                    result = await scrape
+                else:
+                    # Backstop for stages without their own budget; the grace
+                    # lets a budgeted stage report the overrun itself
+                    started = time.monotonic()
+                    try:
+                        result = await asyncio.wait_for(scrape, deadline - started + TOPIC_DEADLINE_GRACE)
+                    except asyncio.TimeoutError:
+                        raise BudgetExceeded("topic", "topic_deadline", time.monotonic() - started)
+        finally:
+            if owns_pool:
+                await browser_pool.close()
+        
+        if result and result_cache is not None:
+            result_cache.put(result)
+        
+        return result
+
+async def _scrape_topic_with_lease(
+    topic: str,
+    lease: BrowserLease,
+    create_gdoc: bool,
+    rate_limiter=None,
+    fast_path_min_confidence: Optional[float] = DEFAULT_MIN_CONFIDENCE,
+    mode: str = "agent",
+    text_max_tokens: int = DEFAULT_TEXT_MAX_TOKENS,
+    budgets: Optional[ScrapeBudgets] = None,
+    deadline: Optional[float] = None,
+):
+    """
+    Run the search and scrape agents for one topic on a leased browser context
+    
+    Args:
+        topic: The topic to find a top 10 list for
+        lease: Browser and context leased from the pool
+        create_gdoc: Whether to create a Google Doc with the results
+        rate_limiter: Optional rate limiter shared across concurrent topics
+        fast_path_min_confidence: Minimum confidence for the HTML extractor
+            to replace the scrape agent (None disables the fast path)
+        mode: "agent" or "text" (see SCRAPE_MODES)
+        text_max_tokens: Token budget for the page text sent in text mode
+        budgets: Optional per-stage budgets
+        deadline: time.monotonic() value the topic must finish by
+    
+    Returns:
+        A dictionary with topic information and list items, or None on failure
+    """
+    from scraper.models import TopTenList
+    
+    # Initialize Gemini model
+    llm = build_llm(rate_limiter)
+    browser = lease.browser
+    browser_context = lease.context
     
     # First, have the agent search for a good source for this topic
     search_task = f"""
@@ -157,20 +474,24 @@ async def find_and_scrape_top_10_list(topic: str, use_local_browser: bool = Fals
     """
     
     # Create a simple controller for the search task
-    search_controller = Controller()
+    search_controller = create_controller()
     
     # Create the search agent
-    search_agent = Agent(
+    search_agent = create_agent(
         task=search_task,
         llm=llm,
         controller=search_controller,
-        use_vision=True,
-        browser=browser  # This will be None if not using local browser
+        # Screenshots are only worth their tokens when the agent drives a page
+        use_vision=mode != "text",
+        browser=browser,
+        browser_context=browser_context
     )
     
     # Run the search agent
     print(f"Searching for a credible source about: {topic}")
-    search_history = await search_agent.run()
+    with metrics.stage("search"):
+        search_history = await run_stage("search", run_agent(search_agent), budgets, deadline)
+        metrics.record_agent_history(search_history)
     
     # Extract the source URL from the search results
     source_url = None
@@ -179,92 +500,70 @@ async def find_and_scrape_top_10_list(topic: str, use_local_browser: bool = Fals
     # Check if search was successful
     if not search_result:
         print(f"No search result found: {search_history.errors()}")
-        
-        # Close browser if we created one
-        if browser:
-            await browser.close()
-            
         return None
     
-    # Extract URL using regex
-    import re
-    url_match = re.search(r'https?://[^\s"\')]+', search_result)
-    if url_match:
-        source_url = url_match.group(0).rstrip('.,;:"\')]')
-    else:
-        # Have the LLM extract the URL from the search result
-        extract_url_task = f"""
-        Extract the best URL for a top 10 list about "{topic}" from this search result:
-        
-        {search_result}
-        
-        Return ONLY the URL, nothing else.
-        """
-        
-        url_extraction_agent = Agent(
-            task=extract_url_task,
-            llm=llm,
-            controller=Controller(),
-            browser=browser
-        )
-        
-        url_history = await url_extraction_agent.run()
-        if not url_history.has_errors():
-            source_url = url_history.final_result().strip()
+    # Rank every URL in the search result locally
+    with metrics.stage("url_extraction"):
+        source_url = best_url(search_result, topic)
+        if not source_url:
+            # Last resort: a single text-only LLM call, no browser session
+            source_url = await run_stage(
+                "url_extraction", lambda _: extract_url_with_llm(llm, topic, search_result), budgets, deadline
+            )
     
     if not source_url or not source_url.startswith("http"):
         print("Failed to find a valid source URL. Please check the search results.")
-        
-        # Close browser if we created one
-        if browser:
-            await browser.close()
-            
         return None
     
     print(f"Found source: {source_url}")
     
-    # Check if we can find extracted content in the search result
-    extracted_data = None
+    # Check if the search agent already extracted the list along the way
     extracted_items = []
-    
-    # Look for JSON data in the search result
-    json_pattern = re.search(r'```json\s*(.*?)\s*```', str(search_history.__dict__), re.DOTALL)
-    if json_pattern:
+    with metrics.stage("history_parse"):
+        history_items = extract_list_items(search_history, topic)
+    if history_items:
         try:
-            json_content = json_pattern.group(1)
-            extracted_data = json.loads(json_content)
-            
-            # Check if this contains our top 10 list
-            list_keys = [key for key in extracted_data.keys() if 
-                        any(x in key.lower() for x in ["top", "list", "smallest", "largest", "birds", topic.lower()])]
-            
-            if list_keys:
-                list_key = list_keys[0]
-                items_list = extracted_data[list_key]
-                
-                if isinstance(items_list, list) and len(items_list) > 0:
-                    # Process and use the items
-                    for i, item in enumerate(items_list[:10]):  # Take only top 10
-                        rank = item.get("rank", i + 1)
-                        name = item.get("name", "Unknown")
-                        
-                        details = []
-                        for k, v in item.items():
-                            if k not in ["rank", "name"]:
-                                details.append(f"{k.replace('_', ' ').title()}: {v}")
-                        
-                        extracted_items.append({
-                            "rank": rank,
-                            "name": name,
-                            "details": ". ".join(details) if details else None
-                        })
-                    
-                    print(f"Successfully extracted {len(extracted_items)} items directly from search")
+            parsed_list = TopTenList.model_validate({"items": history_items, "source_url": source_url})
+            extracted_items = [
+                {"rank": item.rank, "name": item.name, "details": item.details}
+                for item in parsed_list.items
+            ]
+            print(f"Successfully extracted {len(extracted_items)} items directly from search")
         except Exception as e:
-            print(f"Error parsing JSON content: {str(e)}")
+            print(f"Error parsing list from search history: {str(e)}")
             # Continue with normal scraping
     
-    # If we didn't extract items from the search, scrape the source
+    # Text mode fetches the page once for both the fast path and the LLM call
+    page_html = None
+    if not extracted_items and mode == "text":
+        with metrics.stage("fetch"):
+            try:
+                page_html = await fetch_scheduler.fetch(source_url)
+            except Exception as e:
+                print(f"Could not fetch {source_url} for text mode: {str(e)}")
+    
+    # Try the deterministic HTML extractor before paying for a scrape agent run
+    if not extracted_items and fast_path_min_confidence is not None and (mode != "text" or page_html is not None):
+        with metrics.stage("fast_path"):
+            extracted_items = await extract_with_fast_path(topic, source_url, fast_path_min_confidence, page_html)
+    
+    # One structured-output call over the pruned page text
+    if not extracted_items and page_html is not None:
+        try:
+            with metrics.stage("text_extract"):
+                extracted_items = await run_stage(
+                    "text_extract",
+                    lambda _: extract_with_text_mode(llm, topic, source_url, page_html, text_max_tokens),
+                    budgets,
+                    deadline
+                )
+        except BudgetExceeded as e:
+            if e.reason == "topic_deadline":
+                raise
+            # The scrape agent below still gets its own budget
+            print(f"Text mode gave up on {topic}: {str(e)}")
+    
+    # If nothing cheaper worked, or the page needs clicking through, run the vision scrape agent
     if not extracted_items:
         # Now scrape the top 10 list from the source
         scrape_task = f"""
@@ -284,37 +583,35 @@ async def find_and_scrape_top_10_list(topic: str, use_local_browser: bool = Fals
         """
         
         # Create the scraping agent with our TopTenList controller
-        scrape_agent = Agent(
+        scrape_agent = create_agent(
             task=scrape_task,
             llm=llm,
-            controller=controller,
+            controller=get_scrape_controller(),
             use_vision=True,
-            browser=browser
+            browser=browser,
+            browser_context=browser_context
         )
         
         # Run the scraping agent
         print(f"Scraping top 10 list about {topic} from {source_url}")
-        scrape_history = await scrape_agent.run()
+        with metrics.stage("scrape"):
+            scrape_history = await run_stage(
+                "scrape",
+                lambda max_steps: fetch_scheduler.visit(source_url, lambda: run_agent(scrape_agent)(max_steps)),
+                budgets,
+                deadline
+            )
+            metrics.record_agent_history(scrape_history)
         
         # Check for errors
         if scrape_history.has_errors() and not scrape_history.final_result():
             print(f"Critical errors during scraping: {scrape_history.errors()}")
-            
-            # Close browser if we created one
-            if browser:
-                await browser.close()
-                
             return None
         
         # Get the final result
         result = scrape_history.final_result()
         if not result:
             print(f"No result found for: {topic}")
-            
-            # Close browser if we created one
-            if browser:
-                await browser.close()
-                
             return None
         
         try:
@@ -329,175 +626,779 @@ async def find_and_scrape_top_10_list(topic: str, use_local_browser: bool = Fals
                     "details": item.details
                 })
         except Exception as e:
-            print(f"Error parsing result for {topic}: {str(e)}")
-            print(f"Raw result: {result}")
-            
-            # Close browser if we created one
-            if browser:
-                await browser.close()
-                
-            return None
+            # Salvage a list written as loose JSON or numbered lines
+            extracted_items = extract_items_from_text(result, topic)
+            print(f"Error parsing result for {topic}: {str(e)}; recovered {len(extracted_items)} items from the raw result")
+            if not extracted_items:
+                print(f"Raw result: {result}")
+                return None
+    
+    # Fix what can be fixed locally, then go back to the page for the missing ranks only
+    with metrics.stage("validate"):
+        extracted_items, validation = repair_items(extracted_items)
+    if validation.missing_ranks and extracted_items:
+        print(f"{topic} is missing ranks {validation.missing_ranks}, re-extracting them from {source_url}")
+        try:
+            with metrics.stage("rescrape"):
+                missing_items = await run_stage(
+                    "rescrape",
+                    lambda max_steps: rescrape_missing_ranks(
+                        llm, topic, source_url, extracted_items, validation.missing_ranks, lease, page_html, text_max_tokens, max_steps
+                    ),
+                    budgets,
+                    deadline
+                )
+            extracted_items, filled = fill_missing_ranks(extracted_items, missing_items, validation.missing_ranks)
+            validation.record_fill(filled, len(extracted_items))
+        except BudgetExceeded as e:
+            if e.reason == "topic_deadline":
+                raise
+            # A partial list is still worth keeping
+            print(f"Gave up re-extracting ranks for {topic}: {str(e)}")
+    
+    if not extracted_items:
+        print(f"No usable items for: {topic}")
+        return None
     
     # Prepare the output data
     output = {
         "topic": topic,
         "source_url": source_url,
-        "items": extracted_items
+        "items": extracted_items,
+        "validation": validation.to_dict()
     }
     
     # If requested, create a Google Doc with the results
-    doc_url = None
-    if create_gdoc and browser:
-        doc_url = await create_google_doc_via_browser(browser, topic, extracted_items, source_url)
-        output["google_doc_url"] = doc_url
+    if create_gdoc:
+        try:
+            with metrics.stage("gdoc"):
+                output["google_doc_url"] = await create_google_doc_via_browser(
+                    browser, topic, extracted_items, source_url, rate_limiter, browser_context, budgets, deadline
+                )
+        except BudgetExceeded as e:
+            if e.stage != "gdoc":
+                raise
+            # The list is done; losing it over the doc would waste the scrape
+            print(f"Gave up creating a Google Doc for {topic}: {str(e)}")
+            output["google_doc_url"] = None
+            output["google_doc_error"] = e.to_dict()
     
-    # Close browser if we created one
-    if browser:
-        await browser.close()
-        
     return output
 
-# Modify the main function to add Google Docs option
-async def main():
-    """Main function to run the scraper"""
-    parser = argparse.ArgumentParser(description="Scrape top 10 lists for given topics")
+async def extract_url_with_llm(llm, topic: str, search_result: str) -> Optional[str]:
+    """
+    Ask the LLM for the best source URL in a search result, without a browser
     
-    # Mode selection
-    mode_group = parser.add_mutually_exclusive_group(required=True)
-    mode_group.add_argument("--topic", help="Single topic to scrape (e.g., 'fastest birds')")
-    mode_group.add_argument("--topics-file", help="JSON file with a list of topics to scrape")
-    mode_group.add_argument("--topics", nargs="+", help="List of topics to scrape")
+    Args:
+        llm: Chat model to call
+        topic: The topic being scraped
+        search_result: Final text of the search agent
     
-    # Output options
-    parser.add_argument("--output", default="top10_results.json", help="Path to output JSON file")
+    Returns:
+        The URL the model picked, or None
+    """
+    prompt = f"""
+    Extract the best URL for a top 10 list about "{topic}" from this search result:
     
-    # Browser options
-    parser.add_argument("--local-browser", action="store_true", help="Use local browser instance")
+    {search_result}
     
-    # Google Docs options
-    parser.add_argument("--create-gdoc", action="store_true", help="Create a Google Doc with the results")
+    Return ONLY the URL, nothing else.
+    """
+    try:
+        response = await llm.ainvoke(prompt)
+    except Exception as e:
+        print(f"Error extracting URL with the LLM: {str(e)}")
+        return None
     
-    args = parser.parse_args()
+    content = response.content if isinstance(response.content, str) else str(response.content)
+    return best_url(content, topic)
+
+async def extract_with_fast_path(
+    topic: str,
+    source_url: str,
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    html: Optional[str] = None,
+):
+    """
+    Fetch the source page once and extract the list with HTML heuristics
     
-    # Process based on mode
-    if args.topic:
-        # Single topic mode
-        result = await find_and_scrape_top_10_list(
-            topic=args.topic,
-            use_local_browser=args.local_browser,
-            create_gdoc=args.create_gdoc
-        )
-        
-        if result:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                json.dump([result], f, indent=2, ensure_ascii=False)
-            print(f"Results saved to {args.output}")
-            
-            if "google_doc_url" in result:
-                print(f"Google Doc created: {result['google_doc_url']}")
+    Args:
+        topic: The topic being scraped
+        source_url: Page to extract the list from
+        min_confidence: Minimum extractor confidence to accept the result
+        html: Page HTML if it was already fetched
+    
+    Returns:
+        A list of item dictionaries, or an empty list if the scrape agent is needed
+    """
+    from scraper.models import TopTenList
+    
+    fast_path_stats.attempts += 1
+    if html is None:
+        try:
+            html = await fetch_scheduler.fetch(source_url)
+        except Exception as e:
+            fast_path_stats.fetch_errors += 1
+            print(f"Fast path could not fetch {source_url}: {str(e)}")
+            return []
+    
+    extraction = extract_ranked_items(html)
+    if extraction is None or extraction.confidence < min_confidence:
+        fast_path_stats.low_confidence += 1
+        print(f"Fast path not confident for {topic}: {extraction}")
+        return []
+    
+    try:
+        parsed_list = TopTenList.model_validate({"items": extraction.items, "source_url": source_url})
+    except Exception as e:
+        fast_path_stats.low_confidence += 1
+        print(f"Fast path result failed validation for {topic}: {str(e)}")
+        return []
+    
+    fast_path_stats.hits += 1
+    print(f"Extracted {len(parsed_list.items)} items for {topic} with the HTML fast path ({extraction.method})")
+    return [
+        {"rank": item.rank, "name": item.name, "details": item.details}
+        for item in parsed_list.items
+    ]
+
+async def extract_with_text_mode(
+    llm,
+    topic: str,
+    source_url: str,
+    html: str,
+    max_tokens: int = DEFAULT_TEXT_MAX_TOKENS,
+):
+    """
+    Read the list from the page text with a single structured-output LLM call
+    
+    The page is pruned to its main content and the chunk that looks most like
+    a ranked list is sent, so no browser or screenshots are involved.
+    
+    Args:
+        llm: Chat model to call
+        topic: The topic being scraped
+        source_url: Page the HTML came from
+        html: Raw HTML of the page
+        max_tokens: Token budget for the page text
+    
+    Returns:
+        A list of item dictionaries, or an empty list if the scrape agent is needed
+    """
+    from scraper.models import TopTenList
+    
+    page = extract_page_text(html, max_tokens)
+    if page.needs_interaction:
+        print(f"Page for {topic} is paginated, leaving it to the scrape agent")
+        return []
+    page_text = page.best_chunk()
+    if not page_text:
+        print(f"No readable text on {source_url}")
+        return []
+    
+    prompt = f"""
+    Extract the top 10 items of the list about "{topic}" from this page text.
+    
+    For each item (ranked 1-10), give its rank, its name/title and any details or statistics on the page.
+    If the page doesn't explicitly show rankings, use the order presented. A list counting down
+    from 10 still ranks its last item 1. Only use information on the page.
+    
+    Page: {page.title} ({source_url})
+    
+    {page_text}
+    """
+    
+    try:
+        parsed_list = await llm.with_structured_output(TopTenList).ainvoke(prompt)
+    except Exception as e:
+        print(f"Text mode extraction failed for {topic}: {str(e)}")
+        return []
+    
+    if not parsed_list or not parsed_list.items:
+        print(f"Text mode found no list for {topic}")
+        return []
+    
+    items = sorted(parsed_list.items, key=lambda item: item.rank)[:10]
+    print(f"Extracted {len(items)} items for {topic} from the page text")
+    return [
+        {"rank": item.rank, "name": item.name, "details": item.details}
+        for item in items
+    ]
+
+async def rescrape_missing_ranks(
+    llm,
+    topic: str,
+    source_url: str,
+    items: List[Dict[str, Any]],
+    missing_ranks: List[int],
+    lease: BrowserLease,
+    html: Optional[str] = None,
+    text_max_tokens: int = DEFAULT_TEXT_MAX_TOKENS,
+    max_steps: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Extract only the missing ranks of a list from its already-known source
+    
+    The page text around the missing ranks is read with one structured-output
+    call first. Pages that need clicking through, or where that call finds
+    none of the ranks, get a browser agent that is told which ranks to look
+    for and which items it can skip.
+    
+    Args:
+        llm: Chat model to call
+        topic: The topic being scraped
+        source_url: Page the list came from
+        items: Items already extracted
+        missing_ranks: Ranks to look for
+        lease: Browser and context leased from the pool
+        html: Page HTML if it was already fetched
+        text_max_tokens: Token budget for the page text
+        max_steps: Step limit for the browser agent
+    
+    Returns:
+        Item dictionaries found for the missing ranks (may include others)
+    """
+    from scraper.models import TopTenList
+    
+    wanted = ", ".join(str(rank) for rank in missing_ranks)
+    known = "\n".join(f"{item['rank']}. {item['name']}" for item in items)
+    
+    if html is None:
+        try:
+            html = await fetch_scheduler.fetch(source_url)
+        except Exception as e:
+            print(f"Could not fetch {source_url} to re-extract ranks: {str(e)}")
+    
+    if html is not None:
+        page = extract_page_text(html, text_max_tokens)
+        # Not best_chunk(): that is the text the first extraction already read
+        page_text = page.chunk_for_ranks(missing_ranks, [item["name"] for item in items])
+        if page_text and not page.needs_interaction:
+            prompt = f"""
+    The list about "{topic}" on this page is missing ranks {wanted}. These items are already known:
+    {known}
+    
+    Give ONLY the items at ranks {wanted}: their rank, name/title and any details or statistics on the page.
+    If the page doesn't explicitly show rankings, use the order presented. Only use information on the page.
+    
+    Page: {page.title} ({source_url})
+    
+    {page_text}
+    """
+            try:
+                parsed_list = await llm.with_structured_output(TopTenList).ainvoke(prompt)
+                found = [
+                    {"rank": item.rank, "name": item.name, "details": item.details}
+                    for item in (parsed_list.items if parsed_list else [])
+                ]
+                if any(item["rank"] in missing_ranks for item in found):
+                    return found
+            except Exception as e:
+                print(f"Re-extracting ranks from the page text failed for {topic}: {str(e)}")
+    
+    rescrape_task = f"""
+    Visit {source_url} and find ranks {wanted} of the list about "{topic}".
+    
+    These items are already known, so don't extract them again:
+    {known}
+    
+    For each of ranks {wanted}, extract its rank, the name/title of the item and any additional details or statistics.
+    If you need to click through pagination or search the page, please do so.
+    
+    Return the results in the specified format: a list of items with rank, name, and details.
+    Also include the source_url: "{source_url}" in your response.
+    """
+    rescrape_agent = create_agent(
+        task=rescrape_task,
+        llm=llm,
+        controller=get_scrape_controller(),
+        use_vision=True,
+        browser=lease.browser,
+        browser_context=lease.context
+    )
+    history = await fetch_scheduler.visit(source_url, lambda: run_agent(rescrape_agent)(max_steps))
+    metrics.record_agent_history(history)
+    result = history.final_result()
+    if not result:
+        return []
+    try:
+        parsed_list = TopTenList.model_validate_json(result)
+    except Exception:
+        return extract_items_from_text(result, topic)
+    return [{"rank": item.rank, "name": item.name, "details": item.details} for item in parsed_list.items]
+
+class TopicOutcome:
+    """Result or failure of one topic, as yielded by scrape_topics_stream"""
+    
+    def __init__(
+        self,
+        topic: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        error_code: Optional[str] = None,
+        seconds: float = 0.0,
+        budget: Optional[Dict[str, Any]] = None,
+    ):
+        self.topic = topic
+        self.result = result
+        self.error = error
+        self.error_code = error_code
+        self.seconds = seconds
+        # BudgetExceeded.to_dict() of the budget that stopped the topic
+        self.budget = budget
+    
+    @property
+    def ok(self) -> bool:
+        return self.result is not None
+    
+    @property
+    def duplicate_of(self) -> Optional[str]:
+        return self.result.get("duplicate_of") if self.result else None
+    
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"error={self.error_code or self.error!r}"
+        return f"TopicOutcome(topic={self.topic!r}, {status}, seconds={self.seconds:.2f})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "topic": self.topic,
+            "ok": self.ok,
+            "result": self.result,
+            "error": self.error,
+            "error_code": self.error_code,
+            "seconds": round(self.seconds, 3),
+            "budget": self.budget,
+        }
+
+async def scrape_topics_stream(
+    topics: Union[Iterable[str], AsyncIterable[str]],
+    use_local_browser: bool = False,
+    create_gdoc: bool = False,
+    concurrency: int = 1,
+    llm_rpm: float = DEFAULT_LLM_RPM,
+    browser_pool: Optional[BrowserPool] = None,
+    result_cache: Optional[TopicResultCache] = None,
+    refresh: bool = False,
+    fast_path_min_confidence: Optional[float] = DEFAULT_MIN_CONFIDENCE,
+    mode: str = "agent",
+    text_max_tokens: int = DEFAULT_TEXT_MAX_TOKENS,
+    duplicate_threshold: Optional[float] = DEFAULT_DUPLICATE_THRESHOLD,
+    budgets: Optional[ScrapeBudgets] = None,
+):
+    """
+    Scrape topics concurrently and yield each outcome as soon as it is ready
+    
+    At most `concurrency` topics are in flight. A new topic only starts once
+    the consumer has taken the outcomes already produced, so a slow consumer
+    slows the scrape down instead of piling up results. All LLM calls share
+    a single token-bucket rate limiter, and a failure in one topic never
+    aborts the others.
+    
+    Topics that are identical once normalized ("fastest cars", "Fastest
+    Cars!") are scraped and yielded once, under their first spelling.
+    Paraphrased topics ("smallest US birds", "tiniest american birds") are
+    then grouped and share one scrape, and a topic close enough to one
+    already in the result cache reuses that result. Copies carry a
+    "duplicate_of" field naming the topic that was actually scraped.
+    
+    Topics can also come from an async iterable, such as the claims of a
+    work queue worker. The next one is only requested when there is room
+    for it, and since the full set isn't known up front each is scraped on
+    its own; cached paraphrases are still reused.
+    
+    Closing the generator early (break, aclose()) cancels the topics still
+    in flight.
+    
+    Args:
+        topics: Topics to scrape, as a list or an async iterable
+        use_local_browser: Whether to use a local browser instance
+        create_gdoc: Whether to create a Google Doc for each result
+        concurrency: Maximum number of topics scraped at the same time
+        llm_rpm: Maximum LLM requests per minute across all topics
+        browser_pool: Optional shared browser pool; one sized to `concurrency`
+            is created and closed when omitted
+        result_cache: Optional cache consulted before scraping each topic
+        refresh: Ignore cached entries and scrape every topic again
+        fast_path_min_confidence: Minimum confidence for the HTML extractor
+            to replace the scrape agent (None disables the fast path)
+        mode: "agent" or "text" (see SCRAPE_MODES)
+        text_max_tokens: Token budget for the page text sent in text mode
+        duplicate_threshold: Token-set similarity at which topics count as
+            the same list (None disables near-duplicate detection)
+        budgets: Optional per-stage and per-topic budgets
+    
+    Yields:
+        A TopicOutcome per topic, in completion order
+    """
+    streamed = hasattr(topics, "__aiter__")
+    if streamed:
+        # Each topic becomes its own group as it arrives
+        clusters = {}
+        source = topics.__aiter__()
     else:
-        # Multiple topics mode
-        topics = []
+        topics = unique_topics(topics)
         
-        if args.topics_file:
-            # Load topics from file
-            with open(args.topics_file, 'r') as f:
-                file_content = json.load(f)
-                
-                # Handle different possible file formats
-                if isinstance(file_content, list):
-                    # Simple list of strings
-                    if all(isinstance(item, str) for item in file_content):
-                        topics = file_content
-                    # List of objects with topic field
-                    elif all(isinstance(item, dict) and "topic" in item for item in file_content):
-                        topics = [item["topic"] for item in file_content]
-                    else:
-                        raise ValueError("Invalid topics file format. Expected a list of strings or objects with 'topic' field.")
-                else:
-                    raise ValueError("Invalid topics file format. Expected a JSON array.")
+        # Scrape one topic per group of paraphrases; the rest get copies
+        if duplicate_threshold is not None:
+            clusters = cluster_topics(topics, duplicate_threshold)
+            if len(clusters) < len(topics):
+                print("Near-duplicate topics sharing one scrape:")
+                print_cluster_report(clusters)
         else:
-            # Use topics from command line
-            topics = args.topics
-        
-        # Process each topic
-        results = []
-        google_doc_urls = []
-        
-        for i, topic in enumerate(topics):
-            print(f"\n[{i+1}/{len(topics)}] Processing topic: {topic}")
-            
-            result = await find_and_scrape_top_10_list(
+            clusters = {topic: [(topic, 1.0)] for topic in topics}
+        source = iter(list(clusters))
+    
+    # Earlier results that a paraphrase can reuse
+    cached_index = None
+    if result_cache is not None and duplicate_threshold is not None and not refresh:
+        cached_index = TopicIndex(duplicate_threshold)
+        cached_index.add_many(result_cache.topics())
+    
+    owns_pool = browser_pool is None
+    if owns_pool:
+        browser_pool = BrowserPool(size=concurrency, use_local_browser=use_local_browser)
+    
+    # Built on the first LLM call, so a run of cache hits never imports LangChain
+    rate_limiter = LazyRateLimiter(llm_rpm)
+    
+    async def scrape_one(index: int, topic: str) -> List[TopicOutcome]:
+        print(f"\n[{index+1}{'' if streamed else f'/{len(clusters)}'}] Processing topic: {topic}")
+        started = time.perf_counter()
+        error = error_code = budget = None
+        try:
+            result = reuse_near_duplicate(topic, cached_index, result_cache, create_gdoc)
+            result = result or await find_and_scrape_top_10_list(
                 topic=topic,
-                use_local_browser=args.local_browser,
-                create_gdoc=args.create_gdoc
+                use_local_browser=use_local_browser,
+                create_gdoc=create_gdoc,
+                rate_limiter=rate_limiter,
+                browser_pool=browser_pool,
+                result_cache=result_cache,
+                refresh=refresh,
+                fast_path_min_confidence=fast_path_min_confidence,
+                mode=mode,
+                text_max_tokens=text_max_tokens,
+                budgets=budgets
             )
-            
-            if result:
-                results.append(result)
-                print(f"Successfully scraped top 10 list for: {topic}")
-                
-                if "google_doc_url" in result:
-                    google_doc_urls.append(result["google_doc_url"])
-                
-                # Save progress after each successful scrape
-                with open(args.output, 'w', encoding='utf-8') as f:
-                    json.dump(results, f, indent=2, ensure_ascii=False)
-                print(f"Progress saved to {args.output}")
-            else:
-                print(f"Failed to scrape top 10 list for: {topic}")
-            
-            # Add delay between requests to avoid rate limiting
-            if i < len(topics) - 1:
-                delay = 5
-                print(f"Waiting {delay} seconds before next topic...")
-                await asyncio.sleep(delay)
+            if not result:
+                error, error_code = "no result", "no_result"
+        except Exception as e:
+            # Isolate the failure so the rest of the batch keeps going
+            print(f"Error while scraping {topic}: {str(e)}")
+            result = None
+            error, error_code = str(e), getattr(e, "error_code", None) or type(e).__name__
+            if isinstance(e, BudgetExceeded):
+                budget = e.to_dict()
+        seconds = time.perf_counter() - started
         
-        print(f"\nComplete! Scraped {len(results)} top 10 lists out of {len(topics)} topics")
-        print(f"Results saved to {args.output}")
+        if not result:
+            print(f"Failed to scrape top 10 list for: {topic}")
+            return [TopicOutcome(member, None, error, error_code, seconds, budget) for member, _ in clusters[topic]]
         
-        if google_doc_urls:
-            print("\nGoogle Docs created:")
-            for url in google_doc_urls:
-                print(f"- {url}")
-
-if __name__ == "__main__":
-    asyncio.run(main())
+        print(f"Successfully scraped top 10 list for: {topic}")
+        outcomes = [TopicOutcome(topic, result, seconds=seconds)]
+        for duplicate, _ in clusters[topic][1:]:
+            copy = {**result, "topic": duplicate, "duplicate_of": result.get("duplicate_of", result["topic"])}
+            outcomes.append(TopicOutcome(duplicate, copy, seconds=seconds))
+        return outcomes
+    
+    async def next_streamed() -> Optional[str]:
+        try:
+            return await source.__anext__()
+        except StopAsyncIteration:
+            return None
+    
+    started = 0
+    exhausted = False
+    # Pending request for the next streamed topic
+    pulling = None
+    in_flight = set()
+    try:
+        while True:
+            # Top up to the concurrency limit; nothing new starts while the consumer is busy
+            while not exhausted and pulling is None and len(in_flight) < max(1, concurrency):
+                if streamed:
+                    pulling = asyncio.ensure_future(next_streamed())
+                    break
+                topic = next(source, None)
+                if topic is None:
+                    exhausted = True
+                    break
+                in_flight.add(asyncio.ensure_future(scrape_one(started, topic)))
+                started += 1
+            if not in_flight and pulling is None:
+                break
+            
+            done, _ = await asyncio.wait(in_flight | ({pulling} - {None}), return_when=asyncio.FIRST_COMPLETED)
+            if pulling in done:
+                topic = pulling.result()
+                pulling = None
+                if topic is None:
+                    exhausted = True
+                else:
+                    clusters[topic] = [(topic, 1.0)]
+                    in_flight.add(asyncio.ensure_future(scrape_one(started, topic)))
+                    started += 1
+            for task in done & in_flight:
+                in_flight.discard(task)
+                for outcome in task.result():
+                    yield outcome
+    finally:
+        tasks = in_flight | ({pulling} - {None})
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if owns_pool:
+            await browser_pool.close()
 
-async def batch_scrape_topics(topics: List[str], output_file: str, use_local_browser: bool = False):
-    """Scrape multiple topics and save results to a file"""
+async def batch_scrape_topics(
+    topics: List[str],
+    output_file: str,
+    use_local_browser: bool = False,
+    create_gdoc: bool = False,
+    concurrency: int = 1,
+    llm_rpm: float = DEFAULT_LLM_RPM,
+    browser_pool: Optional[BrowserPool] = None,
+    result_cache: Optional[TopicResultCache] = None,
+    refresh: bool = False,
+    fast_path_min_confidence: Optional[float] = DEFAULT_MIN_CONFIDENCE,
+    sink_path: Optional[str] = None,
+    resume: bool = False,
+    mode: str = "agent",
+    text_max_tokens: int = DEFAULT_TEXT_MAX_TOKENS,
+    duplicate_threshold: Optional[float] = DEFAULT_DUPLICATE_THRESHOLD,
+    budgets: Optional[ScrapeBudgets] = None,
+    exporter: Optional[DocumentExporter] = None,
+    sinks: Optional[ResultSink] = None,
+):
+    """
+    Scrape multiple topics concurrently and save results to a file
+    
+    Built on scrape_topics_stream: each result is appended to a JSONL sink
+    as soon as it is ready, and when the batch ends the sink is compacted
+    into `output_file`, in topic order.
+    
+    Args:
+        topics: Topics to scrape
+        output_file: Path to the output JSON file
+        sink_path: Path to the JSONL sink (defaults to `output_file` with a .jsonl extension)
+        resume: Keep the existing sink and skip topics it already holds
+        exporter: Optional exporter each result is handed to as it arrives
+        sinks: Further sink each result is written to, usually a MultiSink
+            (e.g. of a DatabaseResultSink); flushed, not closed, when the
+            batch ends
+        (remaining arguments as for scrape_topics_stream)
+    
+    Returns:
+        The results scraped in this run, in topic order
+    """
+    sinks = sinks or MultiSink([])
+    sink_path = sink_path or default_sink_path(output_file)
+    # One list per normalized topic, as compact() writes them
+    topics = all_topics = unique_topics(topics)
+    if resume:
+        done = completed_topics(sink_path)
+        topics = [topic for topic in topics if normalize_topic(topic) not in done]
+        print(f"Resuming from {sink_path}: {len(all_topics) - len(topics)} topics already done")
+    sink = JsonlResultSink(sink_path, resume=resume)
+    
     results = []
+    try:
+        async for outcome in scrape_topics_stream(
+            topics,
+            use_local_browser=use_local_browser,
+            create_gdoc=create_gdoc,
+            concurrency=concurrency,
+            llm_rpm=llm_rpm,
+            browser_pool=browser_pool,
+            result_cache=result_cache,
+            refresh=refresh,
+            fast_path_min_confidence=fast_path_min_confidence,
+            mode=mode,
+            text_max_tokens=text_max_tokens,
+            duplicate_threshold=duplicate_threshold,
+            budgets=budgets
+        ):
+            if outcome.ok:
+                # Save progress after each successful scrape
+                with metrics.stage("output_write"):
+                    sink.write(outcome.result)
+                    sinks.write(outcome.result)
+                if exporter is not None:
+                    exporter.submit(outcome.result)
+                results.append(outcome.result)
+    finally:
+        sink.close()
+        sinks.flush()
     
-    for i, topic in enumerate(topics):
-        print(f"\n[{i+1}/{len(topics)}] Processing topic: {topic}")
-        
-        result = await find_and_scrape_top_10_list(
-            topic=topic,
-            use_local_browser=use_local_browser
-        )
-        
-        if result:
-            results.append(result)
-            print(f"Successfully scraped top 10 list for: {topic}")
-            
-            # Save progress after each successful scrape
-            with open(output_file, 'w') as f:
-                json.dump(results, indent=2, ensure_ascii=False, fp=f)
-            print(f"Progress saved to {output_file}")
-        else:
-            print(f"Failed to scrape top 10 list for: {topic}")
-        
-        # Add delay between requests to avoid rate limiting
-        if i < len(topics) - 1:
-            delay = 5
-            print(f"Waiting {delay} seconds before next topic...")
-            await asyncio.sleep(delay)
+    order = {normalize_topic(topic): position for position, topic in enumerate(topics)}
+    results.sort(key=lambda result: order.get(normalize_topic(result["topic"]), len(order)))
     
-    print(f"\nComplete! Scraped {len(results)} top 10 lists out of {len(topics)} topics")
-    print(f"Results saved to {output_file}")
+    saved = compact(sink_path, output_file, topic_order=all_topics)
+    
+    reused = sum(1 for result in results if result.get("duplicate_of"))
+    print(f"\nComplete! Scraped {len(results) - reused} top 10 lists out of {len(topics)} topics"
+          + (f", plus {reused} copied from near-duplicate topics" if reused else ""))
+    print(f"Results saved to {output_file} ({saved} lists)")
     
     return results
 
+async def run_queue_worker(
+    queue: WorkQueue,
+    worker_id: Optional[str] = None,
+    use_local_browser: bool = False,
+    create_gdoc: bool = False,
+    concurrency: int = 1,
+    llm_rpm: float = DEFAULT_LLM_RPM,
+    browser_pool: Optional[BrowserPool] = None,
+    result_cache: Optional[TopicResultCache] = None,
+    refresh: bool = False,
+    fast_path_min_confidence: Optional[float] = DEFAULT_MIN_CONFIDENCE,
+    mode: str = "agent",
+    text_max_tokens: int = DEFAULT_TEXT_MAX_TOKENS,
+    duplicate_threshold: Optional[float] = DEFAULT_DUPLICATE_THRESHOLD,
+    budgets: Optional[ScrapeBudgets] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    poll_interval: float = 5.0,
+    exporter: Optional[DocumentExporter] = None,
+    sinks: Optional[ResultSink] = None,
+) -> int:
+    """
+    Claim topics from a shared work queue and scrape them until it is drained
+    
+    Claimed topics are fed to scrape_topics_stream, which claims the next
+    one only when fewer than `concurrency` are in flight. Leases are
+    extended by a heartbeat while topics are in flight, each result is
+    written back to the queue, and a failure is recorded as the outcome's
+    to_dict() JSON. While other workers still hold leases the worker keeps
+    polling, so topics whose lease runs out are picked up.
+    
+    Args:
+        queue: Work queue shared with other workers
+        worker_id: Id recorded on leases (defaults to host:pid)
+        lease_seconds: How long a claim lasts without a heartbeat
+        max_attempts: Attempts before a topic is marked failed
+        poll_interval: Seconds to wait when nothing is claimable yet
+        exporter: Optional exporter each completed result is handed to
+        sinks: Further sink (usually a MultiSink) each completed result is written to
+        (remaining arguments as for batch_scrape_topics)
+    
+    Returns:
+        Number of topics this worker completed
+    """
+    sinks = sinks or MultiSink([])
+    worker_id = worker_id or default_worker_id()
+    completed = 0
+    
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            # Queue calls run in a thread: a write lock held by another worker can take seconds
+            await asyncio.to_thread(queue.heartbeat, worker_id, lease_seconds)
+    
+    async def claimed_topics():
+        while True:
+            topic = await asyncio.to_thread(queue.claim, worker_id, lease_seconds, max_attempts)
+            if topic is not None:
+                yield topic
+            elif not await asyncio.to_thread(queue.has_unfinished):
+                return
+            else:
+                # Other workers hold the rest; wait in case a lease expires
+                await asyncio.sleep(poll_interval)
+    
+    heartbeat_task = asyncio.create_task(heartbeat())
+    try:
+        async for outcome in scrape_topics_stream(
+            claimed_topics(),
+            use_local_browser=use_local_browser,
+            create_gdoc=create_gdoc,
+            concurrency=concurrency,
+            llm_rpm=llm_rpm,
+            browser_pool=browser_pool,
+            result_cache=result_cache,
+            refresh=refresh,
+            fast_path_min_confidence=fast_path_min_confidence,
+            mode=mode,
+            text_max_tokens=text_max_tokens,
+            duplicate_threshold=duplicate_threshold,
+            budgets=budgets
+        ):
+            if outcome.ok:
+                with metrics.stage("output_write"):
+                    stored = await asyncio.to_thread(queue.complete, outcome.topic, worker_id, outcome.result)
+                    if stored:
+                        sinks.write(outcome.result)
+                if stored:
+                    completed += 1
+                    if exporter is not None:
+                        exporter.submit(outcome.result)
+            else:
+                record = json.dumps(outcome.to_dict(), ensure_ascii=False)
+                if await asyncio.to_thread(queue.fail, outcome.topic, worker_id, record, max_attempts):
+                    print(f"Requeued {outcome.topic} ({outcome.error_code})")
+    finally:
+        heartbeat_task.cancel()
+        sinks.flush()
+    
+    print(f"\nWorker {worker_id} finished: {completed} topics completed. Queue: {json.dumps(queue.stats())}")
+    return completed
+
+def reuse_near_duplicate(
+    topic: str,
+    cached_index: Optional[TopicIndex],
+    result_cache: Optional[TopicResultCache],
+    create_gdoc: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Look for a cached result of a paraphrase of the topic
+    
+    Exact matches are left to find_and_scrape_top_10_list.
+    
+    Returns:
+        A copy of the cached result relabelled with this topic, or None
+    """
+    if cached_index is None or result_cache is None:
+        return None
+    match = cached_index.lookup(topic)
+    if match is None or normalize_topic(match[0]) == normalize_topic(topic):
+        return None
+    
+    with metrics.topic(topic), metrics.stage("cache"):
+        cached = result_cache.get(match[0])
+    # A cached list without a doc can't satisfy a --create-gdoc run
+    if not cached or (create_gdoc and not cached.get("google_doc_url")):
+        return None
+    
+    print(f"Reusing cached result for {match[0]!r} ({match[1]:.2f} similar) for: {topic}")
+    return {**cached, "topic": topic, "duplicate_of": cached.get("duplicate_of", cached["topic"])}
+
+def load_topics_file(path: str) -> List[str]:
+    """
+    Load topics from a JSON file
+    
+    Args:
+        path: Path to a JSON array of strings or of objects with a 'topic' field
+    
+    Returns:
+        The list of topics
+    """
+    with open(path, 'r') as f:
+        file_content = json.load(f)
+    
+    # Handle different possible file formats
+    if isinstance(file_content, list):
+        # Simple list of strings
+        if all(isinstance(item, str) for item in file_content):
+            return file_content
+        # List of objects with topic field
+        if all(isinstance(item, dict) and "topic" in item for item in file_content):
+            return [item["topic"] for item in file_content]
+        raise ValueError("Invalid topics file format. Expected a list of strings or objects with 'topic' field.")
+    raise ValueError("Invalid topics file format. Expected a JSON array.")
+
 async def main():
     """Main function to run the scraper"""
     parser = argparse.ArgumentParser(description="Scrape top 10 lists for given topics")
@@ -507,57 +1408,469 @@ async def main():
     mode_group.add_argument("--topic", help="Single topic to scrape (e.g., 'fastest birds')")
     mode_group.add_argument("--topics-file", help="JSON file with a list of topics to scrape")
     mode_group.add_argument("--topics", nargs="+", help="List of topics to scrape")
+    mode_group.add_argument("--compact", action="store_true", help="Rewrite --output from the JSONL sink without scraping")
+    mode_group.add_argument("--work", action="store_true", help="Run a worker that scrapes topics claimed from --queue")
+    mode_group.add_argument("--merge", action="store_true", help="Write every finished result in --queue to --output")
+    mode_group.add_argument("--export", action="store_true", help="Render the results in --output to --export-dir without scraping")
     
     # Output options
     parser.add_argument("--output", default="top10_results.json", help="Path to output JSON file")
+    parser.add_argument("--sink", help="Path to the append-only JSONL sink (defaults to --output with a .jsonl extension)")
+    parser.add_argument("--resume", action="store_true", help="Skip topics already present in the JSONL sink")
+    
+    # Database options
+    parser.add_argument("--db", help="Also upsert results into lists/list_items: a postgres:// URL or a SQLite path")
+    parser.add_argument("--db-batch-size", type=int, default=DEFAULT_DB_BATCH_SIZE, help="Topics per database transaction")
+    parser.add_argument("--db-category", help="category_id to assign to lists written to --db")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_PATH, help=f"Also write results to the indexed results store (default {DEFAULT_STORE_PATH}); query it with python -m scraper.results_store")
+    
+    # Work queue options
+    parser.add_argument("--queue", help="Shared SQLite work queue; with --topic(s)/--topics-file the topics are enqueued instead of scraped")
+    parser.add_argument("--worker-id", help="Id recorded on queue leases (defaults to host:pid)")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS, help="How long a claimed topic stays leased without a heartbeat")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="Attempts per topic before the queue marks it failed")
+    parser.add_argument("--retry-failed", action="store_true", help="With --work, give failed queue topics another round of attempts")
     
     # Browser options
     parser.add_argument("--local-browser", action="store_true", help="Use local browser instance")
+    parser.add_argument("--browser-pool-size", type=int, help="Number of warm browsers to keep (defaults to --concurrency)")
+    parser.add_argument("--context-max-uses", type=int, default=20, help="Recycle a browser context after this many topics")
+    
+    # Document export options
+    parser.add_argument("--export-dir", help="Render each result to local documents in this directory, off the scraping path")
+    parser.add_argument("--export-format", action="append", choices=list(EXPORT_FORMATS), help="Document format to export (repeatable, default markdown)")
+    parser.add_argument("--export-combined", action="store_true", help="Also export one document holding every topic")
+    parser.add_argument("--export-combined-only", action="store_true", help="Export only the combined document, not one per topic")
+    
+    # Google Docs options
+    parser.add_argument("--create-gdoc", action="store_true", help="Create a Google Doc with the results via a browser agent (slow; prefer --export-dir)")
+    
+    # Extraction options
+    parser.add_argument("--mode", choices=SCRAPE_MODES, default="agent", help="Scrape with a vision browser agent, or read the page text with one LLM call")
+    parser.add_argument("--text-max-tokens", type=int, default=DEFAULT_TEXT_MAX_TOKENS, help="Token budget for the page text in --mode text")
+    parser.add_argument("--no-fast-path", action="store_true", help="Always use the scrape agent instead of the HTML extractor")
+    parser.add_argument("--fast-path-min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE, help="Minimum HTML extractor confidence (0-1) to skip the scrape agent")
+    
+    # LLM cache options
+    parser.add_argument("--llm-cache", choices=CACHE_MODES, default="off", help="LLM prompt/response cache mode")
+    parser.add_argument("--llm-cache-path", default=DEFAULT_LLM_CACHE_PATH, help="Path to the LLM response cache")
+    parser.add_argument("--llm-cache-max-mb", type=float, default=DEFAULT_LLM_CACHE_MAX_MB, help="Size of the LLM response cache before LRU eviction")
+    
+    # Politeness options
+    parser.add_argument("--domain-concurrency", type=int, default=DEFAULT_DOMAIN_CONCURRENCY, help="Fetches and scrape agent visits allowed at once per source domain (0 for no limit)")
+    parser.add_argument("--domain-interval", type=float, default=DEFAULT_DOMAIN_INTERVAL, help="Minimum seconds between requests to one source domain")
+    parser.add_argument("--fetch-retries", type=int, default=DEFAULT_FETCH_RETRIES, help="Retries of a page fetch answered with 429 or 5xx")
+    
+    # Metrics options
+    parser.add_argument("--metrics-dir", help="Directory for metrics.jsonl and a Prometheus metrics.prom textfile")
+    
+    # Profiling options
+    parser.add_argument("--profile", metavar="DIR", help="Profile topics with cProfile and await timing; each gets DIR/<topic>/ with summary.txt, profile.pstats and flamegraph stacks")
+    parser.add_argument("--profile-topic", action="append", metavar="TOPIC", help="Only profile this topic (repeatable; defaults to every topic)")
+    parser.add_argument("--profile-top", type=int, default=DEFAULT_PROFILE_TOP, help="Rows in each hotspot table of the profile summary")
+    
+    # Budget options
+    parser.add_argument("--budget", action="append", default=[], metavar="STAGE=LIMITS", help=f"Override a stage budget, e.g. search=steps:20,deadline:120,tokens:150k (stages: {', '.join(DEFAULT_STAGE_BUDGETS)}; 'none' lifts a limit)")
+    parser.add_argument("--topic-deadline", type=float, default=DEFAULT_TOPIC_DEADLINE, help="Seconds a topic may spend across all stages once it has a browser (0 disables)")
+    parser.add_argument("--no-budgets", action="store_true", help="Run every stage without step, deadline or token limits")
+    
+    # Near-duplicate options
+    parser.add_argument("--duplicate-threshold", type=float, default=DEFAULT_DUPLICATE_THRESHOLD, help="Token similarity (0-1) at which topics with the same number of content words share one scrape or a cached result")
+    parser.add_argument("--no-dedupe", action="store_true", help="Scrape every topic even if it paraphrases another")
+    
+    # Cache options
+    parser.add_argument("--cache-db", default=DEFAULT_CACHE_PATH, help="Path to the topic result cache")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the topic result cache")
+    parser.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE_HOURS, help="Hours a cached result stays fresh")
+    parser.add_argument("--cache-max-entries", type=int, default=DEFAULT_MAX_ENTRIES, help="Maximum number of cached topics")
+    parser.add_argument("--refresh", action="store_true", help="Re-scrape topics even if a fresh cached result exists")
+    
+    # Batch options
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of topics to scrape in parallel")
+    parser.add_argument("--llm-rpm", type=float, default=DEFAULT_LLM_RPM, help="Maximum LLM requests per minute")
+    parser.add_argument("--dry-run", action="store_true", help="Validate the topics and print the planned work without scraping")
     
     args = parser.parse_args()
     
-    # Process based on mode
-    if args.topic:
-        # Single topic mode
-        result = await find_and_scrape_top_10_list(
-            topic=args.topic,
-            use_local_browser=args.local_browser
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.llm_rpm <= 0:
+        parser.error("--llm-rpm must be positive")
+    if args.text_max_tokens < 100:
+        parser.error("--text-max-tokens must be at least 100")
+    
+    if (args.work or args.merge) and not args.queue:
+        args.queue = DEFAULT_QUEUE_PATH
+    if args.domain_concurrency < 0 or args.domain_interval < 0 or args.fetch_retries < 0:
+        parser.error("--domain-concurrency, --domain-interval and --fetch-retries must not be negative")
+    if args.db_batch_size < 1:
+        parser.error("--db-batch-size must be at least 1")
+    if args.profile_top < 1:
+        parser.error("--profile-top must be at least 1")
+    if args.lease_seconds <= 0:
+        parser.error("--lease-seconds must be positive")
+    if args.max_attempts < 1:
+        parser.error("--max-attempts must be at least 1")
+    if not 0 < args.duplicate_threshold <= 1:
+        parser.error("--duplicate-threshold must be in (0, 1]")
+    if args.topic_deadline < 0:
+        parser.error("--topic-deadline must not be negative")
+    try:
+        args.budgets = build_budgets(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    args.export_format = args.export_format or ["markdown"]
+    if args.export_combined_only:
+        args.export_combined = True
+    if args.export and not args.export_dir:
+        parser.error("--export requires --export-dir")
+    
+    if args.dry_run:
+        if args.compact or args.work or args.merge or args.queue or args.export:
+            parser.error("--dry-run cannot be combined with --compact, --export or the work queue")
+        try:
+            print_run_plan(args)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        return
+    
+    if args.compact:
+        sink_path = args.sink or default_sink_path(args.output)
+        saved = compact(sink_path, args.output)
+        print(f"Compacted {saved} results from {sink_path} into {args.output}")
+        return
+    
+    if args.merge:
+        saved = merge(args.queue, args.output)
+        print(f"Merged {saved} results from {args.queue} into {args.output}")
+        return
+    
+    if args.export:
+        with open(args.output, "r", encoding="utf-8") as f:
+            results = json.load(f)
+        started = time.perf_counter()
+        paths = export_results(
+            results,
+            args.export_dir,
+            args.export_format,
+            per_topic=not args.export_combined_only,
+            combined=args.export_combined
         )
+        print(f"Exported {len(paths)} documents from {args.output} into {args.export_dir} in {time.perf_counter() - started:.2f}s")
+        return
+    
+    if args.queue and not args.work:
+        # Load topics into the queue; workers started with --work scrape them
+        queue = WorkQueue(args.queue)
+        try:
+            topics = [args.topic] if args.topic else load_topics_file(args.topics_file) if args.topics_file else args.topics
+            added = queue.enqueue(topics)
+            print(f"Enqueued {added} of {len(topics)} topics into {args.queue}: {json.dumps(queue.stats())}")
+        finally:
+            queue.close()
+        return
+    
+    if args.metrics_dir:
+        metrics.configure(os.path.join(args.metrics_dir, "metrics.jsonl"))
+    
+    global profiler
+    if args.profile:
+        profiler = TopicProfiler(args.profile, args.profile_topic, args.profile_top)
+        profiler.install()
+    
+    global llm_cache
+    llm_cache = create_llm_cache(args.llm_cache, args.llm_cache_path, args.llm_cache_max_mb)
+    
+    global fetch_scheduler
+    fetch_scheduler = FetchScheduler(args.domain_concurrency or None, args.domain_interval, args.fetch_retries)
+    
+    result_cache = None
+    if not args.no_cache:
+        result_cache = TopicResultCache(
+            args.cache_db,
+            max_age_hours=args.max_age,
+            max_entries=args.cache_max_entries
+        )
+    
+    # One browser pool for the whole run, shut down once at the end
+    browser_pool = BrowserPool(
+        size=args.browser_pool_size or args.concurrency,
+        max_uses=args.context_max_uses,
+        use_local_browser=args.local_browser
+    )
+    destinations: List[ResultSink] = []
+    if args.db:
+        destinations.append(open_db_sink(args.db, args.db_batch_size, args.db_category))
+    if args.store:
+        destinations.append(ResultsStore(args.store))
+    # A failing destination is reported, not fatal
+    sinks = MultiSink(destinations)
+    
+    exporter = None
+    if args.export_dir:
+        exporter = DocumentExporter(
+            args.export_dir,
+            args.export_format,
+            per_topic=not args.export_combined_only,
+            combined=args.export_combined
+        )
+    try:
+        await run_scraper(args, browser_pool, result_cache, exporter, sinks)
+    finally:
+        await browser_pool.close()
+        print(f"Browser pool stats: {json.dumps(browser_pool.stats())}")
+        if exporter is not None:
+            combined_paths = await exporter.close()
+            print(f"Export stats: {json.dumps(exporter.stats())}")
+            for path in combined_paths:
+                print(f"Combined document written to {path}")
+        sinks.flush()
+        for name, stats in sinks.stats().items():
+            print(f"{name} stats: {json.dumps(stats)}")
+        sinks.close()
+        print(f"HTML fast path stats: {json.dumps(fast_path_stats.stats())}")
+        print(f"Fetch scheduler stats: {json.dumps(fetch_scheduler.stats())}")
+        if result_cache is not None:
+            evicted = result_cache.evict()
+            print(f"Result cache stats: {json.dumps(result_cache.stats())} ({evicted} evicted)")
+            result_cache.close()
+        if llm_cache:
+            print(f"LLM cache stats: {json.dumps(llm_cache.stats())}")
+            llm_cache.close()
+        
+        failures = metrics.failures()
+        if failures:
+            print(f"\nFailed topics ({len(failures)}):")
+            for record in failures:
+                print(f"- {record.topic}: {record.stage} {record.error}")
+        
+        print("\nStage timings:")
+        print(metrics.summary())
+        if args.metrics_dir:
+            metrics.write_prometheus(os.path.join(args.metrics_dir, "metrics.prom"))
+            print(f"Metrics written to {args.metrics_dir}")
+        metrics.close()
+        if profiler is not None:
+            print(f"Profiles of {len(profiler.written)} topics written to {args.profile}")
+
+async def run_scraper(
+    args: argparse.Namespace,
+    browser_pool: BrowserPool,
+    result_cache: Optional[TopicResultCache] = None,
+    exporter: Optional[DocumentExporter] = None,
+    sinks: Optional[ResultSink] = None,
+):
+    """
+    Run the scrape requested on the command line
+    
+    Args:
+        args: Parsed command line arguments
+        browser_pool: Browser pool shared by every topic in the run
+        result_cache: Optional topic result cache
+        exporter: Optional local document exporter fed with each result
+        sinks: Further sink (usually a MultiSink) each result is written to
+    """
+    sinks = sinks or MultiSink([])
+    # Process based on mode
+    if args.work:
+        queue = WorkQueue(args.queue)
+        try:
+            if args.retry_failed:
+                print(f"Requeued {queue.retry_failed()} failed topics")
+            await run_queue_worker(
+                queue,
+                worker_id=args.worker_id,
+                use_local_browser=args.local_browser,
+                create_gdoc=args.create_gdoc,
+                concurrency=args.concurrency,
+                llm_rpm=args.llm_rpm,
+                browser_pool=browser_pool,
+                result_cache=result_cache,
+                refresh=args.refresh,
+                fast_path_min_confidence=None if args.no_fast_path else args.fast_path_min_confidence,
+                mode=args.mode,
+                text_max_tokens=args.text_max_tokens,
+                duplicate_threshold=None if args.no_dedupe else args.duplicate_threshold,
+                budgets=args.budgets,
+                lease_seconds=args.lease_seconds,
+                max_attempts=args.max_attempts,
+                exporter=exporter,
+                sinks=sinks
+            )
+        finally:
+            queue.close()
+    elif args.topic:
+        # Single topic mode: a one-topic stream, so failures are handled as in a batch
+        async for outcome in scrape_topics_stream(
+            [args.topic],
+            use_local_browser=args.local_browser,
+            create_gdoc=args.create_gdoc,
+            llm_rpm=args.llm_rpm,
+            browser_pool=browser_pool,
+            result_cache=result_cache,
+            refresh=args.refresh,
+            fast_path_min_confidence=None if args.no_fast_path else args.fast_path_min_confidence,
+            mode=args.mode,
+            text_max_tokens=args.text_max_tokens,
+            duplicate_threshold=None if args.no_dedupe else args.duplicate_threshold,
+            budgets=args.budgets
+        ):
+            result = outcome.result
         
-        if result:
-            with open(args.output, 'w') as f:
-                json.dump([result], indent=2, ensure_ascii=False, fp=f)
-            print(f"Results saved to {args.output}")
+        if not outcome.ok:
+            # Includes the exceeded budget, if that is what stopped the topic
+            print(json.dumps(outcome.to_dict(), ensure_ascii=False))
+            raise SystemExit(1)
+        
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([result], f, indent=2, ensure_ascii=False)
+        print(f"Results saved to {args.output}")
+        sinks.write(result)
+        if exporter is not None:
+            exporter.submit(result)
+        
+        if "google_doc_url" in result:
+            print(f"Google Doc created: {result['google_doc_url']}")
     else:
         # Multiple topics mode
-        topics = []
-        
         if args.topics_file:
-            # Load topics from file
-            with open(args.topics_file, 'r') as f:
-                file_content = json.load(f)
-                
-                # Handle different possible file formats
-                if isinstance(file_content, list):
-                    # Simple list of strings
-                    if all(isinstance(item, str) for item in file_content):
-                        topics = file_content
-                    # List of objects with topic field
-                    elif all(isinstance(item, dict) and "topic" in item for item in file_content):
-                        topics = [item["topic"] for item in file_content]
-                    else:
-                        raise ValueError("Invalid topics file format. Expected a list of strings or objects with 'topic' field.")
-                else:
-                    raise ValueError("Invalid topics file format. Expected a JSON array.")
+            topics = load_topics_file(args.topics_file)
         else:
             # Use topics from command line
             topics = args.topics
         
-        await batch_scrape_topics(
+        results = await batch_scrape_topics(
             topics=topics,
             output_file=args.output,
-            use_local_browser=args.local_browser
+            use_local_browser=args.local_browser,
+            create_gdoc=args.create_gdoc,
+            concurrency=args.concurrency,
+            llm_rpm=args.llm_rpm,
+            browser_pool=browser_pool,
+            result_cache=result_cache,
+            refresh=args.refresh,
+            fast_path_min_confidence=None if args.no_fast_path else args.fast_path_min_confidence,
+            sink_path=args.sink,
+            resume=args.resume,
+            mode=args.mode,
+            text_max_tokens=args.text_max_tokens,
+            duplicate_threshold=None if args.no_dedupe else args.duplicate_threshold,
+            budgets=args.budgets,
+            exporter=exporter,
+            sinks=sinks
         )
+        
+        google_doc_urls = [result["google_doc_url"] for result in results if result.get("google_doc_url")]
+        if google_doc_urls:
+            print("\nGoogle Docs created:")
+            for url in google_doc_urls:
+                print(f"- {url}")
+
+def build_budgets(args: argparse.Namespace) -> Optional[ScrapeBudgets]:
+    """
+    Returns:
+        The budgets selected on the command line, or None with --no-budgets
+    
+    Raises:
+        ValueError: If a --budget value is malformed
+    """
+    if args.no_budgets:
+        return None
+    budgets = ScrapeBudgets(topic_deadline_seconds=args.topic_deadline or None)
+    for spec in args.budget:
+        budgets.stages.update(parse_stage_budget(spec))
+    return budgets
+
+def print_run_plan(args: argparse.Namespace):
+    """
+    Print what a run would do without loading the browser or LLM libraries
+    
+    Topics are validated and checked against the result cache and, with
+    --resume, the JSONL sink, so the planned scrape count is accurate.
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Raises:
+        ValueError: If the topics are invalid
+    """
+    if args.topic:
+        topics = [args.topic]
+    elif args.topics_file:
+        topics = load_topics_file(args.topics_file)
+    else:
+        topics = args.topics
+    
+    blank = [index + 1 for index, topic in enumerate(topics) if not topic.strip()]
+    if blank:
+        raise ValueError(f"Empty topics at positions {blank}")
+    
+    seen: Dict[str, str] = {}
+    duplicates = []
+    for topic in topics:
+        key = normalize_topic(topic)
+        if key in seen:
+            duplicates.append(topic)
+        else:
+            seen[key] = topic
+    
+    done = set()
+    sink_path = args.sink or default_sink_path(args.output)
+    if args.resume and not args.topic:
+        done = completed_topics(sink_path)
+    
+    cached = set()
+    # Only read an existing cache; opening a missing one would create it
+    if not args.no_cache and not args.refresh and os.path.exists(args.cache_db):
+        result_cache = TopicResultCache(args.cache_db, max_age_hours=args.max_age, max_entries=args.cache_max_entries)
+        try:
+            cached = {key for key in seen if key not in done and result_cache.get(seen[key]) is not None}
+        finally:
+            result_cache.close()
+    
+    to_scrape = [topic for key, topic in seen.items() if key not in done and key not in cached]
+    
+    clusters = {}
+    if not args.no_dedupe and not args.topic:
+        clusters = cluster_topics(to_scrape, args.duplicate_threshold)
+        to_scrape = list(clusters)
+    
+    print(f"Topics: {len(topics)} ({len(duplicates)} duplicates)")
+    if duplicates:
+        print(f"  Duplicates: {', '.join(duplicates)}")
+    if args.resume and not args.topic:
+        print(f"Already in {sink_path}: {len(done & set(seen))}")
+    print(f"Fresh in result cache: {len(cached)}")
+    print(f"To scrape: {len(to_scrape)}")
+    for topic in to_scrape:
+        print(f"  - {topic}")
+    if len(clusters) < sum(len(members) for members in clusters.values()):
+        print("\nNear-duplicates sharing one scrape:")
+        print_cluster_report(clusters)
+    
+    print("\nSettings:")
+    print(f"  Output: {args.output}" + ("" if args.topic else f" (sink {sink_path})"))
+    if args.db:
+        print(f"  Database: {args.db.split('@')[-1]} ({args.db_batch_size} topics per transaction)")
+    if args.store:
+        print(f"  Results store: {args.store}")
+    if args.profile:
+        print(f"  Profile: {args.profile} ({', '.join(args.profile_topic) if args.profile_topic else 'every topic'})")
+    print(f"  Concurrency: {args.concurrency}, browser pool: {args.browser_pool_size or args.concurrency}, LLM budget: {args.llm_rpm:g} rpm")
+    print(f"  Mode: {args.mode}" + (f" ({args.text_max_tokens} token page budget)" if args.mode == "text" else ""))
+    print(f"  Budgets: {'off' if args.budgets is None else args.budgets.describe()}")
+    print(f"  Near-duplicates: {'off' if args.no_dedupe else f'threshold {args.duplicate_threshold:g}'}")
+    print(f"  Per domain: {args.domain_concurrency or 'unlimited'} at once, {args.domain_interval:g}s apart, {args.fetch_retries} retries on 429/5xx")
+    print(f"  Fast path: {'off' if args.no_fast_path else f'min confidence {args.fast_path_min_confidence:g}'}")
+    print(f"  Result cache: {'off' if args.no_cache else args.cache_db}{' (refresh)' if args.refresh else ''}")
+    print(f"  LLM cache: {args.llm_cache}" + ("" if args.llm_cache == "off" else f" ({args.llm_cache_path})"))
+    print(f"  Google Docs: {'yes' if args.create_gdoc else 'no'}")
+    if args.export_dir:
+        layout = "combined" if args.export_combined_only else "per topic + combined" if args.export_combined else "per topic"
+        print(f"  Export: {', '.join(args.export_format)} to {args.export_dir} ({layout})")
+    else:
+        print("  Export: off")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())